@@ -1,4 +1,5 @@
 from bitarray import bitarray
+from bitarray.util import count_n
 import numpy as np
 
 
@@ -20,24 +21,19 @@ def Find(ba, val=1):
     return l_int_pos_occurrence
 
 
-def find(ba, val=1):
-    """# 2022-07-03 21:41:36
+def find(ba, val=1, int_num_bits_in_a_chunk: int = 2**24):
+    """# 2026-10-17 10:12:45
     generator that returns the location of 'val' from the start of the bitarray.
     Use this function for memory-efficient iteration of position of active entries in a bitarray (np.int64 takes 64 times more memory than an entry in bitarray, which is 1 bit).
+
+    positions are located chunk-by-chunk using a vectorized operation on the underlying buffer of the bitarray (instead of calling 'ba.find' for each occurrence), and the memory usage is bounded by the size of a chunk.
+
+    'int_num_bits_in_a_chunk' : the number of bits that will be searched at once
     """
-    len_ba = len(ba)
-    if len(ba) == 0:  # handle empty bitarray input
-        return
-    int_pos_start = 0
-    if ba[0] == val:  # handle the case when the first bit is equal to 'val'
-        yield int_pos_start
-    while int_pos_start < len_ba:
-        int_pos_occurrence = ba.find(val, int_pos_start + 1)
-        if int_pos_occurrence < 0:
-            break
-        else:
-            yield int_pos_occurrence
-            int_pos_start = int_pos_occurrence
+    for arr_int_pos in _iter_integer_indices(
+        ba, val=val, int_num_bits_in_a_chunk=int_num_bits_in_a_chunk
+    ):
+        yield from arr_int_pos.tolist()
 
 
 def Find_Segment(ba, background=1):
@@ -87,10 +83,61 @@ def Retrieve_Integer_Indices(ba, background=0):
     return l
 
 
+def _get_bit_order(ba):
+    """# 2026-10-17 10:05:31
+    return the bit order of the buffer of the given bitarray ('big' or 'little'), which can be used with 'np.packbits' and 'np.unpackbits'
+    """
+    return (
+        ba.endian() if callable(ba.endian) else ba.endian
+    )  # 'endian' is a method in bitarray < 3.0, and an attribute in bitarray >= 3.0
+
+
+def _unpack_buffer(ba, int_pos_start: int = 0, int_pos_end=None):
+    """# 2026-10-17 10:07:02
+    unpack the bits of the given bitarray between 'int_pos_start' and 'int_pos_end' into a boolean numpy array by using 'np.unpackbits' on the underlying buffer of the bitarray (without copying the bitarray)
+
+    'int_pos_start' : should be a multiple of 8
+    """
+    len_ba = len(ba)
+    if int_pos_end is None or int_pos_end > len_ba:
+        int_pos_end = len_ba
+    if int_pos_end <= int_pos_start:
+        return np.zeros(0, dtype=bool)
+    arr_byte = np.frombuffer(ba, dtype=np.uint8)[
+        int_pos_start // 8 : (int_pos_end + 7) // 8
+    ]  # retrieve the bytes containing the bits of interest (bitarray supports the buffer protocol)
+    return np.unpackbits(
+        arr_byte, count=int_pos_end - int_pos_start, bitorder=_get_bit_order(ba)
+    ).view(
+        bool
+    )  # discard the padding bits of the last byte
+
+
+def _iter_integer_indices(ba, val=1, int_num_bits_in_a_chunk: int = 2**24):
+    """# 2026-10-17 10:09:14
+    iterate over the chunks of the given bitarray, and yield integer indices (np.int64) of the entries equal to 'val' for each chunk.
+
+    'int_num_bits_in_a_chunk' : the number of bits in each chunk. will be rounded up to a multiple of 8
+    """
+    len_ba = len(ba)
+    int_num_bits_in_a_chunk = max(
+        8, int(np.ceil(int_num_bits_in_a_chunk / 8)) * 8
+    )  # chunk boundaries should be aligned with the bytes of the buffer
+    for int_pos_start in range(0, len_ba, int_num_bits_in_a_chunk):
+        int_pos_end = min(int_pos_start + int_num_bits_in_a_chunk, len_ba)
+        # skip chunks without any entry of interest using the fast popcount of bitarray
+        if ba.count(val, int_pos_start, int_pos_end) == 0:
+            continue
+        arr_bool = _unpack_buffer(ba, int_pos_start, int_pos_end)
+        arr_int_pos = np.flatnonzero(arr_bool if val else ~arr_bool)
+        arr_int_pos += int_pos_start
+        yield arr_int_pos
+
+
 def to_array(ba):
-    """# 2022-06-24 23:54:12
+    """# 2026-10-17 10:14:20
     return a boolean numpy array of the given bitarray"""
-    return np.frombuffer(ba.unpack(), dtype=bool)
+    return _unpack_buffer(ba)
 
 
 def to_bitarray(arr_bool):
@@ -102,26 +149,88 @@ def to_bitarray(arr_bool):
     return ba
 
 
-def from_integer_indices_to_bitarray(l_int_index, length):
-    """# 2022-07-01 11:21:12
+def from_integer_indices_to_bitarray(
+    l_int_index, length, int_num_bits_in_a_chunk: int = 2**24
+):
+    """# 2026-10-17 10:19:52
     convert list of integer indices to bitarray
 
     'length' : length of the output bitarray object
+    'int_num_bits_in_a_chunk' : the number of bits that will be composed at once. the output bitarray is composed chunk-by-chunk using 'np.packbits' so that the memory usage of the intermediate boolean array is bounded by the size of a chunk
     """
-    ba = bitarray(length)
-    ba.setall(0)
-    for int_index in l_int_index:
-        ba[int_index] = True
+    arr_int_index = np.asarray(
+        l_int_index if hasattr(l_int_index, "__len__") else list(l_int_index),
+        dtype=np.int64,
+    ).ravel()  # an iterator (e.g. generator returned by 'find') can be also given
+    if len(arr_int_index) > 0:
+        arr_int_index = np.where(
+            arr_int_index < 0, arr_int_index + length, arr_int_index
+        )  # handle negative indices
+        if arr_int_index.min() < 0 or arr_int_index.max() >= length:
+            raise IndexError("bitarray index out of range")
+        if np.any(arr_int_index[1:] < arr_int_index[:-1]):
+            arr_int_index = np.sort(arr_int_index)
+    int_num_bits_in_a_chunk = max(8, int(np.ceil(int_num_bits_in_a_chunk / 8)) * 8)
+    arr_byte = np.zeros((length + 7) // 8, dtype=np.uint8)
+    arr_int_pos_boundary = np.searchsorted(
+        arr_int_index,
+        np.arange(0, length + int_num_bits_in_a_chunk, int_num_bits_in_a_chunk),
+    )  # locate the indices belonging to each chunk
+    for int_index_chunk, int_pos_start in enumerate(
+        range(0, length, int_num_bits_in_a_chunk)
+    ):
+        st, en = arr_int_pos_boundary[int_index_chunk : int_index_chunk + 2]
+        if st == en:  # skip chunks without any active entry
+            continue
+        int_num_bits = min(int_num_bits_in_a_chunk, length - int_pos_start)
+        arr_bool = np.zeros(int_num_bits, dtype=bool)
+        arr_bool[arr_int_index[st:en] - int_pos_start] = True
+        arr_byte[int_pos_start // 8 : int_pos_start // 8 + (int_num_bits + 7) // 8] = (
+            np.packbits(arr_bool, bitorder="big")
+        )
+    ba = bitarray(endian="big")
+    ba.frombytes(arr_byte.tobytes())
+    del ba[length:]  # remove the padding bits
     return ba
 
 
-def to_integer_indices(ba):
-    """# 2022-07-01 21:38:17
+def to_integer_indices(ba, int_num_bits_in_a_chunk: int = 2**24):
+    """# 2026-10-17 10:24:37
     retrieve integer indices of the active entries of the given bitarray
 
     'ba' : input bitarray object
+    'int_num_bits_in_a_chunk' : the number of bits that will be unpacked at once. the output array is pre-allocated using the popcount of the bitarray, and filled chunk-by-chunk, so that the full boolean array is never materialized for huge axes
+    """
+    arr_int_pos = np.zeros(ba.count(1), dtype=np.int64)
+    int_num_filled = 0
+    for arr_int_pos_chunk in _iter_integer_indices(
+        ba, val=1, int_num_bits_in_a_chunk=int_num_bits_in_a_chunk
+    ):
+        arr_int_pos[int_num_filled : int_num_filled + len(arr_int_pos_chunk)] = (
+            arr_int_pos_chunk
+        )
+        int_num_filled += len(arr_int_pos_chunk)
+    return arr_int_pos
+
+
+def rank(ba, int_pos: int, val=1):
+    """# 2026-10-17 10:28:03
+    return the number of entries equal to 'val' before the position 'int_pos' (excluding 'int_pos') using the popcount of the bitarray.
+    for an active entry at 'int_pos', the return value is the index of the entry among the active entries (e.g. an integer index in the filtered axis).
+    """
+    return ba.count(val, 0, int_pos)
+
+
+def select(ba, int_rank: int):
+    """# 2026-10-17 10:29:48
+    return the position of the active entry of the given rank 'int_rank' (0-based) using the popcount-based search of the bitarray (the inverse of 'rank').
+    raise ValueError if 'int_rank' is not smaller than the number of active entries.
     """
-    return np.where(to_array(ba))[0]
+    if int_rank < 0 or int_rank >= ba.count(1):
+        raise ValueError(
+            f"'int_rank' ({int_rank}) is out of range for a bitarray with {ba.count(1)} active entries"
+        )
+    return count_n(ba, int_rank + 1) - 1
 
 
 def COUNTER(l_values, dict_counter=None, ignore_float=True):  # 2020-07-29 23:49:51
@@ -20,6 +20,8 @@ from multiprocessing import (
     set_start_method,
 )  # for multiple processing  # with get_context("spawn").Pool() as pool:
 import multiprocessing
+import multiprocessing.connection  # for waiting on multiple pipes
+from multiprocessing import shared_memory, resource_tracker
 import multiprocessing as mp
 import collections
 from copy import copy, deepcopy
@@ -646,6 +648,259 @@ def GLOB_Retrive_Strings_in_Wildcards(
         return l_l_str_in_wildcard
 
 
+class SharedArray(object):
+    """# 2026-10-17 14:02:11
+    a small descriptor of a numpy array stored in a 'SharedMemoryRingBuffer', which can be sent through a pipe instead of the array
+    """
+
+    __slots__ = ("name", "int_offset", "shape", "dtype", "int_pos_end")
+
+    def __init__(self, name, int_offset, shape, dtype, int_pos_end):
+        self.name = name  # the name of the shared memory block
+        self.int_offset = int_offset  # the offset of the array in the block
+        self.shape = shape
+        self.dtype = dtype
+        self.int_pos_end = int_pos_end  # the position of the end of the array in the ring buffer (used for releasing the space)
+
+    def __getstate__(self):
+        return (self.name, self.int_offset, self.shape, self.dtype, self.int_pos_end)
+
+    def __setstate__(self, state):
+        (
+            self.name,
+            self.int_offset,
+            self.shape,
+            self.dtype,
+            self.int_pos_end,
+        ) = state
+
+    def __len__(self):
+        return self.shape[0]
+
+
+class SharedSparseMatrix(object):
+    """# 2026-10-17 14:03:40
+    a small descriptor of a scipy CSR/CSC sparse matrix, the arrays of which are stored in a 'SharedMemoryRingBuffer'
+    """
+
+    __slots__ = ("format", "shape", "data", "indices", "indptr")
+
+    def __init__(self, format, shape, data, indices, indptr):
+        self.format = format  # 'csr' or 'csc'
+        self.shape = shape
+        self.data, self.indices, self.indptr = data, indices, indptr
+
+    def __getstate__(self):
+        return (self.format, self.shape, self.data, self.indices, self.indptr)
+
+    def __setstate__(self, state):
+        self.format, self.shape, self.data, self.indices, self.indptr = state
+
+
+_dict_name_to_shared_memory = (
+    dict()
+)  # shared memory blocks created or attached by the current process
+
+
+def _untrack_shared_memory(shm):
+    """# 2026-10-17 14:05:02
+    stop the resource tracker from tracking the given shared memory block. the lifetime of the blocks of 'SharedMemoryRingBuffer' is managed by the process that created the buffer, and attaching the block from other processes should not result in the block being unlinked (or reported as leaked) when these processes exit.
+    """
+    resource_tracker.unregister(getattr(shm, "_name", shm.name), "shared_memory")
+
+
+def _get_shared_memory(name: str):
+    """# 2026-10-17 14:05:40
+    retrieve a shared memory block of the given name (attach the block if it has not been attached to the current process)
+    """
+    if name not in _dict_name_to_shared_memory:
+        shm = shared_memory.SharedMemory(name=name)
+        _untrack_shared_memory(shm)
+        _dict_name_to_shared_memory[name] = shm
+    return _dict_name_to_shared_memory[name]
+
+
+class SharedMemoryRingBuffer(object):
+    """# 2026-10-17 14:07:18
+    a single-producer, single-consumer ring buffer on a shared memory block for transferring numpy arrays (and scipy sparse matrices) between processes without pickling and copying the arrays through pipes.
+    the buffer should be created before the producer is forked. the producer writes arrays to the buffer and sends small descriptors through pipes (see 'pack'), and the consumer retrieves numpy views of the arrays (see 'Unpack_Shared_Memory_Objects'), and releases the space once the arrays are no longer needed (see 'Release_Shared_Memory_Objects'). the space should be released in the order the arrays were written.
+    when the buffer is full (or an array is larger than the buffer), the array will be sent through the pipe as usual.
+
+    int_num_bytes : int = 2 ** 28 # the size of the buffer
+    int_min_num_bytes_to_share : int = 2 ** 16 # arrays smaller than this size will be sent through the pipe as usual
+    """
+
+    int_num_bytes_header = 64  # the header contains the total number of bytes written (head) and the total number of bytes released (tail)
+    int_num_bytes_alignment = 64
+
+    def __init__(
+        self, int_num_bytes: int = 2**28, int_min_num_bytes_to_share: int = 2**16
+    ):
+        """# 2026-10-17 14:07:55"""
+        self._int_num_bytes = int(int_num_bytes)
+        self._int_min_num_bytes_to_share = int_min_num_bytes_to_share
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.int_num_bytes_header + self._int_num_bytes
+        )
+        _untrack_shared_memory(
+            self._shm
+        )  # the block will be unlinked by 'unlink' method
+        self.name = self._shm.name
+        _dict_name_to_shared_memory[self.name] = self._shm
+        self._arr_header = np.ndarray(2, dtype=np.int64, buffer=self._shm.buf)
+        self._arr_header[:] = 0
+
+    @property
+    def is_empty(self):
+        """# 2026-10-17 14:08:21
+        return True if all arrays written to the buffer have been released
+        """
+        return self._arr_header[0] == self._arr_header[1]
+
+    def put(self, arr: np.ndarray):
+        """# 2026-10-17 14:09:30
+        write an array to the buffer, and return the descriptor of the array. return None if the buffer does not have enough space for the array.
+        """
+        arr = np.ascontiguousarray(arr)
+        int_num_bytes = (
+            -(-arr.nbytes // self.int_num_bytes_alignment)
+            * self.int_num_bytes_alignment
+        )  # align the start position of each array
+        if int_num_bytes == 0 or int_num_bytes > self._int_num_bytes:
+            return
+        int_pos_head, int_pos_tail = int(self._arr_header[0]), int(self._arr_header[1])
+        int_pos_start = int_pos_head
+        if (
+            int_pos_head % self._int_num_bytes + int_num_bytes > self._int_num_bytes
+        ):  # if the array does not fit at the end of the buffer, write the array at the start of the buffer
+            int_pos_start += self._int_num_bytes - int_pos_head % self._int_num_bytes
+        int_pos_end = int_pos_start + int_num_bytes
+        if (
+            int_pos_end - int_pos_tail > self._int_num_bytes
+        ):  # the buffer does not have enough space
+            return
+        int_offset = self.int_num_bytes_header + int_pos_start % self._int_num_bytes
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=self._shm.buf, offset=int_offset)[
+            ...
+        ] = arr  # copy the array to the buffer
+        self._arr_header[0] = int_pos_end  # update the head
+        return SharedArray(self.name, int_offset, arr.shape, arr.dtype.str, int_pos_end)
+
+    def pack(self, obj):
+        """# 2026-10-17 14:11:02
+        write numpy arrays and scipy CSR/CSC sparse matrices (including those in tuples, lists, and dictionaries) in the given object to the buffer, and return the object in which the arrays were replaced with their descriptors
+        """
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.hasobject or obj.nbytes < self._int_min_num_bytes_to_share:
+                return obj
+            desc = self.put(obj)
+            return obj if desc is None else desc
+        elif isinstance(obj, tuple):
+            return tuple(self.pack(e) for e in obj)
+        elif isinstance(obj, list):
+            return list(self.pack(e) for e in obj)
+        elif isinstance(obj, dict):
+            return dict((k, self.pack(obj[k])) for k in obj)
+        elif type(obj).__module__.startswith("scipy.sparse") and getattr(
+            obj, "format", None
+        ) in {"csr", "csc"}:
+            return SharedSparseMatrix(
+                obj.format,
+                obj.shape,
+                self.pack(obj.data),
+                self.pack(obj.indices),
+                self.pack(obj.indptr),
+            )
+        return obj
+
+    def unlink(self):
+        """# 2026-10-17 14:12:17
+        destroy the shared memory block. views of the arrays retrieved from the buffer should not be used afterward.
+        """
+        _dict_name_to_shared_memory.pop(self.name, None)
+        del self._arr_header
+        try:
+            self._shm.close()
+        except BufferError:  # views of the block are still being used
+            pass
+        resource_tracker.register(
+            getattr(self._shm, "_name", self._shm.name), "shared_memory"
+        )  # 'unlink' will unregister the block from the resource tracker
+        self._shm.unlink()
+
+
+class SharedMemoryPipeSender(object):
+    """# 2026-10-17 14:13:30
+    a wrapper of the sending end of a pipe that transfers numpy arrays in the sent objects through a 'SharedMemoryRingBuffer'
+    """
+
+    def __init__(self, pipe_sender, ring_buffer: SharedMemoryRingBuffer):
+        self._pipe_sender = pipe_sender
+        self._ring_buffer = ring_buffer
+
+    def send(self, obj):
+        self._pipe_sender.send(self._ring_buffer.pack(obj))
+
+    def __getattr__(self, name):
+        return getattr(self._pipe_sender, name)
+
+
+def Unpack_Shared_Memory_Objects(obj):
+    """# 2026-10-17 14:14:45
+    replace the descriptors of the arrays in the given object (packed by 'SharedMemoryRingBuffer.pack') with the numpy views of the arrays (or scipy sparse matrices using the views). the views are valid until the arrays are released by 'Release_Shared_Memory_Objects'.
+    """
+    if isinstance(obj, SharedArray):
+        return np.ndarray(
+            obj.shape,
+            dtype=np.dtype(obj.dtype),
+            buffer=_get_shared_memory(obj.name).buf,
+            offset=obj.int_offset,
+        )
+    elif isinstance(obj, SharedSparseMatrix):
+        import scipy.sparse
+
+        return (
+            scipy.sparse.csr_matrix if obj.format == "csr" else scipy.sparse.csc_matrix
+        )(
+            (
+                Unpack_Shared_Memory_Objects(obj.data),
+                Unpack_Shared_Memory_Objects(obj.indices),
+                Unpack_Shared_Memory_Objects(obj.indptr),
+            ),
+            shape=obj.shape,
+            copy=False,
+        )
+    elif isinstance(obj, tuple):
+        return tuple(Unpack_Shared_Memory_Objects(e) for e in obj)
+    elif isinstance(obj, list):
+        return list(Unpack_Shared_Memory_Objects(e) for e in obj)
+    elif isinstance(obj, dict):
+        return dict((k, Unpack_Shared_Memory_Objects(obj[k])) for k in obj)
+    return obj
+
+
+def Release_Shared_Memory_Objects(obj):
+    """# 2026-10-17 14:15:52
+    release the space of the arrays in the given object (packed by 'SharedMemoryRingBuffer.pack') so that the space can be re-used by the producer
+    """
+    if isinstance(obj, SharedArray):
+        arr_header = np.ndarray(
+            2, dtype=np.int64, buffer=_get_shared_memory(obj.name).buf
+        )
+        if arr_header[1] < obj.int_pos_end:
+            arr_header[1] = obj.int_pos_end  # update the tail
+        del arr_header
+    elif isinstance(obj, SharedSparseMatrix):
+        for e in (obj.data, obj.indices, obj.indptr):
+            Release_Shared_Memory_Objects(e)
+    elif isinstance(obj, (tuple, list)):
+        for e in obj:
+            Release_Shared_Memory_Objects(e)
+    elif isinstance(obj, dict):
+        for k in obj:
+            Release_Shared_Memory_Objects(obj[k])
+
+
 def Multiprocessing_Batch_Generator_and_Workers(
     gen_batch,
     process_batch,
@@ -653,19 +908,42 @@ def Multiprocessing_Batch_Generator_and_Workers(
     int_num_threads: int = 15,
     int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop: float = 0.2,
     flag_wait_for_a_response_from_worker_after_sending_termination_signal: bool = True,  # wait until all worker exists before resuming works in the main process
+    int_max_num_batches_in_a_queue_for_each_worker: int = 2,
+    flag_deliver_results_in_order: bool = False,
+    flag_use_shared_memory: bool = False,
+    int_num_bytes_shared_memory_buffer: int = 2**26,
+    flag_release_shared_memory_after_post_processing: bool = True,
+    l_process_releasing_shared_memory: list = [],
+    float_seconds_timeout_for_releasing_shared_memory: Union[float, None] = None,
 ):
-    """# 2023-10-06 01:52:29
+    """# 2026-10-17 13:31:12
     'Multiprocessing_Batch_Generator_and_Workers' : multiprocessing using batch generator and workers.
     all worker process will be started using the default ('fork' in UNIX) method.
     perform batch-based multiprocessing using the three components, (1) gen_batch, (2) process_batch, (3) post_process_batch. (3) will be run in the main process, while (1) and (2) will be offloaded to worker processes.
     the 'batch' and result returned by 'process_batch' will be communicated to batch processing workers through pipes.
+    the batch generating worker is event-driven (using 'multiprocessing.connection.wait'), and it is blocked only until a result becomes available from any of the busy workers.
 
     'gen_batch' : a generator object returning batches
     'process_batch( pipe_receiver, pipe_sender )' : a function that can process batch from 'pipe_receiver'. should terminate itself when None is received. 'pipe_sender' argument is to deliver the result to the main process, and should be used at the end of code to notify the main process that the work has been completed. sending 'None' through 'pipe_sender' will terminate the block and the main process will be unblocked (however, the works will be continued to be distributed and performed by the child processes).
+                                            exactly one result should be sent for each received batch.
     'post_process_batch( result )' : a function that can process return value from 'process_batch' function in the main process. operations that are not thread/process-safe can be done here, as these works will be serialized in the main thread.
     'int_num_threads' : the number of threads(actually processes) including the main process. For example, when 'int_num_threads' is 3, 2 worker processes will be used. one thread is reserved for batch generation.
-    'int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop' : number of seconds to wait for each loop before checking which running processes has been completed
+    'int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop' : (deprecated) not used. completed works are identified as soon as the results become available.
     flag_wait_for_a_response_from_worker_after_sending_termination_signal : bool = True, # wait until all worker exists before resuming works in the main process
+    int_max_num_batches_in_a_queue_for_each_worker : int = 2 # the maximum number of batches distributed to each worker at a time (prefetch depth). 2 batches distributed to each process should be optimal for most cases, while preventing pipe buffer overloading.
+    flag_deliver_results_in_order : bool = False # if True, results will be given to 'post_process_batch' in the order the batches were generated by 'gen_batch'. By default, results are given in the order of completion.
+    flag_use_shared_memory : bool = False # if True, numpy arrays and scipy CSR/CSC sparse matrices in the results sent by 'process_batch' will be transferred through a shared memory ring buffer of each worker (see 'SharedMemoryRingBuffer'), and only small descriptors will be sent through the pipes.
+    int_num_bytes_shared_memory_buffer : int = 2 ** 26 # the size of the shared memory ring buffer of each worker. the size will be reduced according to the available space of the shared memory file system (if the space is too small, shared memory will not be used)
+    flag_release_shared_memory_after_post_processing : bool = True # if True, 'post_process_batch' will receive the result containing numpy views of the arrays, which are valid only until 'post_process_batch' returns. if False, 'post_process_batch' will receive the result containing the descriptors of the arrays, which can be forwarded to another process. the arrays should be retrieved using 'Unpack_Shared_Memory_Objects' and released using 'Release_Shared_Memory_Objects' (in the order of the results), since the function returns only after all arrays have been released.
+    l_process_releasing_shared_memory : list = [ ] # the processes (e.g. a writer process) releasing the arrays forwarded by 'post_process_batch' when 'flag_release_shared_memory_after_post_processing' is False. if any of the processes exits before all arrays have been released, an error will be raised instead of waiting for the arrays indefinitely.
+    float_seconds_timeout_for_releasing_shared_memory : Union[ float, None ] = None # the maximum number of seconds to wait for the release of the arrays after all results have been post-processed. if the arrays have not been released within the time, an error will be raised. if None is given, wait without a timeout.
+
+    returns
+    dict_stat : a dictionary containing statistics about the workers
+        'l_int_num_batches' : the number of batches processed by each worker
+        'l_float_seconds_busy' : the (approximate) total time each worker spent processing batches
+        'l_float_throughput' : the number of batches processed per second by each worker while it was busy
+        'float_seconds_elapsed' : total run time of the batch generating worker
     """
 
     def __batch_generating_worker(
@@ -674,96 +952,183 @@ def Multiprocessing_Batch_Generator_and_Workers(
         l_pipe_receiver_output,
         pipe_sender_output_to_main_process,
     ):
-        """# 2023-10-06 01:52:24
+        """# 2026-10-17 13:29:40
         define a worker for generating batch and distributing batches across the workers, receives results across the workers, and send result back to the main process
         """
-        # hard coded setting
-        int_max_num_batches_in_a_queue_for_each_worker = 2  # 2 batches distributed to each process should be optimal, while preventing pipe buffer overloading.
-
+        float_time_start = time.time()
         q_batch = collections.deque()  # initialize queue of batchs
         int_num_batch_processing_workers = len(l_pipe_sender_input)
         flag_batch_generation_completed = False  # flag indicating whether generating batchs for the current input sam file was completed
         arr_num_batch_being_processed = np.zeros(
             int_num_batch_processing_workers, dtype=int
         )  # retrieve the number of batches currently being processed in each worker. if this number becomes 0, assumes the worker is available
+        dict_receiver_to_index_worker = dict(
+            (id(r), i) for i, r in enumerate(l_pipe_receiver_output)
+        )  # map a receiver to the index of the worker
+
+        # initialize the statistics
+        arr_num_batches_processed = np.zeros(
+            int_num_batch_processing_workers, dtype=int
+        )
+        arr_seconds_busy = np.zeros(int_num_batch_processing_workers, dtype=float)
+        arr_time_last_completion = np.zeros(
+            int_num_batch_processing_workers, dtype=float
+        )  # the time the last result was received from each worker
+        l_q_batch_dispatched = list(
+            collections.deque() for _ in range(int_num_batch_processing_workers)
+        )  # for each worker, the index and the dispatched time of the batches being processed (in the order of dispatch)
+
+        # initialize the ordered delivery of the results
+        int_index_batch_generated = 0  # the index of the next generated batch
+        int_index_batch_to_deliver = 0  # the index of the next result to be delivered
+        dict_res_waiting = dict()  # results waiting for the delivery
+
         while True:
-            """retrieve batch (if available)"""
+            """if workers are available and there are remaining works to be distributed, distribute works"""
+            while (
+                len(q_batch) > 0
+                and arr_num_batch_being_processed.min()
+                < int_max_num_batches_in_a_queue_for_each_worker
+            ):
+                index_worker = int(
+                    arr_num_batch_being_processed.argmin()
+                )  # assign the work to the worker with the least load (load-balancing)
+                index_batch, batch = q_batch.pop()
+                l_pipe_sender_input[index_worker].send(batch)
+                arr_num_batch_being_processed[index_worker] += 1
+                l_q_batch_dispatched[index_worker].append((index_batch, time.time()))
+
+            # if batch generation has been completed, all batches have been distributed, and processed, exit the loop
+            if (
+                flag_batch_generation_completed
+                and len(q_batch) == 0
+                and arr_num_batch_being_processed.sum() == 0
+            ):
+                break
+
+            """ retrieve batch (if available) """
+            l_receiver_busy = list(
+                l_pipe_receiver_output[i]
+                for i in np.where(arr_num_batch_being_processed > 0)[0]
+            )  # retrieve the receivers of the workers processing batches
             if (
                 not flag_batch_generation_completed
                 and len(q_batch)
                 < int_num_batch_processing_workers
                 * int_max_num_batches_in_a_queue_for_each_worker
-            ):  # if batch generation has not been completed, or the number of batches that have been generated are not large, continue to generate batches.
+            ):  # if batch generation has not been completed, and the number of batches that have been generated are not large, continue to generate batches.
                 try:
-                    batch = next(gen_batch)  # retrieve the next barcode
-                    q_batch.appendleft(batch)  # append batch
+                    q_batch.appendleft(
+                        (int_index_batch_generated, next(gen_batch))
+                    )  # retrieve the next batch, and append the batch with its index
+                    int_index_batch_generated += 1
                 except StopIteration:
                     flag_batch_generation_completed = True
+                l_receiver_ready = (
+                    multiprocessing.connection.wait(l_receiver_busy, timeout=0)
+                    if len(l_receiver_busy) > 0
+                    else []
+                )  # collect results that are already available without blocking
             else:
-                # if batch generation has been completed, all batches have been distributed, and processed, exit the loop
-                if (
-                    flag_batch_generation_completed
-                    and len(q_batch) == 0
-                    and arr_num_batch_being_processed.sum() == 0
-                ):
-                    break
-                # sleep for a while
-                time.sleep(
-                    int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop
-                )  # sleep
+                l_receiver_ready = multiprocessing.connection.wait(
+                    l_receiver_busy
+                )  # block until a result becomes available
 
             """ collect completed works """
-            for index_worker in range(int_num_batch_processing_workers):
-                while l_pipe_receiver_output[
-                    index_worker
-                ].poll():  # until results are available
-                    pipe_sender_output_to_main_process.send(
-                        l_pipe_receiver_output[index_worker].recv()
-                    )  # retrieve result, and send the result back to the main process
+            for r in l_receiver_ready:
+                index_worker = dict_receiver_to_index_worker[id(r)]
+                while (
+                    arr_num_batch_being_processed[index_worker] > 0 and r.poll()
+                ):  # until results are available
+                    res = r.recv()  # retrieve result
+                    float_time = time.time()
                     arr_num_batch_being_processed[
                         index_worker
                     ] -= 1  # update the number of batches being processed by the worker
-
-            """ if workers are available and there are remaining works to be distributed, distribute works """
-            index_worker = 0  # initialize the index of the worker
-            while (
-                len(q_batch) > 0
-                and (
-                    arr_num_batch_being_processed
-                    < int_max_num_batches_in_a_queue_for_each_worker
-                ).sum()
-                > 0
-            ):  # if there is remaining batch to be distributed or at least at least one worker should be available
-                if (
-                    arr_num_batch_being_processed[index_worker]
-                    <= arr_num_batch_being_processed.mean()
-                    and arr_num_batch_being_processed[index_worker]
-                    < int_max_num_batches_in_a_queue_for_each_worker
-                ):  # the load of the current worker should be below the threshold # if the load for the current worker is below the pool average, assign the work to the process (load-balancing)
-                    l_pipe_sender_input[index_worker].send(q_batch.pop())
-                    arr_num_batch_being_processed[index_worker] += 1
-                index_worker = (
-                    1 + index_worker
-                ) % int_num_batch_processing_workers  # retrieve index_worker of the next worker
+                    # update the statistics
+                    index_batch, float_time_dispatched = l_q_batch_dispatched[
+                        index_worker
+                    ].popleft()
+                    arr_num_batches_processed[index_worker] += 1
+                    arr_seconds_busy[index_worker] += float_time - max(
+                        float_time_dispatched, arr_time_last_completion[index_worker]
+                    )  # the worker is considered busy since the batch was dispatched or the previous batch was completed
+                    arr_time_last_completion[index_worker] = float_time
+
+                    # send the result back to the main process
+                    if flag_deliver_results_in_order:
+                        dict_res_waiting[index_batch] = res
+                        while int_index_batch_to_deliver in dict_res_waiting:
+                            pipe_sender_output_to_main_process.send(
+                                dict_res_waiting.pop(int_index_batch_to_deliver)
+                            )
+                            int_index_batch_to_deliver += 1
+                    else:
+                        pipe_sender_output_to_main_process.send(res)
 
         # notify batch-processing workers that all workers are completed
         for pipe_s in l_pipe_sender_input:
             pipe_s.send(None)
         # notify the main process that all batches have been processed
         pipe_sender_output_to_main_process.send(None)
+        # send the statistics to the main process
+        with np.errstate(divide="ignore", invalid="ignore"):
+            arr_throughput = np.where(
+                arr_seconds_busy > 0, arr_num_batches_processed / arr_seconds_busy, 0
+            )
+        pipe_sender_output_to_main_process.send(
+            {
+                "l_int_num_batches": arr_num_batches_processed.tolist(),
+                "l_float_seconds_busy": arr_seconds_busy.tolist(),
+                "l_float_throughput": arr_throughput.tolist(),
+                "float_seconds_elapsed": time.time() - float_time_start,
+            }
+        )
         return
 
     int_num_batch_processing_workers = max(
         1, int_num_threads - 2
     )  # retrieve the number of workers for processing batches # minimum number of worker is 1
+    int_max_num_batches_in_a_queue_for_each_worker = max(
+        1, int(int_max_num_batches_in_a_queue_for_each_worker)
+    )  # at least one batch should be distributed to each worker
     # compose pipes
     l_pipes_input = list(mp.Pipe() for i in range(int_num_batch_processing_workers))
     l_pipes_output = list(mp.Pipe() for i in range(int_num_batch_processing_workers))
     pipe_sender_output_to_main_process, pipe_receiver_output_to_main_process = mp.Pipe()
+    # create shared memory ring buffers for the workers
+    if flag_use_shared_memory and os.path.exists("/dev/shm"):
+        stat_shm = os.statvfs("/dev/shm")
+        int_num_bytes_shared_memory_buffer = min(
+            int_num_bytes_shared_memory_buffer,
+            stat_shm.f_bavail
+            * stat_shm.f_frsize
+            // (2 * int_num_batch_processing_workers),
+        )  # use at most the half of the available space, since writing to the shared memory beyond the available space will crash the process
+        if (
+            int_num_bytes_shared_memory_buffer < 2**20
+        ):  # if the available space is too small, do not use shared memory
+            flag_use_shared_memory = False
+    l_ring_buffer = (
+        list(
+            SharedMemoryRingBuffer(int_num_bytes_shared_memory_buffer)
+            for i in range(int_num_batch_processing_workers)
+        )
+        if flag_use_shared_memory
+        else None
+    )
     # compose workers
     l_batch_processing_workers = list(
         mp.Process(
-            target=process_batch, args=(l_pipes_input[i][1], l_pipes_output[i][0])
+            target=process_batch,
+            args=(
+                l_pipes_input[i][1],
+                (
+                    SharedMemoryPipeSender(l_pipes_output[i][0], l_ring_buffer[i])
+                    if flag_use_shared_memory
+                    else l_pipes_output[i][0]
+                ),
+            ),
         )
         for i in range(int_num_batch_processing_workers)
     )  # compose a list of batch processing workers
@@ -781,20 +1146,59 @@ def Multiprocessing_Batch_Generator_and_Workers(
         p.start()
     p_batch_generating_worker.start()
 
-    # post-process batches
-    while True:
-        res = pipe_receiver_output_to_main_process.recv()
-        if res is None:
-            break
-        if post_process_batch is not None:
-            post_process_batch(
-                res
-            )  # process the result returned by the 'process_batch' function in the 'MAIN PROCESS', serializing potentially not thread/process-safe operations in the main thread.
-
-    # if 'flag_wait_for_a_response_from_worker_after_sending_termination_signal' is True, wait until a response is received from the worker
-    if flag_wait_for_a_response_from_worker_after_sending_termination_signal:
-        for s, r in l_pipes_output:  # pipe receiving responses from batch workers
-            r.recv()
+    try:
+        # post-process batches
+        while True:
+            res = pipe_receiver_output_to_main_process.recv()
+            if res is None:
+                break
+            flag_release_shared_memory = (
+                flag_use_shared_memory
+                and flag_release_shared_memory_after_post_processing
+            )
+            if post_process_batch is not None:
+                post_process_batch(
+                    Unpack_Shared_Memory_Objects(res)
+                    if flag_release_shared_memory
+                    else res
+                )  # process the result returned by the 'process_batch' function in the 'MAIN PROCESS', serializing potentially not thread/process-safe operations in the main thread.
+            if flag_release_shared_memory:
+                Release_Shared_Memory_Objects(res)
+        dict_stat = (
+            pipe_receiver_output_to_main_process.recv()
+        )  # receive the statistics from the batch generating worker
+
+        # if 'flag_wait_for_a_response_from_worker_after_sending_termination_signal' is True, wait until a response is received from the worker
+        if flag_wait_for_a_response_from_worker_after_sending_termination_signal:
+            for s, r in l_pipes_output:  # pipe receiving responses from batch workers
+                r.recv()
+
+        # wait until all arrays in the shared memory have been released by the consumer
+        if flag_use_shared_memory and post_process_batch is not None:
+            float_time_start_waiting = time.time()
+            while not all(ring_buffer.is_empty for ring_buffer in l_ring_buffer):
+                if any(
+                    not p.is_alive() for p in l_process_releasing_shared_memory
+                ) and not all(
+                    ring_buffer.is_empty for ring_buffer in l_ring_buffer
+                ):  # check again after the exit of a process, since the process could have exited after releasing all arrays
+                    raise RuntimeError(
+                        "a process releasing the arrays in the shared memory has exited before all arrays have been released"
+                    )
+                if (
+                    float_seconds_timeout_for_releasing_shared_memory is not None
+                    and time.time() - float_time_start_waiting
+                    > float_seconds_timeout_for_releasing_shared_memory
+                ):
+                    raise TimeoutError(
+                        f"the arrays in the shared memory have not been released within {float_seconds_timeout_for_releasing_shared_memory} seconds"
+                    )
+                time.sleep(0.01)
+    finally:
+        if flag_use_shared_memory:
+            for ring_buffer in l_ring_buffer:
+                ring_buffer.unlink()
+    return dict_stat
 
 
 def Multiprocessing(
@@ -47,6 +47,7 @@ import matplotlib.pyplot as plt
 import scipy.sparse
 import io
 import concurrent.futures  # for multiprocessing
+import collections
 
 pd.options.mode.chained_assignment = None  # default='warn' # to disable worining
 
@@ -401,16 +402,18 @@ def create_ramtx_from_mtx(
     dtype_sparse_mtx_index=np.float64,
     int_num_of_records_in_a_chunk_zarr_matrix: int = 20000,
     int_num_of_entries_in_a_chunk_zarr_matrix_index: int = 1000,
+    flag_compact_sparse_layout: bool = False,
     chunks_dense: tuple = (2000, 1000),
     int_num_bytes_in_a_chunk_in_a_chunk_metadata: int = 320000,
     flag_combine_duplicate_records: bool = False,
+    flag_use_numeric_engine: bool = True,
     file_system_operator_pool: Union[
         None, managers.FileSystemOperatorPool
     ] = None,  # the managers.FileSystemOperatorPool object to utilized for multiprocessing on remote objects.
     verbose: bool = False,
     flag_debugging: bool = False,
 ):
-    """# 2023-01-19 02:05:12
+    """# 2026-10-17 18:06:45
     sort a given mtx file in a very time- and memory-efficient manner, and create sparse (sorted by barcode/feature).
     when 'type' == 'dense', create a dense ramtx object in the given output folder without sorting the input mtx file in the given axis ('flag_mtx_sorted_by_id_feature')
 
@@ -422,6 +425,7 @@ def create_ramtx_from_mtx(
     'int_buffer_size' : the number of entries for each batch that will be given to 'pipe_sender'. increasing this number will reduce the overhead associated with interprocess-communication through pipe, but will require more memory usage
     'flag_debugging' : if True, does not delete temporary files
     flag_combine_duplicate_records : bool = False # by default, it has been set to False to increase the performance. if True, for duplicate records in the given matrix market file, values will be summed. (for example, if ( 1, 2, 10 ) and ( 1, 2, 5 ) records will be combined into ( 1, 2, 15 )).
+    flag_use_numeric_engine : bool = True # if True, parse the input matrix market file as blocks of numeric arrays and sort the records using numpy (much faster than the line-based parsing and merge sorting, which will be used if False)
     file_system_operator_pool : Union[None, managers.FileSystemOperatorPool] = None, # the managers.FileSystemOperatorPool object to utilized for multiprocessing on remote objects.
 
     -- for sparse ramtx creation --
@@ -430,11 +434,12 @@ def create_ramtx_from_mtx(
     'flag_dtype_is_float' : set this flag to True to export float values to the output mtx matrix
     'int_num_threads_for_writing' : the number of threads for gzip writer. if 'int_num_threads' > 1, pgzip will be used to write the output gzip file. please note that pgzip (multithreaded version of gzip module) has some memory-leaking issue for large inputs.
     'int_num_records_in_a_chunk' : the number of maximum records in a chunk
-    'int_num_threads_for_chunking' : number of workers for sorting and writing operations. the number of worker for reading the input gzip file will be 1.
+    'int_num_threads_for_chunking' : number of workers for sorting and writing operations. the same number of threads will be used for decompressing the input gzip file. if the input matrix has been split (see 'MTX_10X_Split'), the split files will be read instead.
     'dtype_sparse_mtx' (default: np.float64), dtype of the output zarr array for storing sparse matrix
     'dtype_sparse_mtx_index' (default: np.float64) : dtype of the output zarr array for storing sparse matrix indices
     'int_num_of_records_in_a_chunk_zarr_matrix' : chunk size for output zarr mtx object (sparse ramtx)
     'int_num_of_entries_in_a_chunk_zarr_matrix_index' : chunk size for output zarr mtx index object (sparse ramtx)
+    flag_compact_sparse_layout : bool = False # if True, write the sparse ramtx in the compact (v2) layout, in which the indices (uint32) and the values (float32 if 'flag_dtype_is_float' is True, else uint32) of the records are stored in separate Zarr arrays and the index is stored as int64 ('dtype_sparse_mtx' and 'dtype_sparse_mtx_index' will be ignored)
 
     -- for dense ramtx creation --
     'dtype_dense_mtx' (default: np.float64), dtype of the output zarr array for storing dense matrix
@@ -479,6 +484,9 @@ def create_ramtx_from_mtx(
     )  # retrieve metadata of mtx
     # create an output directory
     fo.mkdir(path_folder_output, exist_ok=True)
+    ZarrChunkCache.invalidate_all(
+        path_folder_output
+    )  # drop the cached chunks of the previous RAMtx at the output folder
     path_folder_temp = f"{path_folder_output}temp_{bk.UUID( )}/"
     fo.mkdir(path_folder_temp, exist_ok=True)
 
@@ -494,20 +502,43 @@ def create_ramtx_from_mtx(
             dtype_mtx=dtype_dense_mtx,
             int_num_workers_for_writing_ramtx=int_num_threads_for_chunking,
             flag_combine_duplicate_records=flag_combine_duplicate_records,
+            flag_use_numeric_engine=flag_use_numeric_engine,
+            int_num_threads_for_decompression=int_num_threads_for_chunking,
         )
     else:  # build sparse ramtx
         flag_mtx_sorted_by_id_feature = (
             "feature" in mode
         )  # retrieve a flag whether to sort ramtx by id_feature or id_barcode.
         # open persistent zarr arrays to store matrix and matrix index
-        path_za_mtx = f"{path_folder_output}matrix.zarr"
-        zs.open(
-            path_za_mtx,
-            mode="w",
-            shape=(int_num_records, 2),
-            chunks=(int_num_of_records_in_a_chunk_zarr_matrix, 2),
-            dtype=dtype_sparse_mtx,
-        )  # each mtx record will contains two values instead of three values for more compact storage
+        path_za_mtx_data = None
+        if flag_compact_sparse_layout:
+            # in the compact layout, indices and values are stored in separate arrays with their native dtypes
+            path_za_mtx = f"{path_folder_output}matrix.indices.zarr"
+            path_za_mtx_data = f"{path_folder_output}matrix.data.zarr"
+            dtype_sparse_mtx_index = np.int64
+            zs.open(
+                path_za_mtx,
+                mode="w",
+                shape=(int_num_records,),
+                chunks=(int_num_of_records_in_a_chunk_zarr_matrix,),
+                dtype=np.uint32,
+            )
+            zs.open(
+                path_za_mtx_data,
+                mode="w",
+                shape=(int_num_records,),
+                chunks=(int_num_of_records_in_a_chunk_zarr_matrix,),
+                dtype=np.float32 if flag_dtype_is_float else np.uint32,
+            )
+        else:
+            path_za_mtx = f"{path_folder_output}matrix.zarr"
+            zs.open(
+                path_za_mtx,
+                mode="w",
+                shape=(int_num_records, 2),
+                chunks=(int_num_of_records_in_a_chunk_zarr_matrix, 2),
+                dtype=dtype_sparse_mtx,
+            )  # each mtx record will contains two values instead of three values for more compact storage
         path_za_mtx_index = f"{path_folder_output}matrix.index.zarr"
         zs.open(
             path_za_mtx_index,
@@ -531,8 +562,12 @@ def create_ramtx_from_mtx(
             int_num_threads_for_writing=int_num_threads_for_writing,
             int_max_num_input_files_for_each_merge_sort_worker=int_max_num_input_files_for_each_merge_sort_worker,
             int_num_chunks_to_combine_before_concurrent_merge_sorting=int_num_chunks_to_combine_before_concurrent_merge_sorting,
-            path_za_mtx=f"{path_folder_output}matrix.zarr",
-            path_za_mtx_index=f"{path_folder_output}matrix.index.zarr",
+            za_mtx=zarr.open(path_za_mtx, "a"),
+            za_mtx_index=zarr.open(path_za_mtx_index, "a"),
+            za_mtx_data=(
+                None if path_za_mtx_data is None else zarr.open(path_za_mtx_data, "a")
+            ),
+            flag_use_numeric_engine=flag_use_numeric_engine,
         )
 
     """
@@ -643,6 +678,7 @@ def create_ramtx_from_mtx(
     }
     if mode.lower() != "dense":
         dict_metadata["flag_ramtx_sorted_by_id_feature"] = flag_mtx_sorted_by_id_feature
+        dict_metadata["flag_compact_sparse_layout"] = flag_compact_sparse_layout
 
     fo.mkdir(path_folder_output, exist_ok=True)
     fo.write_json_files(
@@ -678,9 +714,11 @@ def create_ramdata_from_mtx(
     dtype_sparse_mtx_index=np.float64,
     int_num_of_records_in_a_chunk_zarr_matrix: int = 20000,
     int_num_of_entries_in_a_chunk_zarr_matrix_index: int = 1000,
+    flag_compact_sparse_layout: bool = False,
     chunks_dense: tuple = (2000, 1000),
     int_num_bytes_in_a_chunk_in_a_chunk_metadata: int = 320000,
     flag_combine_duplicate_records: bool = False,
+    flag_use_numeric_engine: bool = True,
     flag_multiprocessing: bool = True,
     file_system_operator_pool: Union[
         None, managers.FileSystemOperatorPool
@@ -688,7 +726,7 @@ def create_ramdata_from_mtx(
     verbose: bool = False,
     flag_debugging: bool = False,
 ):
-    """# 2022-12-13 22:25:38
+    """# 2026-10-17 16:48:52
     sort a given mtx file in a very time- and memory-efficient manner, and create sparse (sorted by barcode/feature).
     when 'type' == 'dense', create a dense ramtx object in the given output folder without sorting the input mtx file in the given axis ('flag_mtx_sorted_by_id_feature')
 
@@ -702,6 +740,7 @@ def create_ramdata_from_mtx(
     'int_buffer_size' : the number of entries for each batch that will be given to 'pipe_sender'. increasing this number will reduce the overhead associated with interprocess-communication through pipe, but will require more memory usage
     'flag_debugging' : if True, does not delete temporary files
     flag_combine_duplicate_records : bool = False # by default, it has been set to False to increase the performance. if True, for duplicate records in the given matrix market file, values will be summed. (for example, if ( 1, 2, 10 ) and ( 1, 2, 5 ) records will be combined into ( 1, 2, 15 )).
+    flag_use_numeric_engine : bool = True # if True, parse the input matrix market file as blocks of numeric arrays and sort the records using numpy (much faster than the line-based parsing and merge sorting, which will be used if False)
     file_system_operator_pool : Union[None, managers.FileSystemOperatorPool] = None, # the managers.FileSystemOperatorPool object to utilized for multiprocessing on remote objects.
 
     -- for sparse ramtx creation --
@@ -717,6 +756,7 @@ def create_ramdata_from_mtx(
     'dtype_sparse_mtx_index' (default: np.float64) : dtype of the output zarr array for storing sparse matrix indices
     'int_num_of_records_in_a_chunk_zarr_matrix' : chunk size for output zarr mtx object (sparse ramtx)
     'int_num_of_entries_in_a_chunk_zarr_matrix_index' : chunk size for output zarr mtx index object (sparse ramtx)
+    flag_compact_sparse_layout : bool = False # if True, write sparse ramtx objects in the compact (v2) layout (see 'create_ramtx_from_mtx')
 
     -- for dense ramtx creation --
     'dtype_dense_mtx' (default: np.float64), dtype of the output zarr array for storing dense matrix
@@ -770,11 +810,13 @@ def create_ramdata_from_mtx(
         "dtype_dense_mtx": dtype_dense_mtx,
         "dtype_sparse_mtx": dtype_sparse_mtx,
         "dtype_sparse_mtx_index": dtype_sparse_mtx_index,
+        "flag_compact_sparse_layout": flag_compact_sparse_layout,
         "int_num_of_records_in_a_chunk_zarr_matrix": int_num_of_records_in_a_chunk_zarr_matrix,
         "int_num_of_entries_in_a_chunk_zarr_matrix_index": int_num_of_entries_in_a_chunk_zarr_matrix_index,
         "chunks_dense": chunks_dense,
         "int_num_bytes_in_a_chunk_in_a_chunk_metadata": int_num_bytes_in_a_chunk_in_a_chunk_metadata,
         "flag_combine_duplicate_records": flag_combine_duplicate_records,
+        "flag_use_numeric_engine": flag_use_numeric_engine,
         "verbose": verbose,
         "flag_debugging": flag_debugging,
         "file_system_operator_pool": fop,
@@ -873,6 +915,7 @@ def create_ramtx_from_adata(
     int_num_of_entries_in_a_chunk_zarr_matrix_index: int = 1000,
     int_num_of_entries_in_a_batch_for_writing_sparse_matrix: int = 350,
     float_ratio_padding_for_zarr_sparse_matrix_output: float = 0.5,
+    flag_compact_sparse_layout: bool = False,
     chunks_dense: tuple = (2000, 1000),
     int_num_bytes_in_a_chunk_in_a_chunk_metadata: int = 320000,
     int_max_num_categories_in_metadata: int = 10000,
@@ -889,7 +932,7 @@ def create_ramtx_from_adata(
     verbose: bool = False,
     flag_debugging: bool = False,
 ):
-    """# 2023-11-15 17:47:57
+    """# 2026-10-17 15:40:18
     Write a given AnnData object as a RAMtx object
 
     Arguments:
@@ -909,6 +952,7 @@ def create_ramtx_from_adata(
     'int_num_of_entries_in_a_chunk_zarr_matrix_index' : chunk size for output zarr mtx index object (sparse ramtx)
     int_num_of_entries_in_a_batch_for_writing_sparse_matrix : int = 350 # the number of entries in a batch for writing a sparse matrix
     float_ratio_padding_for_zarr_sparse_matrix_output : float = 0.5 # the ratio of the padding relative to the length of the sparse matrix for padding to accomodate fragmentations from multi-processing.
+    flag_compact_sparse_layout : bool = False # if True, write the sparse ramtx in the compact (v2) layout, in which the indices (uint32) and the values (the dtype of 'adata.X') of the records are stored in separate Zarr arrays and the index is stored as int64 ('dtype_sparse_mtx' and 'dtype_sparse_mtx_index' will be ignored)
 
     -- for dense ramtx --
     'dtype_dense_mtx' (default: np.float64), dtype of the output zarr array for storing dense matrix
@@ -948,6 +992,9 @@ def create_ramtx_from_adata(
     )  # retrieve metadata of mtx
     # create an output directory
     fo.mkdir(path_folder_output, exist_ok=True)
+    ZarrChunkCache.invalidate_all(
+        path_folder_output
+    )  # drop the cached chunks of the previous RAMtx at the output folder
     path_folder_temp = f"{path_folder_output}temp_{bk.UUID( )}/"
     fo.mkdir(path_folder_temp, exist_ok=True)
 
@@ -1017,19 +1064,36 @@ def create_ramtx_from_adata(
         # open persistent zarr arrays to store matrix and matrix index
         path_za_mtx = f"{path_folder_output}matrix.zarr"
         path_za_mtx_index = f"{path_folder_output}matrix.index.zarr"
-        zs.open(
-            path_za_mtx,
-            mode="w",
-            shape=(
-                int(
-                    int_num_records
-                    * (1 + float_ratio_padding_for_zarr_sparse_matrix_output)
-                ),
-                2,
-            ),
-            chunks=(int_num_of_records_in_a_chunk_zarr_matrix, 2),
-            dtype=dtype_sparse_mtx,
-        )  # each mtx record will contains two values instead of three values for more compact storage # initialize the matrix with a sufficiently large padding
+        int_len_mtx = int(
+            int_num_records * (1 + float_ratio_padding_for_zarr_sparse_matrix_output)
+        )  # initialize the matrix with a sufficiently large padding
+        if flag_compact_sparse_layout:
+            # in the compact layout, indices and values are stored in separate arrays with their native dtypes
+            path_za_mtx = f"{path_folder_output}matrix.data.zarr"
+            path_za_mtx_indices = f"{path_folder_output}matrix.indices.zarr"
+            dtype_sparse_mtx_index = np.int64
+            zs.open(
+                path_za_mtx_indices,
+                mode="w",
+                shape=(int_len_mtx,),
+                chunks=(int_num_of_records_in_a_chunk_zarr_matrix,),
+                dtype=np.uint32,
+            )
+            zs.open(
+                path_za_mtx,
+                mode="w",
+                shape=(int_len_mtx,),
+                chunks=(int_num_of_records_in_a_chunk_zarr_matrix,),
+                dtype=adata.X.dtype,
+            )
+        else:
+            zs.open(
+                path_za_mtx,
+                mode="w",
+                shape=(int_len_mtx, 2),
+                chunks=(int_num_of_records_in_a_chunk_zarr_matrix, 2),
+                dtype=dtype_sparse_mtx,
+            )  # each mtx record will contains two values instead of three values for more compact storage
         zs.open(
             path_za_mtx_index,
             mode="w",
@@ -1093,14 +1157,14 @@ def create_ramtx_from_adata(
                 # prepare next chunks
                 int_pos = int_pos_end  # update 'int_pos'
                 if (
-                    int_pos % int_num_of_entries_in_a_chunk_zarr_matrix_index
+                    int_pos // int_num_of_entries_in_a_chunk_zarr_matrix_index
                     > int_index_chunk_of_mtx_index
                 ):  # if the updated position mapped to the different chunks from the previous chunks
                     int_index_worker = (
                         int_index_worker + 1
                     ) % int_num_workers  # change worker process
                     int_index_chunk_of_mtx_index = (
-                        int_pos % int_num_of_entries_in_a_chunk_zarr_matrix_index
+                        int_pos // int_num_of_entries_in_a_chunk_zarr_matrix_index
                     )  # update 'int_index_chunk_of_mtx_index'
                 int_index_chunk_of_mtx += int(
                     np.ceil(int_num_records / int_num_of_records_in_a_chunk_zarr_matrix)
@@ -1117,6 +1181,8 @@ def create_ramtx_from_adata(
             zs = fop.get_zarr_objects()
             zs.open(path_za_mtx, "a")
             zs.open(path_za_mtx_index, "a")
+            if flag_compact_sparse_layout:
+                zs.open(path_za_mtx_indices, "a")
             while True:
                 ins = pipe_receiver.recv()
                 if ins is None:
@@ -1163,13 +1229,25 @@ def create_ramtx_from_adata(
                     + int_num_records,
                 )
                 arr_index += st  # add the offset from the start of the sparse matrix to the index coordinates
-                zs.set_orthogonal_selection(
-                    path_za_mtx,
-                    slice(st, en),
-                    np.vstack(
-                        (arr_int_entry_of_the_axis_not_for_querying, arr_value)
-                    ).T,
-                )
+                if flag_compact_sparse_layout:
+                    zs.set_orthogonal_selection(
+                        path_za_mtx_indices,
+                        slice(st, en),
+                        arr_int_entry_of_the_axis_not_for_querying,
+                    )
+                    zs.set_orthogonal_selection(
+                        path_za_mtx,
+                        slice(st, en),
+                        arr_value,
+                    )
+                else:
+                    zs.set_orthogonal_selection(
+                        path_za_mtx,
+                        slice(st, en),
+                        np.vstack(
+                            (arr_int_entry_of_the_axis_not_for_querying, arr_value)
+                        ).T,
+                    )
                 zs.set_orthogonal_selection(
                     path_za_mtx_index,
                     sorted(set(arr_int_entry_of_the_axis_for_querying)),
@@ -1345,6 +1423,7 @@ def create_ramtx_from_adata(
     }
     if mode.lower() != "dense":
         dict_metadata["flag_ramtx_sorted_by_id_feature"] = flag_mtx_sorted_by_id_feature
+        dict_metadata["flag_compact_sparse_layout"] = flag_compact_sparse_layout
     fo.mkdir(path_folder_output, exist_ok=True)
     fo.write_json_files(
         {
@@ -1362,6 +1441,87 @@ def create_ramtx_from_adata(
     logger.info(f"Exporting of a RAMtx object at '{path_folder_output}' was completed")
 
 
+def get_names_of_ramtx_arrays(dict_metadata: dict):
+    """# 2026-10-17 19:10:27
+    return the names of the zarr arrays storing the matrix (and the index) of a RAMtx, based on its metadata
+    """
+    if dict_metadata["mode"] == "dense":
+        return ["matrix.zarr"]
+    elif dict_metadata.get("flag_compact_sparse_layout", False):
+        return ["matrix.index.zarr", "matrix.indices.zarr", "matrix.data.zarr"]
+    else:
+        return ["matrix.index.zarr", "matrix.zarr"]
+
+
+def convert_ramtx_to_memmap_layout(
+    path_folder_ramtx: str,
+    int_num_bytes_in_a_batch: int = 2**28,
+    flag_revert: bool = False,
+):
+    """# 2026-10-17 19:10:27
+    add the uncompressed (memory-mapped) layout to a local RAMtx object.
+    the matrix (and the index) of the RAMtx are written as uncompressed NumPy arrays ('.npy' files, next to the zarr arrays, e.g. 'matrix.index.npy' for 'matrix.index.zarr') that can be opened with 'np.memmap'. RAMtx objects opened afterwards retrieve data by slicing the memory-mapped arrays without decompression and copying, and forked workers share the OS page cache.
+    the zarr arrays are kept (the other operations of the RAMtx use the zarr arrays), and the size of the RAMtx on disk increases by the size of the uncompressed arrays.
+
+    path_folder_ramtx : str # the local path to the RAMtx object
+    int_num_bytes_in_a_batch : int = 2 ** 28 # the approximate number of bytes of the data to convert at a time
+    flag_revert : bool = False # if True, remove the uncompressed layout from the RAMtx object
+    """
+    if is_remote_url(path_folder_ramtx):
+        raise ValueError(
+            f"the memory-mapped layout is only available for a local RAMtx, but '{path_folder_ramtx}' was given"
+        )
+    path_folder_ramtx = path_folder_ramtx.rstrip("/") + "/"
+    path_file_zattrs = f"{path_folder_ramtx}.zattrs"
+    with open(path_file_zattrs) as file:
+        dict_attrs = json.load(file)
+    dict_metadata = dict_attrs["dict_metadata"]
+    l_name_za = get_names_of_ramtx_arrays(dict_metadata)
+
+    if flag_revert:
+        dict_metadata.pop("flag_memmap_layout", None)
+        with open(path_file_zattrs, "w") as file:
+            json.dump(dict_attrs, file)
+        for name_za in l_name_za:
+            path_file_npy = f"{path_folder_ramtx}{name_za[: -len( '.zarr' )]}.npy"
+            if os.path.exists(path_file_npy):
+                os.remove(path_file_npy)
+        return
+
+    for name_za in l_name_za:
+        za = zarr.open(f"{path_folder_ramtx}{name_za}", mode="r")
+        path_file_npy = f"{path_folder_ramtx}{name_za[: -len( '.zarr' )]}.npy"
+        path_file_npy_temp = f"{path_file_npy}.{bk.UUID( )}.tmp"
+        arr_out = np.lib.format.open_memmap(
+            path_file_npy_temp, mode="w+", dtype=za.dtype, shape=za.shape
+        )
+        # copy the data in batches of rows aligned to the chunk boundaries
+        int_num_bytes_in_a_row = max(
+            1, int(np.prod(za.shape[1:], dtype=np.int64)) * za.dtype.itemsize
+        )
+        int_num_rows_in_a_batch = max(
+            za.chunks[0],
+            int_num_bytes_in_a_batch
+            // int_num_bytes_in_a_row
+            // za.chunks[0]
+            * za.chunks[0],
+        )
+        for st in range(0, za.shape[0], int_num_rows_in_a_batch):
+            en = min(za.shape[0], st + int_num_rows_in_a_batch)
+            arr_out[st:en] = za[st:en]
+        arr_out.flush()
+        del arr_out
+        os.replace(path_file_npy_temp, path_file_npy)  # write the array atomically
+
+    # update the metadata
+    dict_metadata["flag_memmap_layout"] = True
+    with open(path_file_zattrs, "w") as file:
+        json.dump(dict_attrs, file)
+    logger.info(
+        f"the memory-mapped layout has been added to the RAMtx object at '{path_folder_ramtx}'"
+    )
+
+
 def create_ramdata_from_adata(
     adata,
     path_folder_ramdata_output: str,
@@ -1375,6 +1535,7 @@ def create_ramdata_from_adata(
     int_num_of_entries_in_a_chunk_zarr_matrix_index: int = 1000,
     int_num_of_entries_in_a_batch_for_writing_sparse_matrix: int = 350,
     float_ratio_padding_for_zarr_sparse_matrix_output: float = 0.5,
+    flag_compact_sparse_layout: bool = False,
     chunks_dense: tuple = (2000, 1000),
     int_num_bytes_in_a_chunk_in_a_chunk_metadata: int = 320000,
     int_max_num_categories_in_metadata: int = 10000,
@@ -1392,7 +1553,7 @@ def create_ramdata_from_adata(
     verbose: bool = False,
     flag_debugging: bool = False,
 ):
-    """# 2023-03-07 22:13:58
+    """# 2026-10-17 16:20:05
     Write a given AnnData object as a RamData object
 
     Arguments:
@@ -1412,6 +1573,7 @@ def create_ramdata_from_adata(
     'dtype_sparse_mtx_index' (default: np.float64) : dtype of the output zarr array for storing sparse matrix indices
     'int_num_of_records_in_a_chunk_zarr_matrix' : chunk size for output zarr mtx object (sparse ramtx)
     'int_num_of_entries_in_a_chunk_zarr_matrix_index' : chunk size for output zarr mtx index object (sparse ramtx)
+    flag_compact_sparse_layout : bool = False # if True, write sparse ramtx objects in the compact (v2) layout (see 'create_ramtx_from_adata')
     int_num_of_entries_in_a_batch_for_writing_sparse_matrix : int = 350 # the number of entries in a batch for writing a sparse matrix
     float_ratio_padding_for_zarr_sparse_matrix_output : float = 0.5 # the ratio of the padding relative to the length of the sparse matrix for padding to accomodate fragmentations from multi-processing.
 
@@ -1460,6 +1622,7 @@ def create_ramdata_from_adata(
         "dtype_dense_mtx": dtype_dense_mtx,
         "dtype_sparse_mtx": dtype_sparse_mtx,
         "dtype_sparse_mtx_index": dtype_sparse_mtx_index,
+        "flag_compact_sparse_layout": flag_compact_sparse_layout,
         "int_num_of_records_in_a_chunk_zarr_matrix": int_num_of_records_in_a_chunk_zarr_matrix,
         "int_num_of_entries_in_a_chunk_zarr_matrix_index": int_num_of_entries_in_a_chunk_zarr_matrix_index,
         "int_num_of_entries_in_a_batch_for_writing_sparse_matrix": int_num_of_entries_in_a_batch_for_writing_sparse_matrix,
@@ -3719,6 +3882,10 @@ class ZarrDataFrame:
                         fill_value=fill_value,
                     )  # create a new Zarr object if the object does not exist.
 
+                    ZarrChunkCache.invalidate_all(
+                        path_folder_col
+                    )  # drop the cached chunks of a previous column at the same path
+
                     # write metadata
                     self._fo.write_json_file(
                         path_folder_col + ".zattrs",
@@ -3992,13 +4159,21 @@ class ZarrDataFrame:
                     values = self._zs.get_coordinate_selection(path_za, coords)
                 else:
                     # use orthogonal selection as a default
-                    values = (
-                        self._zs.get_orthogonal_selection(
-                            path_za, tuple([coords] + list(coords_rest))
-                        )
+                    selection = (
+                        tuple([coords] + list(coords_rest))
                         if flag_indexing_in_non_primary_axis
-                        else self._zs.get_orthogonal_selection(path_za, coords)
+                        else coords
                     )
+                    values = (
+                        zarr_chunk_cache.get_orthogonal_selection(
+                            self._zs,
+                            selection,
+                            path_za,
+                            chunk_fetcher=zarr_chunk_fetcher,
+                        )
+                        if is_remote_url(path_za)
+                        else self._zs.get_orthogonal_selection(path_za, selection)
+                    )  # retrieve chunks of a remote column concurrently through the chunk caches
 
                 # check whether the current column contains categorical data
                 l_value_unique = self.get_categories(
@@ -4538,6 +4713,9 @@ class ZarrDataFrame:
                     else values
                 )
         finally:
+            ZarrChunkCache.invalidate_all(
+                f"{self._path_folder_zdf}{name_folder}/"
+            )  # drop the cached chunks of the (partially) rewritten column
             if self.use_locking:  # %% FILE LOCKING %%
                 if (
                     not flag_lock_already_acquired
@@ -4581,6 +4759,9 @@ class ZarrDataFrame:
                 path_prefix_col + "/",
             ):  # delete the folder if the folder exists
                 self._fo.rm(path_prefix_col + "/")
+            ZarrChunkCache.invalidate_all(
+                path_prefix_col + "/"
+            )  # drop the cached chunks of the deleted column
 
     def __repr__(self):
         """# 2022-07-20 23:00:15"""
@@ -5837,6 +6018,335 @@ class IndexMappingDictionary:
             < self._int_length_component_axis + self._int_offset
         )
 
+    def map_array(self, arr_int_entry: np.ndarray):
+        """# 2026-10-17 10:02:11
+        perform mapping of an array of integer indices using offset arithmetic. entries that cannot be mapped will be marked by -1
+        """
+        arr_int_entry = np.asarray(arr_int_entry, dtype=np.int64)
+        if self._flag_component_to_combined:
+            arr_mask_valid = (0 <= arr_int_entry) & (
+                arr_int_entry < self._int_length_component_axis
+            )
+            arr_int_entry_mapped = arr_int_entry + self._int_offset
+        else:
+            arr_mask_valid = (self._int_offset <= arr_int_entry) & (
+                arr_int_entry < self._int_length_component_axis + self._int_offset
+            )
+            arr_int_entry_mapped = arr_int_entry - self._int_offset
+        arr_int_entry_mapped[~arr_mask_valid] = -1  # mark invalid mappings
+        return arr_int_entry_mapped
+
+
+class StringIndexMapping:
+    """# 2026-10-17 22:41:05
+    a light-weight, array-backed class for representing dictionary for mapping string representations to integer representations of the entries.
+    string representations are stored as a sorted numpy array of byte strings, and queries are mapped using a binary search ('np.searchsorted'), so that a large number of entries can be mapped without creating Python objects for each entry.
+    when duplicated string representations were given, the last integer representation will be used (same as the dictionary).
+
+    'arr_str' : string representations of the entries
+    'arr_int_entry' : integer representations of the entries
+    """
+
+    def __init__(self, arr_str, arr_int_entry):
+        """# 2026-10-17 22:41:05"""
+        arr_str_encoded = self._encode(arr_str)
+        arr_int_entry = np.asarray(arr_int_entry, dtype=np.int64)
+        arr_index_sorted = np.argsort(
+            arr_str_encoded, kind="stable"
+        )  # entries with the same string representations will be sorted by the order of the input
+        arr_str_encoded = arr_str_encoded[arr_index_sorted]
+        arr_int_entry = arr_int_entry[arr_index_sorted]
+        if len(arr_str_encoded) > 1:  # keep the last entry of the duplicated entries
+            arr_mask_last = np.ones(len(arr_str_encoded), dtype=bool)
+            arr_mask_last[:-1] = arr_str_encoded[1:] != arr_str_encoded[:-1]
+            if not arr_mask_last.all():
+                arr_str_encoded = arr_str_encoded[arr_mask_last]
+                arr_int_entry = arr_int_entry[arr_mask_last]
+        # set attributes
+        self._arr_str_sorted = arr_str_encoded
+        self._arr_int_entry = arr_int_entry
+
+    @staticmethod
+    def _encode(arr_str):
+        """# 2026-10-17 22:41:05
+        encode string representations into a numpy array of byte strings
+        """
+        arr_str = np.asarray(arr_str)
+        if arr_str.dtype.kind == "S":
+            return arr_str
+        try:  # encode ASCII strings without Python-level iteration
+            return arr_str.astype(bytes)
+        except UnicodeEncodeError:
+            return np.char.encode(arr_str.astype(str), "utf-8")
+
+    def map_array(self, arr_str) -> np.ndarray:
+        """# 2026-10-17 22:41:05
+        perform mapping of an array of string representations. entries that cannot be mapped will be marked by -1
+        """
+        arr_str_query = self._encode(arr_str).ravel()
+        arr_int_entry_mapped = np.full(len(arr_str_query), -1, dtype=np.int64)
+        if len(self._arr_str_sorted) == 0 or len(arr_str_query) == 0:
+            return arr_int_entry_mapped
+        arr_index = np.searchsorted(self._arr_str_sorted, arr_str_query)
+        arr_index[arr_index == len(self._arr_str_sorted)] = 0  # clip the indices
+        arr_mask_valid = self._arr_str_sorted[arr_index] == arr_str_query
+        arr_int_entry_mapped[arr_mask_valid] = self._arr_int_entry[
+            arr_index[arr_mask_valid]
+        ]
+        return arr_int_entry_mapped
+
+    def __len__(self):
+        """# 2026-10-17 22:41:05"""
+        return len(self._arr_str_sorted)
+
+    def __getitem__(self, str_entry):
+        """# 2026-10-17 22:41:05
+        perform mapping
+        """
+        int_entry = self.map_array([str_entry])[0]
+        if int_entry < 0:
+            raise KeyError(str_entry)
+        return int(int_entry)
+
+    def __contains__(self, str_entry):
+        """# 2026-10-17 22:41:05"""
+        return isinstance(str_entry, str) and self.map_array([str_entry])[0] >= 0
+
+    def get(self, str_entry, default=None):
+        """# 2026-10-17 22:41:05"""
+        return self[str_entry] if str_entry in self else default
+
+    def keys(self):
+        """# 2026-10-17 22:41:05
+        iterate through string representations in the order of the integer representations
+        """
+        for str_entry_encoded in self._arr_str_sorted[
+            np.argsort(self._arr_int_entry, kind="stable")
+        ]:
+            yield str_entry_encoded.decode()
+
+    def values(self):
+        """# 2026-10-17 22:41:05
+        iterate through integer representations in the order of the integer representations
+        """
+        return iter(np.sort(self._arr_int_entry).tolist())
+
+    def items(self):
+        """# 2026-10-17 22:41:05"""
+        return zip(self.keys(), self.values())
+
+    def __iter__(self):
+        """# 2026-10-17 22:41:05"""
+        return self.keys()
+
+
+def convert_mapping_to_array(dict_mapping):
+    """# 2026-10-17 10:05:40
+    convert a dictionary mapping integer indices to integer indices into a dense numpy array, in which -1 indicates an invalid mapping, so that an array of integer indices can be mapped with a single fancy-indexing operation.
+    numpy arrays (e.g. 'dict_change' implemented as an array) and 'IndexMappingDictionary' objects (mapped using offset arithmetic) will be returned without modification.
+
+    dict_mapping : Union[ dict, np.ndarray, IndexMappingDictionary ] # a mapping object
+    """
+    if isinstance(dict_mapping, (np.ndarray, IndexMappingDictionary)):
+        return dict_mapping
+    int_num_records = len(dict_mapping)
+    arr_key = np.fromiter(dict_mapping.keys(), dtype=np.int64, count=int_num_records)
+    arr_mapping = np.full(
+        arr_key.max() + 1 if int_num_records > 0 else 0, -1, dtype=np.int64
+    )  # initialize the array
+    arr_mapping[arr_key] = np.fromiter(
+        dict_mapping.values(), dtype=np.int64, count=int_num_records
+    )
+    return arr_mapping
+
+
+def map_integer_indices(arr_mapping, arr_int_entry: np.ndarray):
+    """# 2026-10-17 10:11:02
+    map an array of integer indices using a mapping array (or an 'IndexMappingDictionary' object) returned by 'convert_mapping_to_array'. entries that cannot be mapped will be marked by -1
+
+    arr_mapping : Union[ np.ndarray, IndexMappingDictionary ] # a mapping object
+    arr_int_entry : np.ndarray # an array of integer indices to map
+    """
+    if isinstance(arr_mapping, IndexMappingDictionary):
+        return arr_mapping.map_array(arr_int_entry)
+    arr_int_entry = np.asarray(arr_int_entry, dtype=np.int64)
+    arr_mask_valid = (0 <= arr_int_entry) & (arr_int_entry < len(arr_mapping))
+    if (
+        arr_mask_valid.all()
+    ):  # if all entries are in the valid range, gather the mapped values directly
+        return arr_mapping[arr_int_entry]
+    arr_int_entry_mapped = np.full(len(arr_int_entry), -1, dtype=arr_mapping.dtype)
+    arr_int_entry_mapped[arr_mask_valid] = arr_mapping[arr_int_entry[arr_mask_valid]]
+    return arr_int_entry_mapped
+
+
+def find_labels_with_largest_sum_of_weights(
+    arr_label_code: np.ndarray,
+    arr_weight: Union[np.ndarray, None] = None,
+    int_num_labels: Union[int, None] = None,
+    int_max_num_values_in_a_batch: int = 2**24,
+):
+    """# 2026-10-17 19:42:18
+    for each row of label codes (e.g. the labels of the nearest neighbors of an entry), find the label code with the largest sum of weights (weighted voting) using 'np.bincount'. when multiple labels have the largest sum of weights, the label appearing first in the row will be returned.
+
+    arr_label_code : np.ndarray # a 2D array of non-negative integer label codes (e.g. the 'inverse' returned by 'np.unique')
+    arr_weight : Union[ np.ndarray, None ] = None # a 2D array of weights with the same shape as 'arr_label_code'. if None is given, each label will have the same weight (majority voting)
+    int_num_labels : Union[ int, None ] = None # the number of labels. by default, inferred from 'arr_label_code'
+    int_max_num_values_in_a_batch : int = 2 ** 24 # the maximum number of values in the (rows x labels) array of the sums of weights, which will be processed at a time
+    """
+    arr_label_code = np.asarray(arr_label_code, dtype=np.int64)
+    int_num_rows, int_num_cols = arr_label_code.shape
+    if int_num_labels is None:
+        int_num_labels = int(arr_label_code.max()) + 1 if arr_label_code.size > 0 else 0
+    arr_label_code_output = np.zeros(int_num_rows, dtype=np.int64)
+    int_num_rows_in_a_batch = max(
+        1, int_max_num_values_in_a_batch // max(1, int_num_labels)
+    )
+    for st in range(0, int_num_rows, int_num_rows_in_a_batch):
+        en = min(int_num_rows, st + int_num_rows_in_a_batch)
+        arr_code = arr_label_code[st:en]
+        int_n = en - st
+        # sum weights of each label for each row (bincount adds the weights in the order of the neighbors)
+        arr_sum = np.bincount(
+            (np.arange(int_n)[:, None] * int_num_labels + arr_code).ravel(),
+            weights=None if arr_weight is None else arr_weight[st:en].ravel(),
+            minlength=int_n * int_num_labels,
+        ).reshape(int_n, int_num_labels)
+        # find the first column of each row containing a label with the largest sum of weights
+        arr_col = (
+            np.take_along_axis(arr_sum, arr_code, axis=1)
+            == arr_sum.max(axis=1)[:, None]
+        ).argmax(axis=1)
+        arr_label_code_output[st:en] = arr_code[np.arange(int_n), arr_col]
+    return arr_label_code_output
+
+
+def assign_using_nearest_neighbors(
+    neighbors: np.ndarray,
+    distances: np.ndarray,
+    y_knnindex: np.ndarray,
+    flag_embedder: bool = True,
+    y_std_threshold: Union[np.ndarray, None] = None,
+    y_dist_threshold: Union[float, None] = None,
+    func_find_mask_not_outlier: Union[Callable, None] = None,
+    arr_label_code: Union[np.ndarray, None] = None,
+    arr_label: Union[np.ndarray, None] = None,
+):
+    """# 2026-10-17 19:42:18
+    assign labels (classifier) or embeddings (embedder) to a batch of query entries using the y values of their nearest neighbors in a kNN index, with weights inversely proportional to the distances. all entries of the batch are processed at once.
+    when a neighbor with a zero distance exists, the y value of the first zero-distance neighbor is used.
+
+    neighbors : np.ndarray # (n_entries, n_neighbors) array of the integer indices of the neighbors in the kNN index
+    distances : np.ndarray # (n_entries, n_neighbors) array of the distances to the neighbors (sorted in the ascending order)
+    y_knnindex : np.ndarray # y values of the entries in the kNN index
+    flag_embedder : bool = True # if True, calculate the weighted average of the embeddings. if False, find the label with the largest sum of weights
+
+    === embedder ===
+    y_std_threshold : Union[ np.ndarray, None ] = None # when the standard deviation of the embeddings of the neighbors exceeds this threshold in any dimension, the neighbors of the entry are considered to contain outliers. if None, outliers will not be detected.
+    y_dist_threshold : Union[ float, None ] = None # neighbors whose embeddings are farther than this distance from the embedding of the closest neighbor will be excluded as outliers
+    func_find_mask_not_outlier : Union[ Callable, None ] = None # a function that takes the embeddings and the weights of the neighbors of a single entry and returns the mask of neighbors that are not outliers. if given, it will be used for the entries containing outliers, instead of the distance-based exclusion (slow fallback)
+
+    === classifier ===
+    arr_label_code : Union[ np.ndarray, None ] = None # the integer codes of the labels of the entries in the kNN index (e.g. returned by 'pd.factorize( y_knnindex )'). should be given together with 'arr_label' to avoid encoding the labels of the index for every batch. if None, the labels will be encoded.
+    arr_label : Union[ np.ndarray, None ] = None # the unique labels corresponding to the integer codes
+
+    returns:
+    arr_y_assigned, int_num_entries_with_outliers_not_filtered
+    """
+    int_num_entries = len(neighbors)
+    # locate neighbors with zero distance
+    arr_mask_zero_distance = distances == 0
+    arr_flag_zero_distance = arr_mask_zero_distance.any(axis=1)
+    arr_col_zero_distance = arr_mask_zero_distance.argmax(axis=1)
+    # calculate weights based on distances (the weights of entries with zero-distance neighbors will not be used)
+    with np.errstate(divide="ignore"):
+        arr_weight = np.where(arr_flag_zero_distance[:, None], 1, 1 / distances)
+
+    int_num_entries_with_outliers_not_filtered = 0
+    if flag_embedder:  # %% EMBEDDER %%
+        y_knnindex_of_entries = y_knnindex[
+            neighbors
+        ]  # retrieve y-values of the neighbors (n_entries, n_neighbors, n_dimensions)
+        if y_std_threshold is not None:
+            # detect whether outliers are included in the neighbors (since knnindex is linear, but most embeddings are non-linear, knn-distance based method can identify very distant points in the embedding, and averaging these points should be avoided)
+            arr_flag_outlier = (
+                y_knnindex_of_entries.std(axis=1) > y_std_threshold
+            ).any(axis=1) & ~arr_flag_zero_distance
+            if arr_flag_outlier.any():
+                arr_mask_not_outlier = np.ones(arr_weight.shape, dtype=bool)
+                arr_idx_outlier = np.where(arr_flag_outlier)[0]
+                if func_find_mask_not_outlier is None:
+                    # exclude the neighbors outside the radius of the threshold distance from the closest neighbor, for all entries at once
+                    y_of_entries_with_outliers = y_knnindex_of_entries[arr_idx_outlier]
+                    arr_mask_not_outlier[arr_idx_outlier] = (
+                        np.sqrt(
+                            (
+                                (
+                                    y_of_entries_with_outliers
+                                    - y_of_entries_with_outliers[:, :1]
+                                )
+                                ** 2
+                            ).sum(axis=2)
+                        )
+                        < y_dist_threshold
+                    )
+                else:  # slow fallback, processing entries containing outliers one by one
+                    for i in arr_idx_outlier:
+                        arr_mask_not_outlier[i] = func_find_mask_not_outlier(
+                            y_knnindex_of_entries[i], arr_weight[i]
+                        )
+                int_num_entries_with_outliers_not_filtered = int(
+                    arr_mask_not_outlier[arr_idx_outlier].all(axis=1).sum()
+                )
+                arr_weight = arr_weight * arr_mask_not_outlier  # exclude the outliers
+        # calculate the weighted average of the y values
+        arr_y_assigned = np.einsum(
+            "ij,ijk->ik", arr_weight, y_knnindex_of_entries
+        ) / arr_weight.sum(axis=1, keepdims=True)
+    else:  # %% CLASSIFIER %%
+        if arr_label_code is None or arr_label is None:
+            arr_label_code, arr_label = pd.factorize(
+                y_knnindex, use_na_sentinel=False
+            )  # encode labels (any hashable values) as integer codes
+        arr_y_assigned = np.asarray(arr_label)[
+            find_labels_with_largest_sum_of_weights(
+                arr_label_code[neighbors], arr_weight, len(arr_label)
+            )
+        ]  # find the label with the maximum weight
+    # use the y value of the first zero-distance neighbor
+    if arr_flag_zero_distance.any():
+        arr_y_assigned[arr_flag_zero_distance] = y_knnindex[
+            neighbors[
+                arr_flag_zero_distance, arr_col_zero_distance[arr_flag_zero_distance]
+            ]
+        ]
+    return arr_y_assigned, int_num_entries_with_outliers_not_filtered
+
+
+def get_igraph_from_adjacency(adjacency, directed=None):
+    """# 2026-10-17 22:05:12
+    Get igraph graph from adjacency matrix.
+    this code is mostly a copy of a function implemented in scanpy 'https://github.com/scverse/scanpy/blob/536ed15bc73ab5d1131c0d530dd9d4f2dc9aee36/scanpy/_utils/__init__.py'
+    """
+    import igraph as ig
+
+    sources, targets = adjacency.nonzero()
+    weights = adjacency[sources, targets]
+    if isinstance(weights, np.matrix):
+        weights = weights.A1
+    g = ig.Graph(directed=directed)
+    g.add_vertices(adjacency.shape[0])  # this adds adjacency.shape[0] vertices
+    g.add_edges(list(zip(sources, targets)))
+    try:
+        g.es["weight"] = weights
+    except KeyError:
+        pass
+    if g.vcount() != adjacency.shape[0]:
+        logger.info(
+            f"The constructed graph has only {g.vcount( )} nodes. Your adjacency matrix contained redundant nodes."
+        )
+    return g
+
 
 class RamDataAxis:
     """# 2023-05-14 22:36:21
@@ -6792,17 +7302,19 @@ class RamDataAxis:
             ):  # only build 'dict_change' if a filter is active or at least one entry is not active
                 n = len(ba)
                 n_active_entries = ba.count()
-                # initialize dictionary
-                dict_change = (
-                    np.full(n, -1, dtype=dtype)
-                    if (n_active_entries / n)
+                if (
+                    (n_active_entries / n)
                     > float_min_proportion_of_active_entries_in_an_axis_for_using_array
-                    else dict()
-                )  # implement a dictionary using an array if the proportion of active entries in the axis is larger than the given threshold to reduce the memory footprint and increase the efficiency of conversion process # when an array is used for 'dict_change', -1 indicates an invalid mapping
-                for i, e in enumerate(
-                    BA.to_integer_indices(ba)
-                ):  # iterate through 'int_entry' of the active entries
-                    dict_change[e] = i
+                ):  # implement a dictionary using an array if the proportion of active entries in the axis is larger than the given threshold to reduce the memory footprint and increase the efficiency of conversion process # when an array is used for 'dict_change', -1 indicates an invalid mapping
+                    arr_mask = BA.to_array(ba)
+                    dict_change = np.cumsum(arr_mask, dtype=dtype)
+                    dict_change -= 1  # the index of each active entry in the view
+                    dict_change[~arr_mask] = -1
+                    del arr_mask
+                else:
+                    dict_change = dict(
+                        zip(BA.to_integer_indices(ba).tolist(), range(n_active_entries))
+                    )
         elif len(l_entry_view) > 0:  # if 'l_entry' is valid
             """
             using a list of integer/string representations of the entries to create a view
@@ -6813,30 +7325,31 @@ class RamDataAxis:
             ):  # if string representations of the entries were given
                 # load mapping for string representations of the current axis using the given 'int_index_str_rep'
                 self.load_str(int_index_col=int_index_str_rep)
-                dict_mapping = self.map_str  # retrieve the mapping of the current axis
-                l_int_entry_view = list(
-                    dict_mapping[str_entry_view]
-                    if str_entry_view in dict_mapping
-                    else -1
-                    for str_entry_view in l_entry_view
-                )  # convert to 'l_int_entry_view'
+                l_int_entry_view = self.map_str.map_array(
+                    l_entry_view
+                )  # convert to 'l_int_entry_view' using the mapping of the current axis
 
             # initialize dictionary
+            arr_int_entry_view = np.asarray(l_int_entry_view, dtype=np.int64)
             n_active_entries = len(
-                l_int_entry_view
+                arr_int_entry_view
             )  # assumes all given entries for creating a view is valid
             n = self.int_num_entries
-            dict_change = (
-                np.full(n, -1, dtype=dtype)
-                if (n_active_entries / n)
-                > float_min_proportion_of_active_entries_in_an_axis_for_using_array
-                else dict()
-            )  # implement a dictionary using an array if the proportion of active entries in the axis is larger than the given threshold to reduce the memory footprint and increase the efficiency of conversion process # when an array is used for 'dict_change', -1 indicates an invalid mapping
-            for int_index_view, int_entry_view in enumerate(l_int_entry_view):
-                if (
-                    0 <= int_entry_view < self.int_num_entries
-                ):  # if 'int_entry_view' is in a valid range
-                    dict_change[int_entry_view] = int_index_view  # build 'dict_change'
+            arr_int_index_view = np.flatnonzero(
+                (0 <= arr_int_entry_view) & (arr_int_entry_view < n)
+            )  # retrieve the indices of the entries in a valid range
+            arr_int_entry_view = arr_int_entry_view[arr_int_index_view]
+            if (
+                n_active_entries / n
+            ) > float_min_proportion_of_active_entries_in_an_axis_for_using_array:  # implement a dictionary using an array if the proportion of active entries in the axis is larger than the given threshold to reduce the memory footprint and increase the efficiency of conversion process # when an array is used for 'dict_change', -1 indicates an invalid mapping
+                dict_change = np.full(n, -1, dtype=dtype)
+                dict_change[arr_int_entry_view] = (
+                    arr_int_index_view  # build 'dict_change'
+                )
+            else:
+                dict_change = dict(
+                    zip(arr_int_entry_view.tolist(), arr_int_index_view.tolist())
+                )  # build 'dict_change'
         self.dict_change = dict_change  # load 'dict_change'
 
     def destroy_view(self):
@@ -7041,6 +7554,15 @@ class RamDataAxis:
                 else:  # if the number of active entries is smaller than the threshold, use the
                     queries = BA.to_integer_indices(queries)
 
+            if is_remote_url(
+                path_folder_str_zarr
+            ):  # retrieve chunks of a remote zarr object concurrently through the chunk caches
+                return zarr_chunk_cache.get_orthogonal_selection(
+                    self._zs,
+                    (queries, int_index_col),
+                    path_folder_str_zarr,
+                    chunk_fetcher=zarr_chunk_fetcher,
+                )
             return self._zs.get_orthogonal_selection(
                 path_folder_str_zarr, (queries, int_index_col)
             )
@@ -7085,8 +7607,8 @@ class RamDataAxis:
         flag_load_list_of_str_repr_for_autocompletion: bool = True,
         flag_load_without_updating_mapping: bool = False,
     ):
-        """# 2022-09-12 02:28:49
-        load string representation of all the active entries of the current axis, and retrieve a mapping from string representation to integer representation
+        """# 2026-10-17 22:41:05
+        load string representation of all the active entries of the current axis, and retrieve a mapping from string representation to integer representation ('StringIndexMapping' object)
 
         'int_index_col' : default value is 'self.int_index_str_rep'
         float_min_proportion_of_active_entries_for_using_array_as_dict : float = 0.1 : A threshold for the transition from dictionary to array datatype for the mapping. empirically, dictionary of the same length takes about ~10 times more memory than the array.
@@ -7115,22 +7637,21 @@ class RamDataAxis:
         """
         if not flag_load_without_updating_mapping:
             # str > integer mapping
-            self._dict_str_to_i = dict((e, i) for e, i in zip(arr_str, arr_int_entry))
+            self._dict_str_to_i = StringIndexMapping(
+                arr_str, arr_int_entry
+            )  # array-backed mapping using a binary search
 
             # integer > str mapping
             n = (
                 self.meta._n_rows_unfiltered
             )  # retrieve the number of entries in the unfiltered metadata
-            dict_i_to_str = (
-                np.zeros(n, dtype=object)
-                if (self.meta.n_rows / n)
-                > float_min_proportion_of_active_entries_for_using_array_as_dict
-                else dict()
-            )  # implement a dictionary using an array if the proportion of active rows of ZarrDataFrame is larger than the given threshold to reduce the memory footprint and increase the efficiency of access
-            for int_entry, str_entry in zip(
-                arr_int_entry, arr_str
-            ):  # iterate through data values of the active rows
-                dict_i_to_str[int_entry] = str_entry
+            if (
+                self.meta.n_rows / n
+            ) > float_min_proportion_of_active_entries_for_using_array_as_dict:  # implement a dictionary using an array if the proportion of active rows of ZarrDataFrame is larger than the given threshold to reduce the memory footprint and increase the efficiency of access # when an array is used, None indicates an invalid mapping
+                dict_i_to_str = np.full(n, None, dtype=object)
+                dict_i_to_str[arr_int_entry] = arr_str
+            else:
+                dict_i_to_str = dict(zip(arr_int_entry.tolist(), arr_str))
             self._dict_i_to_str = dict_i_to_str
             del dict_i_to_str
 
@@ -7265,14 +7786,13 @@ class RamDataAxis:
                 flag_unload_str = True
                 self.load_str()
 
-            dict_mapping = self.map_str  # retrieve a dictionary for mapping str to int
-            for e in l:
-                if e in dict_mapping:
-                    i = dict_mapping[e]
-                    if ba_filter[
-                        i
-                    ]:  # if the entry is acitve in the filter (or filter objec containing all active entries)
-                        ba_filter_of_selected_entries[i] = True
+            arr_int_entry = self.map_str.map_array(
+                l
+            )  # map str to int using the mapping of the current axis
+            ba_filter_of_selected_entries = BA.from_integer_indices_to_bitarray(
+                np.unique(arr_int_entry[arr_int_entry >= 0]), n
+            )
+            ba_filter_of_selected_entries &= ba_filter  # retrieve the entries acitve in the filter (or filter objec containing all active entries)
 
             # unload str data
             if flag_unload_str:
@@ -7855,20 +8375,15 @@ class RamDataAxis:
                 self.load_str()
 
             # map string representations to the integer representations of the entries
-            l_int_entry = []
-            l_mask_mapped_to_int_entry = []
-            dict_map_str = self.map_str  # retrieve mapping
-            for e in df.index.values:
-                if e in dict_map_str:
-                    l_int_entry.append(dict_map_str[e])
-                    l_mask_mapped_to_int_entry.append(True)
-                else:
-                    l_mask_mapped_to_int_entry.append(False)
+            arr_int_entry = self.map_str.map_array(df.index.values)  # retrieve mapping
+            l_mask_mapped_to_int_entry = arr_int_entry >= 0
 
             # exclude entries whose string representations cannot be mapped to the string representations loaded in the current axis object
             if np.sum(l_mask_mapped_to_int_entry) < len(df):
                 df = df[l_mask_mapped_to_int_entry]
-            df.index = l_int_entry  # convert index entries fro string representations to integer representations of the entries
+            df.index = arr_int_entry[
+                l_mask_mapped_to_int_entry
+            ]  # convert index entries fro string representations to integer representations of the entries
 
         # update the metadata
         self.meta.update(df, flag_use_index_as_integer_indices=True)
@@ -7889,9 +8404,16 @@ class RamDataAxis:
         # retrieve string representations (if string repr. have been already loaded)
         if self.flag_str_repr_loaded:  # if string repr. have been already loaded
             dict_map_int = self.map_int  # retrieve mapping
-            df.index = list(
-                dict_map_int[e] if e in dict_map_int else e for e in df.index.values
-            )  # map integer representations to string representations
+            if isinstance(dict_map_int, np.ndarray):  # mapping implemented as an array
+                arr_int_entry = df.index.values
+                arr_str = dict_map_int[arr_int_entry]
+                arr_mask_not_mapped = pd.isnull(arr_str)
+                arr_str[arr_mask_not_mapped] = arr_int_entry[arr_mask_not_mapped]
+                df.index = list(arr_str)
+            else:
+                df.index = list(
+                    dict_map_int[e] if e in dict_map_int else e for e in df.index.values
+                )  # map integer representations to string representations
         return df
 
     @property
@@ -7975,6 +8497,8 @@ class RAMtx:
     'rtx_template' : a RAMtx object to use as a template (copy arguments except for 'l_rtx', 'rtx_template', 'flag_spawn')
     'flag_spawn' : if True, use zarr server with a spawned process to perform zarr operations. When multiprocessing using forked processes is used, zarr operations that are not fork-safe should be performed within a spawned process.
     'dict_metadata' : Union[ None, dict ] = None, # dict_metadata of the 'RAMtx' component. if None is given, it will be loaded from the storage. This argument can be used to reduce the loading time of the RAMtx component.
+    'chunk_cache' : Union[ None, ZarrChunkCache ] = None, # the cache of decoded zarr chunks used for retrieving data. if None is given, the default cache shared across RAMtx objects in the current process ('zarr_chunk_cache') will be used. to disable caching, use ZarrChunkCache( 0 ).
+    'chunk_fetcher' : Union[ None, bool, ZarrChunkFetcher ] = None, # the fetcher used for retrieving (and prefetching) multiple chunks concurrently. if None is given, the default fetcher ('zarr_chunk_fetcher') will be used for a RAMtx hosted remotely (HTTP or AWS S3), and chunks of a local RAMtx will be retrieved through the zarr objects. if False is given, the fetcher will not be used.
 
     === arguments for combined RAMtx ===
     'l_rtx' : list of component RAMtx object for the 'combined' mode. to disable 'combined' mode, set this argument to None
@@ -8014,6 +8538,8 @@ class RAMtx:
         rtx_template=None,
         dict_metadata: Union[None, dict] = None,
         flag_spawn=False,
+        chunk_cache=None,
+        chunk_fetcher=None,
         spinlockfileholder: Union[None, managers.SpinLockFileHolder] = None,
         file_system_operator_pool: Union[
             None, managers.FileSystemOperatorPool
@@ -8051,6 +8577,8 @@ class RAMtx:
             self.int_total_number_of_values_in_a_batch_for_dense_matrix = (
                 rtx_template.int_total_number_of_values_in_a_batch_for_dense_matrix
             )
+            self._chunk_cache = rtx_template._chunk_cache
+            self._chunk_fetcher = rtx_template._chunk_fetcher
 
             # set read-only attributes
             self._flag_spawn = flag_spawn
@@ -8085,6 +8613,14 @@ class RAMtx:
             self.int_total_number_of_values_in_a_batch_for_dense_matrix = (
                 int_total_number_of_values_in_a_batch_for_dense_matrix
             )
+            self._chunk_cache = (
+                zarr_chunk_cache if chunk_cache is None else chunk_cache
+            )  # use the default chunk cache shared across RAMtx objects
+            self._chunk_fetcher = (
+                (zarr_chunk_fetcher if is_remote_url(path_folder_ramtx) else None)
+                if chunk_fetcher is None
+                else (None if chunk_fetcher is False else chunk_fetcher)
+            )  # by default, use the chunk fetcher for remote RAMtx
             self._l_rtx = l_rtx
             # set read-only attributes
             self._flag_spawn = flag_spawn
@@ -8217,12 +8753,16 @@ class RAMtx:
         )
 
         # load zarr objects, a file system server, and settings required for RAMtx operations
+        self._dict_memmap = (
+            dict()
+        )  # path_folder_zarr > memory-mapped array (only used in the memory-mapped layout)
         if not self.is_combined:
             # open zarr objects
             self._is_sparse = (
                 self.mode != "dense"
             )  # retrieve a flag indicating whether ramtx is dense
             self._path_za_mtx = f"{self._path_folder_ramtx}matrix.zarr"
+            self._path_za_mtx_indices = None  # only used in the compact sparse layout
             if self.is_sparse:
                 self._is_for_querying_features = self._dict_metadata[
                     "flag_ramtx_sorted_by_id_feature"
@@ -8233,6 +8773,17 @@ class RAMtx:
                     self._path_za_mtx_index,
                     "r",
                 )
+                if (
+                    self.is_compact_sparse_layout
+                ):  # in the compact sparse layout, indices and values are stored in separate arrays
+                    self._path_za_mtx = f"{self._path_folder_ramtx}matrix.data.zarr"
+                    self._path_za_mtx_indices = (
+                        f"{self._path_folder_ramtx}matrix.indices.zarr"
+                    )
+                    self._zs.open_array(
+                        self._path_za_mtx_indices,
+                        "r",
+                    )
                 self._zs.open_array(
                     self._path_za_mtx,
                     "r",
@@ -8245,6 +8796,7 @@ class RAMtx:
                     self._path_za_mtx,
                     "r",
                 )
+            self._load_memmap()  # open the memory-mapped arrays, if available
         else:
             # %% COMBINED %%
             self._is_sparse = None
@@ -8259,6 +8811,190 @@ class RAMtx:
         """# 2023-04-12 17:19:28"""
         return self._path_folder_ramtx
 
+    @property
+    def chunk_cache(self):
+        """# 2026-10-17 10:48:03
+        the cache of decoded zarr chunks used for retrieving data
+        """
+        return self._chunk_cache
+
+    @property
+    def chunk_fetcher(self):
+        """# 2026-10-17 16:40:12
+        the fetcher used for retrieving (and prefetching) multiple chunks concurrently. None if chunks are retrieved through the zarr objects.
+        """
+        return self._chunk_fetcher
+
+    @property
+    def is_memmap_layout(self):
+        """# 2026-10-17 19:10:27
+        return True if the matrix (and the index) of the RAMtx are available as uncompressed, memory-mapped arrays (see 'convert_ramtx_to_memmap_layout')
+        """
+        return self._dict_metadata.get("flag_memmap_layout", False)
+
+    def _load_memmap(self):
+        """# 2026-10-17 19:10:27
+        open the uncompressed arrays of the memory-mapped layout as read-only memory maps. the arrays will not be used for a remote RAMtx.
+        """
+        self._dict_memmap = dict()
+        if not self.is_memmap_layout or is_remote_url(self._path_folder_ramtx):
+            return
+        for name_za in get_names_of_ramtx_arrays(self._dict_metadata):
+            path_file_npy = f"{self._path_folder_ramtx}{name_za[: -len( '.zarr' )]}.npy"
+            if not os.path.exists(path_file_npy):  # fall back to the zarr arrays
+                self._dict_memmap = dict()
+                return
+            self._dict_memmap[f"{self._path_folder_ramtx}{name_za}"] = np.load(
+                path_file_npy, mmap_mode="r"
+            )
+
+    def convert_to_memmap_layout(self, **kwargs):
+        """# 2026-10-17 19:10:27
+        add the uncompressed (memory-mapped) layout to the current RAMtx, and start using the memory-mapped arrays for retrieving data
+
+        **kwargs # arguments for 'convert_ramtx_to_memmap_layout'
+        """
+        if self.is_combined:
+            raise NotImplementedError(
+                "the memory-mapped layout cannot be added to a combined RAMtx. please convert each component RAMtx"
+            )
+        convert_ramtx_to_memmap_layout(self._path_folder_ramtx, **kwargs)
+        self._dict_metadata = self._fo.read_json_file(
+            f"{self._path_folder_ramtx}.zattrs"
+        )["dict_metadata"]
+        self._load_memmap()
+
+    def _get_orthogonal_selection(self, path_folder_zarr: str, selection):
+        """# 2026-10-17 19:10:27
+        retrieve data of the zarr array through the chunk cache. in the memory-mapped layout, the data will be retrieved from the memory-mapped array (slices will be returned as views without copying)
+        """
+        if path_folder_zarr in self._dict_memmap:
+            arr = self._dict_memmap[path_folder_zarr]
+            if not isinstance(selection, tuple):
+                selection = (selection,)
+            if (
+                sum(not isinstance(e, (slice, int, np.integer)) for e in selection) > 1
+            ):  # orthogonal selection using multiple arrays of indices
+                selection = np.ix_(
+                    *(
+                        (
+                            np.arange(arr.shape[i])[e]
+                            if isinstance(e, slice)
+                            else np.atleast_1d(e)
+                        )
+                        for i, e in enumerate(selection)
+                    )
+                )
+            return arr[selection]
+        return self._chunk_cache.get_orthogonal_selection(
+            self._zs, selection, path_folder_zarr, chunk_fetcher=self._chunk_fetcher
+        )
+
+    def _prefetch_chunks(self, dict_chunks: dict):
+        """# 2026-10-17 16:40:12
+        start fetching the given chunks into the chunk cache in the background. the chunks exceeding a half of the cache size will not be prefetched, since they would be evicted before being used.
+
+        dict_chunks : dict # path_folder_zarr > list of the indices of the chunks (in the order of the retrieval)
+        """
+        if self._chunk_fetcher is None or not self._chunk_cache.is_enabled:
+            return
+        int_num_bytes_available = self._chunk_cache.int_max_num_bytes // 2
+        for path_folder_zarr, l_t_idx_chunk in dict_chunks.items():
+            prop = self._zs.properties[path_folder_zarr]
+            int_num_bytes_in_a_chunk = max(
+                1, int(np.prod(prop["chunks"])) * np.dtype(prop["dtype"]).itemsize
+            )
+            int_num_chunks = min(
+                len(l_t_idx_chunk), int_num_bytes_available // int_num_bytes_in_a_chunk
+            )
+            int_num_bytes_available -= int_num_chunks * int_num_bytes_in_a_chunk
+            if int_num_chunks > 0:
+                self._chunk_fetcher.prefetch(
+                    path_folder_zarr,
+                    l_t_idx_chunk[:int_num_chunks],
+                    self._chunk_cache,
+                )
+
+    def _prefetch_records(self, arr_index):
+        """# 2026-10-17 16:40:12
+        prefetch the chunks of the sparse matrix containing the records of the given index data ('arr_index', [ [ st, en ], ... ]) of the entries
+        """
+        if self._chunk_fetcher is None or not self._chunk_cache.is_enabled:
+            return
+        arr_index = np.asarray(arr_index, dtype=np.int64).reshape(-1, 2)
+        arr_index = arr_index[arr_index[:, 1] > arr_index[:, 0]]  # drop empty entries
+        if len(arr_index) == 0:
+            return
+        dict_chunks = dict()
+        for path_folder_zarr in (
+            [self._path_za_mtx, self._path_za_mtx_indices]
+            if self.is_compact_sparse_layout
+            else [self._path_za_mtx]
+        ):
+            prop = self._zs.properties[path_folder_zarr]
+            int_num_records_in_a_chunk = prop["chunks"][0]
+            int_num_chunks = -(-prop["shape"][0] // int_num_records_in_a_chunk)
+            # mark the chunks overlapping with the records of each entry
+            arr_count = np.zeros(int_num_chunks + 1, dtype=np.int64)
+            np.add.at(arr_count, arr_index[:, 0] // int_num_records_in_a_chunk, 1)
+            np.add.at(
+                arr_count, (arr_index[:, 1] - 1) // int_num_records_in_a_chunk + 1, -1
+            )
+            dict_chunks[path_folder_zarr] = list(
+                (int(idx_chunk),) + (0,) * (len(prop["chunks"]) - 1)
+                for idx_chunk in np.where(np.cumsum(arr_count[:-1]) > 0)[0]
+            )
+        self._prefetch_chunks(dict_chunks)
+
+    def prefetch(self, l_int_entry):
+        """# 2026-10-17 16:40:12
+        start fetching the chunks containing the data of the given entries into the chunk cache in the background (read-ahead), so that the data of the entries can be retrieved without waiting for the remote storage.
+        prefetching is only performed when a chunk fetcher is available (e.g. for a RAMtx hosted remotely).
+
+        l_int_entry # the list of the integer indices of the entries of the axis for querying
+        """
+        if (
+            self.is_combined
+            or self._chunk_fetcher is None
+            or not self._chunk_cache.is_enabled
+        ):
+            return
+        arr_int_entry = np.asarray(l_int_entry, dtype=np.int64)
+        if len(arr_int_entry) == 0:
+            return
+        if self.is_sparse:
+            self._prefetch_records(
+                self._get_orthogonal_selection(self._path_za_mtx_index, arr_int_entry)
+            )  # the index data is retrieved first to locate the records
+        else:
+            prop = self._zs.properties[self._path_za_mtx]
+            int_axis_for_querying = 1 if self.is_for_querying_features else 0
+            arr_idx_chunk_for_querying = np.unique(
+                arr_int_entry // prop["chunks"][int_axis_for_querying]
+            )
+            int_num_chunks_not_for_querying = -(
+                -prop["shape"][1 - int_axis_for_querying]
+                // prop["chunks"][1 - int_axis_for_querying]
+            )
+            self._prefetch_chunks(
+                {
+                    self._path_za_mtx: list(
+                        (
+                            (idx_chunk_not_for_querying, int(idx_chunk_for_querying))
+                            if self.is_for_querying_features
+                            else (
+                                int(idx_chunk_for_querying),
+                                idx_chunk_not_for_querying,
+                            )
+                        )
+                        for idx_chunk_not_for_querying in range(
+                            int_num_chunks_not_for_querying
+                        )
+                        for idx_chunk_for_querying in arr_idx_chunk_for_querying
+                    )
+                }
+            )
+
     @property
     def int_num_cpus(self):
         """# 2023-02-27 20:50:10
@@ -8363,6 +9099,13 @@ class RAMtx:
         """# 2022-08-04 13:59:15"""
         return self._is_sparse
 
+    @property
+    def is_compact_sparse_layout(self):
+        """# 2026-10-17 15:02:44
+        return True if the sparse RAMtx uses the compact (v2) layout, in which indices and values of the records are stored in separate 'matrix.indices.zarr' and 'matrix.data.zarr' arrays with their native dtypes (instead of a single float64 'matrix.zarr' array)
+        """
+        return self._dict_metadata.get("flag_compact_sparse_layout", False)
+
     @property
     def mode(self):
         """# 2022-07-30 20:13:32"""
@@ -9190,6 +9933,37 @@ class RAMtx:
                 True  # set the attribute indicating the reference has been dropped
             )
 
+    def _get_cached_array(self, name_cache: str, obj):
+        """# 2026-10-17 10:20:37
+        retrieve a dense numpy representation of a bitarray filter (a boolean mask) or a mapping object (an integer array or an 'IndexMappingDictionary' object, see 'convert_mapping_to_array').
+        the array computed in the previous call will be re-used if the content of the given object has not been changed.
+
+        name_cache : str # name of the cache slot
+        obj : Union[ None, bitarray, dict, np.ndarray, IndexMappingDictionary ] # a bitarray filter or a mapping object
+        """
+        if obj is None:
+            return None
+        if isinstance(
+            obj, (np.ndarray, IndexMappingDictionary)
+        ):  # used without conversion, and changes made in-place are always reflected
+            return obj
+        if not hasattr(self, "_dict_cache_array"):
+            self._dict_cache_array = dict()  # initialize the cache
+        if name_cache in self._dict_cache_array:
+            obj_cached, arr_cached = self._dict_cache_array[name_cache]
+            if (
+                type(obj_cached) is type(obj) and obj_cached == obj
+            ):  # bitarray and dict objects can be modified in-place, therefore the content of the object is compared with a copy
+                return arr_cached
+        if isinstance(obj, bitarray):
+            obj_cached, arr = bitarray(obj), BA.to_array(obj)  # copy the bitarray
+        else:
+            obj_cached, arr = dict(obj), convert_mapping_to_array(
+                obj
+            )  # copy the dictionary
+        self._dict_cache_array[name_cache] = (obj_cached, arr)  # update the cache
+        return arr
+
     def __getitem__(self, l_int_entry):
         """# 2022-09-20 18:13:41
         Retrieve data of a given list of entries from RAMtx as lists of values and arrays (i.e. sparse matrix), each value and array contains data of a single 'int_entry' of the indexed axis
@@ -9199,6 +9973,27 @@ class RAMtx:
         l_int_entry_of_axis_for_querying, l_arr_intinfor_entry_of_axis_not_for_querying, l_arr_value :
             'l_int_entry_of_axis_for_querying' only contains int_entry of valid entries
         """
+        return self._retrieve_data(l_int_entry)
+
+    def get_csr_block(self, l_int_entry):
+        """# 2026-10-17 11:20:15
+        Retrieve data of a given list of entries from RAMtx as a single CSR-like block, in which the records of all entries are stored in contiguous arrays.
+        Compared to '__getitem__', which returns a small array for each entry, the block can be directly used with numpy and scipy functions (e.g. np.add.reduceat or scipy.sparse.csr_matrix).
+
+        Returns:
+        arr_int_entry_of_axis_for_querying, arr_indptr, arr_int_entry_of_axis_not_for_querying, arr_value :
+            'arr_int_entry_of_axis_for_querying' only contains int_entry of valid entries
+            the records of the i-th entry of 'arr_int_entry_of_axis_for_querying' are stored in 'arr_int_entry_of_axis_not_for_querying[ arr_indptr[ i ] : arr_indptr[ i + 1 ] ]' and 'arr_value[ arr_indptr[ i ] : arr_indptr[ i + 1 ] ]'
+            in the memory-mapped layout, the arrays can be read-only views of the memory-mapped arrays (not copied), and should not be modified in-place.
+        """
+        return self._retrieve_data(l_int_entry, flag_return_block=True)
+
+    def _retrieve_data(self, l_int_entry, flag_return_block: bool = False):
+        """# 2026-10-17 11:24:40
+        Retrieve data of a given list of entries from RAMtx either as lists of values and arrays (see '__getitem__') or as a single CSR-like block (see 'get_csr_block').
+
+        flag_return_block : bool = False # if True, return the data as a CSR-like block
+        """
         """ prepare """
         # drop the RAMtx object of the reference
         self.drop_reference()
@@ -9215,6 +10010,33 @@ class RAMtx:
             l_arr_value,
         ) = ([], [], [])
 
+        def __concatenate_blocks(l_block):
+            """# 2026-10-17 11:31:07
+            concatenate a list of CSR-like blocks into a single block
+            """
+            if len(l_block) == 0:  # compose an empty block
+                return (
+                    np.zeros(0, dtype=np.int64),
+                    np.zeros(1, dtype=np.int64),
+                    np.zeros(0, dtype=self._dtype_of_feature_and_barcode_indices),
+                    np.zeros(0, dtype=self._dtype_of_values),
+                )
+            if len(l_block) == 1:
+                return l_block[0]
+            arr_indptr = np.zeros(
+                sum(len(block[0]) for block in l_block) + 1, dtype=np.int64
+            )
+            np.cumsum(
+                np.concatenate(list(np.diff(block[1]) for block in l_block)),
+                out=arr_indptr[1:],
+            )  # compose the indptr of the combined block
+            return (
+                np.concatenate(list(block[0] for block in l_block)),
+                arr_indptr,
+                np.concatenate(list(block[2] for block in l_block)),
+                np.concatenate(list(block[3] for block in l_block)),
+            )
+
         # wrap in a list if a single entry was queried
         if isinstance(
             l_int_entry, (int, np.int64, np.int32, np.int16, np.int8)
@@ -9256,16 +10078,18 @@ class RAMtx:
             l_int_entry = (
                 BA.to_integer_indices(ba_filter_axis_for_querying)
                 if flag_empty_input
-                else list(
-                    int_entry
-                    for int_entry in l_int_entry
-                    if ba_filter_axis_for_querying[int_entry]
-                )
+                else np.asarray(l_int_entry, dtype=np.int64)[
+                    self._get_cached_array(
+                        "filter_of_axis_for_querying", ba_filter_axis_for_querying
+                    )[np.asarray(l_int_entry, dtype=np.int64)]
+                ]
             )  # filter 'l_int_entry' or use the entries in the given filter (if no int_entry was given, use all active entries in the filter)
         # logger.info( f'l_int_entry: {len(l_int_entry)}' )
 
         # if no valid entries are available, return an empty result
         if len(l_int_entry) == 0:
+            if flag_return_block:
+                return __concatenate_blocks([])
             return (
                 l_int_entry_of_axis_for_querying,
                 l_arr_int_entry_of_axis_not_for_querying,
@@ -9288,6 +10112,42 @@ class RAMtx:
         # handle combined ramtx
         if self.is_combined:
             # %% COMBINED %%
+            if flag_return_block:
+                # collect blocks from each component
+                (
+                    arr_int_entry_of_axis_for_querying,
+                    arr_indptr,
+                    arr_int_entry_of_axis_not_for_querying,
+                    arr_value,
+                ) = __concatenate_blocks(
+                    list(
+                        rtx._retrieve_data(l_int_entry, flag_return_block=True)
+                        for rtx in self._l_rtx
+                        if rtx is not None
+                    )
+                )
+                # group the records by 'int_entry' (the order of the components will be preserved)
+                arr_int_entry_of_axis_for_querying = np.repeat(
+                    arr_int_entry_of_axis_for_querying, np.diff(arr_indptr)
+                )
+                arr_argsort = np.argsort(
+                    arr_int_entry_of_axis_for_querying, kind="stable"
+                )
+                (
+                    arr_int_entry_of_axis_for_querying,
+                    arr_int_num_records,
+                ) = np.unique(arr_int_entry_of_axis_for_querying, return_counts=True)
+                arr_indptr = np.zeros(
+                    len(arr_int_entry_of_axis_for_querying) + 1, dtype=np.int64
+                )
+                np.cumsum(arr_int_num_records, out=arr_indptr[1:])
+                return (
+                    arr_int_entry_of_axis_for_querying,
+                    arr_indptr,
+                    arr_int_entry_of_axis_not_for_querying[arr_argsort],
+                    arr_value[arr_argsort],
+                )
+
             # collect data from each component
             dict_data = dict()
             for rtx in self._l_rtx:
@@ -9360,14 +10220,10 @@ class RAMtx:
                 dict_change_int_entry_of_axis_for_querying = ram.bc.dict_change
                 dict_change_int_entry_of_axis_not_for_querying = ram.ft.dict_change
 
-        # compose a vectorized function for the conversion of int_entries of the non-indexed axis.
-        def f(i):
-            return dict_change_int_entry_of_axis_not_for_querying[i]
-
-        vchange_int_entry_of_axis_not_for_querying = (
-            np.vectorize(f)
-            if dict_change_int_entry_of_axis_not_for_querying is not None
-            else None
+        # retrieve an array for the conversion of int_entries of the non-indexed axis.
+        arr_change_int_entry_of_axis_not_for_querying = self._get_cached_array(
+            "view_of_axis_not_for_querying",
+            dict_change_int_entry_of_axis_not_for_querying,
         )
 
         """ create combined axis """
@@ -9395,14 +10251,12 @@ class RAMtx:
                     self._dict_index_mapping_from_component_to_combined_ft
                 )
 
-        # compose a vectorized function for the conversion of int_entry_component of the non-indexed axis.
-        def f_component(i):
-            return dict_change_int_entry_component_of_axis_not_for_querying[i]
-
-        vchange_int_entry_component_of_axis_not_for_querying = (
-            np.vectorize(f_component)
-            if dict_change_int_entry_component_of_axis_not_for_querying is not None
-            else None
+        # retrieve an array (or an object performing offset arithmetic) for the conversion of int_entry_component of the non-indexed axis.
+        arr_change_int_entry_component_of_axis_not_for_querying = (
+            self._get_cached_array(
+                "component_to_combined_of_axis_not_for_querying",
+                dict_change_int_entry_component_of_axis_not_for_querying,
+            )
         )
 
         """ change component """
@@ -9433,22 +10287,43 @@ class RAMtx:
                     ram.ft._dict_index_mapping_from_combined_to_dest_component
                 )
 
-        # compose a vectorized function for the conversion of int_entry_component of the non-indexed axis.
-        def f_combined(i):
-            return dict_change_int_entry_combined_axis_not_for_querying[i]
-
-        vchange_int_entry_combined_axis_not_for_querying = (
-            np.vectorize(f_combined)
-            if dict_change_int_entry_combined_axis_not_for_querying is not None
-            else None
+        # retrieve an array (or an object performing offset arithmetic) for the conversion of int_entry_combined of the non-indexed axis.
+        arr_change_int_entry_combined_axis_not_for_querying = self._get_cached_array(
+            "combined_to_dest_component_of_axis_not_for_querying",
+            dict_change_int_entry_combined_axis_not_for_querying,
         )
 
-        """ internal settings """
-        int_num_chunks_for_a_batch = (
-            2  # number of chunks in a batch for retrieving data for the sparse matrix
+        # retrieve a boolean mask of the filter of the non-indexed axis
+        arr_filter_not_axis_for_querying = self._get_cached_array(
+            "filter_of_axis_not_for_querying", ba_filter_not_axis_for_querying
         )
 
-        def __retrieve_data(
+        # retrieve arrays (or objects performing offset arithmetic) for the conversion of int_entry of the indexed axis.
+        (
+            arr_change_int_entry_component_of_axis_for_querying,
+            arr_change_int_entry_combined_axis_for_querying,
+            arr_change_int_entry_of_axis_for_querying,
+        ) = (
+            self._get_cached_array(
+                "component_to_combined_of_axis_for_querying",
+                dict_change_int_entry_component_of_axis_for_querying,
+            ),
+            self._get_cached_array(
+                "combined_to_dest_component_of_axis_for_querying",
+                dict_change_int_entry_combined_axis_for_querying,
+            ),
+            self._get_cached_array(
+                "view_of_axis_for_querying",
+                dict_change_int_entry_of_axis_for_querying,
+            ),
+        )
+
+        """ internal settings """
+        int_num_chunks_for_a_batch = (
+            2  # number of chunks in a batch for retrieving data for the sparse matrix
+        )
+
+        def __retrieve_data(
             pipe_from_main_thread=None, pipe_to_main_thread=None, flag_as_a_worker=True
         ):
             """# 2022-08-16 01:54:31
@@ -9467,12 +10342,37 @@ class RAMtx:
                 l_arr_int_entry_of_axis_not_for_querying,
                 l_arr_value,
             ) = ([], [], [])
+            l_block = []  # collect CSR-like blocks ('flag_return_block' is True)
 
-            def __process_entry(
-                int_entry, arr_int_entry_of_axis_not_for_querying, arr_value
+            def __drop_records(
+                arr_mask,
+                arr_index_of_a_batch,
+                arr_int_entry_of_axis_not_for_querying,
+                arr_value,
             ):
-                """# 2022-07-30 22:07:46
-                process retrieve data. apply filter and change coordinates
+                """# 2026-10-17 10:38:52
+                drop records of a batch using the given boolean mask, and update the start and end positions of the entries of the batch accordingly
+                """
+                arr_num_records_before = np.zeros(len(arr_mask) + 1, dtype=np.int64)
+                np.cumsum(
+                    arr_mask, out=arr_num_records_before[1:]
+                )  # retrieve the number of remaining records before each position
+                return (
+                    arr_num_records_before[arr_index_of_a_batch],
+                    arr_int_entry_of_axis_not_for_querying[arr_mask],
+                    arr_value[arr_mask],
+                )
+
+            def __process_batch(
+                l_int_entry_in_a_batch,
+                arr_index_of_a_batch,
+                arr_int_entry_of_axis_not_for_querying,
+                arr_value,
+            ):
+                """# 2026-10-17 10:41:26
+                process retrieved data of a batch of entries. apply filter and change coordinates of all records of the batch at once, and collect the data of each entry
+
+                'arr_index_of_a_batch' : an array of start and end positions of the records of each entry in 'arr_int_entry_of_axis_not_for_querying' and 'arr_value'
                 """
                 """ convert dtypes of retrieved data """
                 if (
@@ -9487,26 +10387,19 @@ class RAMtx:
                     arr_value = arr_value.astype(self._dtype_of_values)
 
                 """ if a filter for not-indexed axis has been set, apply the filter to the retrieved records """
-                if ba_filter_not_axis_for_querying is not None:
-                    arr_mask = np.zeros(
-                        len(arr_int_entry_of_axis_not_for_querying), dtype=bool
-                    )  # initialize the mask for filtering records
-                    for i, int_entry_of_axis_not_for_querying in enumerate(
-                        arr_int_entry_of_axis_not_for_querying
-                    ):  # iterate through each record
-                        if ba_filter_not_axis_for_querying[
-                            int_entry_of_axis_not_for_querying
-                        ]:  # check whether the current int_entry is included in the filter
-                            arr_mask[i] = True  # include the record
-                    # if no valid data exists (all data were filtered out), continue to the next 'int_entry'
-                    if arr_mask.sum() == 0:
-                        return
-
-                    # filter records using the mask
-                    arr_int_entry_of_axis_not_for_querying = (
-                        arr_int_entry_of_axis_not_for_querying[arr_mask]
-                    )
-                    arr_value = arr_value[arr_mask]
+                if arr_filter_not_axis_for_querying is not None:
+                    (
+                        arr_index_of_a_batch,
+                        arr_int_entry_of_axis_not_for_querying,
+                        arr_value,
+                    ) = __drop_records(
+                        arr_filter_not_axis_for_querying[
+                            arr_int_entry_of_axis_not_for_querying
+                        ],
+                        arr_index_of_a_batch,
+                        arr_int_entry_of_axis_not_for_querying,
+                        arr_value,
+                    )  # filter records using the mask
 
                 """ # 2022-12-03 19:59:48 
                 coordinate conversion process
@@ -9516,83 +10409,120 @@ class RAMtx:
                     > global coordinates (on a combined axis) of the destination component (usually reference component)
                     > apply view of the global coordinates (on a combined axis)
                 """
-
-                # component > combined axis
-                if dict_change_int_entry_component_of_axis_for_querying is not None:
-                    int_entry = dict_change_int_entry_component_of_axis_for_querying[
-                        int_entry
-                    ]
                 # convert int_entry_component to int_entry for the non-indexed axis if a mapping has been given (create combined)
-                if vchange_int_entry_component_of_axis_not_for_querying is not None:
-                    arr_int_entry_of_axis_not_for_querying = (
-                        vchange_int_entry_component_of_axis_not_for_querying(
-                            arr_int_entry_of_axis_not_for_querying
-                        )
+                if arr_change_int_entry_component_of_axis_not_for_querying is not None:
+                    arr_int_entry_of_axis_not_for_querying = map_integer_indices(
+                        arr_change_int_entry_component_of_axis_not_for_querying,
+                        arr_int_entry_of_axis_not_for_querying,
                     )
 
-                # combined > component axis
-                if dict_change_int_entry_combined_axis_for_querying is not None:
-                    if (
-                        int_entry
-                        not in dict_change_int_entry_combined_axis_for_querying
-                    ):  # exclude entry that are absent in the destination component
-                        return
-                    int_entry = dict_change_int_entry_combined_axis_for_querying[
-                        int_entry
-                    ]
                 # convert int_entry_combined to int_entry for the non-indexed axis if a mapping has been given (change component)
-                if vchange_int_entry_combined_axis_not_for_querying is not None:
+                if arr_change_int_entry_combined_axis_not_for_querying is not None:
+                    arr_int_entry_of_axis_not_for_querying = map_integer_indices(
+                        arr_change_int_entry_combined_axis_not_for_querying,
+                        arr_int_entry_of_axis_not_for_querying,
+                    )
                     # exclude records that are absent in the destination component
-                    arr_mask = np.zeros(
-                        len(arr_int_entry_of_axis_not_for_querying), dtype=bool
-                    )  # initialize the mask for filtering records
-                    for i, int_entry_of_axis_not_for_querying in enumerate(
-                        arr_int_entry_of_axis_not_for_querying
-                    ):  # iterate through each record
-                        if (
-                            int_entry_of_axis_not_for_querying
-                            in dict_change_int_entry_combined_axis_not_for_querying
-                        ):  # check whether the current int_entry is included in the target component
-                            arr_mask[i] = True  # include the record
-                    # if no valid data exists (all data were filtered out), continue to the next 'int_entry'
-                    if arr_mask.sum() == 0:
-                        return
+                    arr_mask = arr_int_entry_of_axis_not_for_querying != -1
+                    if not arr_mask.all():
+                        (
+                            arr_index_of_a_batch,
+                            arr_int_entry_of_axis_not_for_querying,
+                            arr_value,
+                        ) = __drop_records(
+                            arr_mask,
+                            arr_index_of_a_batch,
+                            arr_int_entry_of_axis_not_for_querying,
+                            arr_value,
+                        )
 
-                    # filter records using the mask
-                    arr_int_entry_of_axis_not_for_querying = (
-                        arr_int_entry_of_axis_not_for_querying[arr_mask]
+                # convert int_entry for the non-indexed axis if a mapping has been given (create view)
+                if arr_change_int_entry_of_axis_not_for_querying is not None:
+                    arr_int_entry_of_axis_not_for_querying = map_integer_indices(
+                        arr_change_int_entry_of_axis_not_for_querying,
+                        arr_int_entry_of_axis_not_for_querying,
                     )
-                    arr_value = arr_value[arr_mask]
 
-                    # change coordinates
-                    arr_int_entry_of_axis_not_for_querying = (
-                        vchange_int_entry_combined_axis_not_for_querying(
-                            arr_int_entry_of_axis_not_for_querying
-                        )
+                """ change coordinates of the entries of the indexed axis """
+                arr_int_entry = np.asarray(l_int_entry_in_a_batch, dtype=np.int64)
+                arr_mask_valid = (
+                    arr_index_of_a_batch[:, 1] > arr_index_of_a_batch[:, 0]
+                )  # exclude entries without valid data (all data were filtered out)
+                # component > combined axis
+                if arr_change_int_entry_component_of_axis_for_querying is not None:
+                    arr_int_entry = map_integer_indices(
+                        arr_change_int_entry_component_of_axis_for_querying,
+                        arr_int_entry,
                     )
-
+                # combined > component axis
+                if arr_change_int_entry_combined_axis_for_querying is not None:
+                    arr_int_entry = map_integer_indices(
+                        arr_change_int_entry_combined_axis_for_querying, arr_int_entry
+                    )
+                    arr_mask_valid &= (
+                        arr_int_entry != -1
+                    )  # exclude entry that are absent in the destination component
                 # apply view
-                if dict_change_int_entry_of_axis_for_querying is not None:
-                    int_entry = dict_change_int_entry_of_axis_for_querying[int_entry]
-                # convert int_entry for the non-indexed axis if a mapping has been given (create view)
-                if vchange_int_entry_of_axis_not_for_querying is not None:
-                    arr_int_entry_of_axis_not_for_querying = (
-                        vchange_int_entry_of_axis_not_for_querying(
-                            arr_int_entry_of_axis_not_for_querying
-                        )
+                if arr_change_int_entry_of_axis_for_querying is not None:
+                    arr_int_entry = map_integer_indices(
+                        arr_change_int_entry_of_axis_for_querying, arr_int_entry
                     )
-
-                """ append the retrieved data to the output results """
-                l_int_entry_of_axis_for_querying.append(
-                    int_entry
-                )  # convert int_entry for the indexed axis if a mapping has been given
-                l_arr_int_entry_of_axis_not_for_querying.append(
-                    arr_int_entry_of_axis_not_for_querying
+                arr_int_entry, arr_index_of_a_batch = (
+                    arr_int_entry[arr_mask_valid],
+                    arr_index_of_a_batch[arr_mask_valid],
                 )
-                l_arr_value.append(arr_value)
+
+                """ collect the results """
+                if flag_return_block:
+                    arr_int_num_records = (
+                        arr_index_of_a_batch[:, 1] - arr_index_of_a_batch[:, 0]
+                    )
+                    arr_indptr = np.zeros(len(arr_int_entry) + 1, dtype=np.int64)
+                    np.cumsum(arr_int_num_records, out=arr_indptr[1:])
+                    if not (
+                        len(arr_int_entry) > 0
+                        and arr_index_of_a_batch[0, 0] == 0
+                        and arr_index_of_a_batch[-1, 1]
+                        == len(arr_int_entry_of_axis_not_for_querying)
+                        and (
+                            arr_index_of_a_batch[1:, 0] == arr_index_of_a_batch[:-1, 1]
+                        ).all()
+                    ):  # if the records of the valid entries do not span the entire batch, gather the records of the valid entries
+                        arr_pos = np.repeat(
+                            arr_index_of_a_batch[:, 0] - arr_indptr[:-1],
+                            arr_int_num_records,
+                        ) + np.arange(arr_indptr[-1])
+                        arr_int_entry_of_axis_not_for_querying = (
+                            arr_int_entry_of_axis_not_for_querying[arr_pos]
+                        )
+                        arr_value = arr_value[arr_pos]
+                    l_block.append(
+                        (
+                            arr_int_entry,
+                            arr_indptr,
+                            arr_int_entry_of_axis_not_for_querying,
+                            arr_value,
+                        )
+                    )
+                else:
+                    if (
+                        not arr_value.flags.writeable
+                    ):  # arrays retrieved from the memory-mapped layout are read-only views. since the arrays of each entry can be modified in-place by the caller (e.g. the functions of 'RamData.apply'), return writable copies
+                        arr_value = np.array(arr_value)
+                    if not arr_int_entry_of_axis_not_for_querying.flags.writeable:
+                        arr_int_entry_of_axis_not_for_querying = np.array(
+                            arr_int_entry_of_axis_not_for_querying
+                        )
+                    for int_entry, index in zip(arr_int_entry, arr_index_of_a_batch):
+                        st, en = index
+                        l_int_entry_of_axis_for_querying.append(int_entry)
+                        l_arr_int_entry_of_axis_not_for_querying.append(
+                            arr_int_entry_of_axis_not_for_querying[st:en]
+                        )
+                        l_arr_value.append(arr_value[st:en])
 
             def __fetch_from_sparse_ramtx(l_int_entry_in_a_batch, l_index_in_a_batch):
-                """# 2022-07-30 22:32:14
+                """# 2026-10-17 10:52:03
                 fetch data from sparse ramtx for a batch
                 """
                 arr_index_of_a_batch = np.array(
@@ -9602,23 +10532,30 @@ class RAMtx:
                     arr_index_of_a_batch[0, 0],
                     arr_index_of_a_batch[-1, 1],
                 )  # retrieve start and end positions of the current batch
-                (
+                if self.is_compact_sparse_layout:
+                    arr_int_entry_of_axis_not_for_querying = (
+                        self._get_orthogonal_selection(
+                            self._path_za_mtx_indices, slice(st_batch, en_batch)
+                        )
+                    )  # fetch indices from the Zarr object
+                    arr_value = self._get_orthogonal_selection(
+                        path_za_mtx, slice(st_batch, en_batch)
+                    )  # fetch values from the Zarr object
+                else:
+                    (
+                        arr_int_entry_of_axis_not_for_querying,
+                        arr_value,
+                    ) = self._get_orthogonal_selection(
+                        path_za_mtx, slice(st_batch, en_batch)
+                    ).T  # fetch data from the Zarr object
+
+                __process_batch(
+                    l_int_entry_in_a_batch,
+                    arr_index_of_a_batch
+                    - st_batch,  # substract the start position of the batch to retrieve the local index
                     arr_int_entry_of_axis_not_for_querying,
                     arr_value,
-                ) = self._zs.get_orthogonal_selection(
-                    path_za_mtx, slice(st_batch, en_batch)
-                ).T  # fetch data from the Zarr object
-
-                for int_entry, index in zip(
-                    l_int_entry_in_a_batch, arr_index_of_a_batch - st_batch
-                ):  # substract the start position of the batch to retrieve the local index
-                    st, en = index
-                    sl = slice(st, en)
-                    __process_entry(
-                        int_entry,
-                        arr_int_entry_of_axis_not_for_querying[sl],
-                        arr_value[sl],
-                    )
+                )
 
             def __fetch_from_dense_ramtx(l_int_entry_in_a_batch):
                 """# 2022-08-16 01:54:21
@@ -9656,12 +10593,14 @@ class RAMtx:
                     # iterate through each entry on the axis for querying for the current subbatch
                     for int_entry, arr_data in zip(
                         l_int_entry_in_a_batch,
-                        self._zs.get_orthogonal_selection(
-                            path_za_mtx, (sl_secondary, l_int_entry_in_a_batch)
-                        ).T
-                        if is_for_querying_features
-                        else self._zs.get_orthogonal_selection(
-                            path_za_mtx, (l_int_entry_in_a_batch, sl_secondary)
+                        (
+                            self._get_orthogonal_selection(
+                                path_za_mtx, (sl_secondary, l_int_entry_in_a_batch)
+                            ).T
+                            if is_for_querying_features
+                            else self._get_orthogonal_selection(
+                                path_za_mtx, (l_int_entry_in_a_batch, sl_secondary)
+                            )
                         ),
                     ):  # fetch data from the Zarr object for the current subbatch and iterate through each entry and its data
                         arr_int_entry_of_axis_not_for_querying = np.where(arr_data)[
@@ -9692,16 +10631,42 @@ class RAMtx:
 
                     int_num_entries_processed_in_axis_not_for_querying += int_num_entries_in_a_subbatch_in_axis_not_for_querying  # update the position
 
-                for int_entry in dict_data:  # iterate each entry
-                    __process_entry(
-                        int_entry,
+                if len(dict_data) > 0:
+                    # concatenate the data of all entries into a single array, and process the entries as a batch
+                    l_int_entry_in_a_batch = list(dict_data)
+                    arr_pos = np.zeros(len(l_int_entry_in_a_batch) + 1, dtype=np.int64)
+                    np.cumsum(
+                        list(
+                            sum(
+                                len(a)
+                                for a in dict_data[int_entry][
+                                    "l_arr_int_entry_of_axis_not_for_querying"
+                                ]
+                            )
+                            for int_entry in l_int_entry_in_a_batch
+                        ),
+                        out=arr_pos[1:],
+                    )  # retrieve start and end positions of each entry
+                    __process_batch(
+                        l_int_entry_in_a_batch,
+                        np.vstack((arr_pos[:-1], arr_pos[1:])).T,
                         np.concatenate(
-                            dict_data[int_entry][
-                                "l_arr_int_entry_of_axis_not_for_querying"
-                            ]
+                            list(
+                                a
+                                for int_entry in l_int_entry_in_a_batch
+                                for a in dict_data[int_entry][
+                                    "l_arr_int_entry_of_axis_not_for_querying"
+                                ]
+                            )
+                        ),
+                        np.concatenate(
+                            list(
+                                a
+                                for int_entry in l_int_entry_in_a_batch
+                                for a in dict_data[int_entry]["l_arr_value"]
+                            )
                         ),
-                        np.concatenate(dict_data[int_entry]["l_arr_value"]),
-                    )  # concatenate list of arrays into a single array
+                    )
                 del dict_data
 
             #                 logger.info( f"ramtx getitem __fetch_from_dense_ramtx completed for {len( l_int_entry_in_a_batch )} entries" )
@@ -9716,17 +10681,22 @@ class RAMtx:
                 # retrieve flags for dtype conversions
                 flag_change_dtype_mtx_index = prop_za_mtx_index["dtype"] != np.int64
                 flag_change_dtype_of_feature_and_barcode_indices = (
-                    prop_za_mtx["dtype"] != self._dtype_of_feature_and_barcode_indices
-                )
+                    self._zs.properties[self._path_za_mtx_indices]["dtype"]
+                    if self.is_compact_sparse_layout
+                    else prop_za_mtx["dtype"]
+                ) != self._dtype_of_feature_and_barcode_indices
 
                 # retrieve mtx_index data and remove invalid entries
-                arr_index = self._zs.get_orthogonal_selection(
+                arr_index = self._get_orthogonal_selection(
                     path_za_mtx_index, l_int_entry
                 )  # retrieve mtx_index data
                 if (
                     flag_change_dtype_mtx_index
                 ):  # convert dtype of retrieved mtx_index data
                     arr_index = arr_index.astype(np.int64)
+                self._prefetch_records(
+                    arr_index
+                )  # start fetching the records of all entries concurrently (remote RAMtx)
 
                 index_chunk_start_current_batch = (
                     None  # initialize the index of the chunk at the start of the batch
@@ -9782,6 +10752,9 @@ class RAMtx:
                     )
             else:
                 """%% Dense ramtx %%"""
+                self.prefetch(
+                    l_int_entry
+                )  # start fetching the chunks of all entries concurrently (remote RAMtx)
                 # prepare
                 int_num_entries_in_a_chunk = (
                     prop_za_mtx["chunks"][1]
@@ -9828,9 +10801,13 @@ class RAMtx:
             """ return the retrieved data """
             # compose a output value
             output = (
-                l_int_entry_of_axis_for_querying,
-                l_arr_int_entry_of_axis_not_for_querying,
-                l_arr_value,
+                __concatenate_blocks(l_block)
+                if flag_return_block
+                else (
+                    l_int_entry_of_axis_for_querying,
+                    l_arr_int_entry_of_axis_not_for_querying,
+                    l_arr_value,
+                )
             )
             #             logger.info( 'ramtx getitem completed' )
             # if 'flag_as_a_worker' is True, send the result or return the result
@@ -9904,12 +10881,16 @@ class RAMtx:
                 p.join()
 
             # ravel retrieved records
+            if flag_return_block:
+                return __concatenate_blocks(l_output)
             for output in l_output:
                 l_int_entry_of_axis_for_querying.extend(output[0])
                 l_arr_int_entry_of_axis_not_for_querying.extend(output[1])
                 l_arr_value.extend(output[2])
             del output, l_output
         else:  # single thread mode
+            if flag_return_block:
+                return __retrieve_data(l_int_entry, flag_as_a_worker=False)
             (
                 l_int_entry_of_axis_for_querying,
                 l_arr_int_entry_of_axis_not_for_querying,
@@ -9922,8 +10903,15 @@ class RAMtx:
             l_arr_value,
         )
 
-    def get_sparse_matrix(self, l_int_entry, flag_return_as_arrays=False):
-        """# 2022-08-30 11:03:14
+    def get_sparse_matrix(
+        self,
+        l_int_entry,
+        flag_return_as_arrays=False,
+        flag_compact: bool = False,
+        int_entry_start: int = 0,
+        int_num_rows: Union[None, int] = None,
+    ):
+        """# 2026-10-17 12:04:51
 
         get sparse matrix for the given list of integer representations of the entries.
 
@@ -9931,48 +10919,33 @@ class RAMtx:
         'flag_return_as_arrays' : if True, return three arrays and a single list, 'l_int_barcodes', 'l_int_features', 'l_values', 'l_int_num_records'.
                 'l_int_barcodes', 'l_int_features', 'l_values' : for building a sparse matrix
                 'l_int_num_records' : for building an index
-                if False, return a scipy.csr sparse matrix
+                if False, return a scipy.csr sparse matrix of shape ( the number of barcodes, the number of features )
+        flag_compact : bool = False # if True, return a scipy.csr sparse matrix whose rows are local to the queried entries of the axis for querying (barcodes for a RAMtx for querying barcodes, features for a RAMtx for querying features) and whose columns are the entries of the axis not for querying, together with the int_entry of each row ( X, arr_int_entry ).
+                the matrix is built directly from the CSR-like block retrieved by 'get_csr_block', and the memory usage does not depend on the length of the axis for querying.
+                if 'int_num_rows' is None, the rows represent the valid queried entries (the entries with records), in the order of 'arr_int_entry'.
+        int_entry_start : int = 0 # (when 'flag_compact' is True and 'int_num_rows' is given) the int_entry of the first row
+        int_num_rows : Union[ None, int ] = None # (when 'flag_compact' is True) if given, the rows represent a contiguous range of the entries ( int_entry_start, int_entry_start + 1, ..., int_entry_start + int_num_rows - 1 ) including entries without records, and records of the entries outside the range will be ignored. (e.g. a batch of entries retrieved from 'RamDataAxis.batch_generator' while a view is active)
         """
         (
-            l_int_entry_of_axis_for_querying,
-            l_arr_int_entry_of_axis_not_for_querying,
-            l_arr_value,
-        ) = self[
+            arr_int_entry_of_axis_for_querying,
+            arr_indptr,
+            arr_int_entry_of_axis_not_for_querying,
+            arr_value,
+        ) = self.get_csr_block(
             l_int_entry
-        ]  # parse retrieved result
+        )  # retrieve data as a CSR-like block
+        arr_int_num_records = np.diff(arr_indptr)
 
-        if len(l_arr_int_entry_of_axis_not_for_querying) > 0:
-            # if valid input is available
-            # combine the arrays
-            arr_int_entry_of_axis_not_for_querying = np.concatenate(
-                l_arr_int_entry_of_axis_not_for_querying
+        if (
+            flag_return_as_arrays
+        ):  # if 'flag_return_as_arrays' is True, return data as arrays
+            # compose 'arr_int_entry_of_axis_for_querying' for each record
+            arr_int_entry_of_axis_for_querying = np.repeat(
+                arr_int_entry_of_axis_for_querying.astype(
+                    self._dtype_of_feature_and_barcode_indices
+                ),
+                arr_int_num_records,
             )
-            arr_value = np.concatenate(l_arr_value)
-            del l_arr_value  # delete intermediate objects
-
-            # compose 'arr_int_entry_of_axis_for_querying'
-            arr_int_entry_of_axis_for_querying = np.zeros(
-                len(arr_int_entry_of_axis_not_for_querying),
-                dtype=self._dtype_of_feature_and_barcode_indices,
-            )  # create an empty array
-            int_pos = 0
-            for int_entry_of_axis_for_querying, a in zip(
-                l_int_entry_of_axis_for_querying,
-                l_arr_int_entry_of_axis_not_for_querying,
-            ):
-                n = len(a)
-                arr_int_entry_of_axis_for_querying[
-                    int_pos : int_pos + n
-                ] = int_entry_of_axis_for_querying  # compose 'arr_int_entry_of_axis_for_querying'
-                int_pos += n  # update the current position
-            if flag_return_as_arrays:
-                l_int_num_records = list(
-                    len(a) for a in l_arr_int_entry_of_axis_not_for_querying
-                )  # when returning arrays instead of a scipy sparse matrix, additionally prepare records that can be utilized for build an index of the data
-            del (
-                l_int_entry_of_axis_for_querying,
-                l_arr_int_entry_of_axis_not_for_querying,
-            )  # delete intermediate objects
 
             # get 'arr_int_barcode' and 'arr_int_feature' based on 'self.is_for_querying_features'
             if self.is_for_querying_features:
@@ -9981,32 +10954,157 @@ class RAMtx:
             else:
                 arr_int_barcode = arr_int_entry_of_axis_for_querying
                 arr_int_feature = arr_int_entry_of_axis_not_for_querying
-            del (
-                arr_int_entry_of_axis_for_querying,
-                arr_int_entry_of_axis_not_for_querying,
-            )  # delete intermediate objects
-
-            if (
-                flag_return_as_arrays
-            ):  # if 'flag_return_as_arrays' is True, return data as arrays
-                return arr_int_barcode, arr_int_feature, arr_value, l_int_num_records
-        else:
-            # if input is empty, compose empty inputs
-            arr_value, arr_int_barcode, arr_int_feature = [], [], []
+            return (
+                arr_int_barcode,
+                arr_int_feature,
+                arr_value,
+                list(arr_int_num_records),
+            )  # 'l_int_num_records' can be utilized for build an index of the data
 
-        # return data as a sparse matrix
+        # retrieve the lengths of the axes
         n_bc, n_ft = (
             (self._int_num_barcodes, self._int_num_features)
             if self._ramdata is None
             else (len(self._ramdata.bc), len(self._ramdata.ft))
         )  # detect whether the current RAMtx has been attached to a RamData and retrieve the number of barcodes and features accordingly
-        X = scipy.sparse.csr_matrix(
-            scipy.sparse.coo_matrix(
-                (arr_value, (arr_int_barcode, arr_int_feature)), shape=(n_bc, n_ft)
+        len_axis_for_querying, len_axis_not_for_querying = (
+            (n_ft, n_bc) if self.is_for_querying_features else (n_bc, n_ft)
+        )
+        if not flag_compact:  # use all entries of the axis for querying as rows
+            int_entry_start, int_num_rows = 0, len_axis_for_querying
+
+        # compose the rows of the output matrix
+        if int_num_rows is None:  # use the valid queried entries as rows
+            arr_index_row = np.arange(
+                len(arr_int_entry_of_axis_for_querying), dtype=np.int64
+            )
+            arr_int_entry_row = arr_int_entry_of_axis_for_querying
+        else:  # use a contiguous range of entries as rows
+            arr_index_row = (
+                arr_int_entry_of_axis_for_querying.astype(np.int64) - int_entry_start
+            )
+            arr_int_entry_row = np.arange(
+                int_entry_start, int_entry_start + int_num_rows, dtype=np.int64
             )
-        )  # convert count data to a sparse matrix
+        int_num_rows = len(arr_int_entry_row)
+
+        # drop entries outside the rows, and sort the entries by rows
+        arr_mask_valid = (arr_index_row >= 0) & (arr_index_row < int_num_rows)
+        if not arr_mask_valid.all() or (np.diff(arr_index_row) < 0).any():
+            arr_argsort = np.where(arr_mask_valid)[0]
+            arr_argsort = arr_argsort[
+                np.argsort(arr_index_row[arr_argsort], kind="stable")
+            ]  # the order of the valid entries sorted by rows
+            arr_index_row, arr_int_num_records_sorted = (
+                arr_index_row[arr_argsort],
+                arr_int_num_records[arr_argsort],
+            )
+            arr_pos = np.repeat(
+                arr_indptr[:-1][arr_argsort], arr_int_num_records_sorted
+            ) + (
+                np.arange(arr_int_num_records_sorted.sum())
+                - np.repeat(
+                    np.cumsum(arr_int_num_records_sorted) - arr_int_num_records_sorted,
+                    arr_int_num_records_sorted,
+                )
+            )  # the positions of the records of the valid entries in the sorted order
+            arr_int_entry_of_axis_not_for_querying = (
+                arr_int_entry_of_axis_not_for_querying[arr_pos]
+            )
+            arr_value = arr_value[arr_pos]
+            arr_int_num_records = arr_int_num_records_sorted
+
+        # compose the index pointers of the rows (rows without valid entries are empty)
+        arr_int_num_records_of_rows = np.zeros(int_num_rows, dtype=np.int64)
+        arr_int_num_records_of_rows[arr_index_row] = arr_int_num_records
+        arr_indptr = np.zeros(int_num_rows + 1, dtype=np.int64)
+        np.cumsum(arr_int_num_records_of_rows, out=arr_indptr[1:])
+
+        X = scipy.sparse.csr_matrix(
+            (arr_value, arr_int_entry_of_axis_not_for_querying, arr_indptr),
+            shape=(int_num_rows, len_axis_not_for_querying),
+        )  # build a sparse matrix directly from the CSR-like block
+        X.sum_duplicates()  # sort the indices of each row (the records of a combined RAMtx are not always sorted), which is skipped if the matrix is already in the canonical format
+        if flag_compact:
+            return X, arr_int_entry_row
+
+        # return data as a sparse matrix of shape ( the number of barcodes, the number of features )
+        if self.is_for_querying_features:
+            X = X.T.tocsr()
         return X  # return the composed sparse matrix
 
+    def _get_plan_of_weights(
+        self,
+        ba,
+        flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx: bool,
+    ):
+        """# 2026-10-17 14:05:21
+        retrieve the integer indices of the active entries of the given bitarray 'ba' and the cumulative sum of their weights (the number of records of each entry).
+        the plan is cached for each weight target, and will be re-used as long as the content of the given bitarray has not been changed.
+
+        Returns:
+        dict_plan : dict # a dictionary containing 'arr_int_entry' (integer indices of active entries), 'arr_cumsum_weight' (cumulative sum of weights of the active entries), and 'dict_boundary' (a cache of batch boundaries for each batch setting)
+        """
+        # check if pre-calculated weights are available
+        axis = (
+            "features" if self.is_for_querying_features else "barcodes"
+        )  # retrieve axis of current ramtx
+        path_za_weight = None  # initialize
+        for path_folder in [
+            self._path_folder_ramtx,
+            self._path_folder_ramtx_modifiable,
+        ]:
+            if path_folder is not None and self._fo.exists(
+                f"{path_folder}matrix.{axis}.number_of_records_for_each_entry.zarr/",
+            ):
+                path_za_weight = f"{path_folder}matrix.{axis}.number_of_records_for_each_entry.zarr/"  # define an existing zarr object path
+                break
+        if path_za_weight is not None and not (
+            self.mode != "dense"
+            or not flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx
+        ):  # if dense, and 'flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx' is True, ignore the pre-calculated weights
+            path_za_weight = None
+
+        # retrieve the plan from the cache
+        if not hasattr(self, "_dict_cache_plan_of_weights"):
+            self._dict_cache_plan_of_weights = dict()  # initialize the cache
+        if path_za_weight in self._dict_cache_plan_of_weights:
+            ba_cached, dict_plan = self._dict_cache_plan_of_weights[path_za_weight]
+            if (
+                ba_cached == ba
+            ):  # bitarray objects can be modified in-place, therefore the content of the bitarray is compared
+                return dict_plan
+
+        # compose the plan
+        arr_int_entry = np.where(BA.to_array(ba))[
+            0
+        ]  # retrieve integer indices of the active entries at once
+        if path_za_weight is not None:  # if weight is available
+            self._zs.open(
+                path_za_weight,
+                "r",
+            )  # open zarr object containing weights
+            arr_weight = (
+                self._zs.get_orthogonal_selection(path_za_weight, arr_int_entry)
+                if len(arr_int_entry) > 0
+                else np.zeros(0, dtype=np.int64)
+            )  # retrieve weights of all active entries at once
+        else:  # if weight is not available
+            arr_weight = np.full(
+                len(arr_int_entry),
+                self.len_axis_not_for_querying,
+            )  # if weight is not available, assumes all records are available (number of entries in non-indexed axis) for each entry
+        dict_plan = {
+            "arr_int_entry": arr_int_entry,
+            "arr_cumsum_weight": np.cumsum(arr_weight, dtype=np.int64),
+            "dict_boundary": dict(),
+        }
+        self._dict_cache_plan_of_weights[path_za_weight] = (
+            bitarray(ba),
+            dict_plan,
+        )  # update the cache (copy the bitarray)
+        return dict_plan
+
     def get_total_num_records(
         self,
         ba=None,
@@ -10014,10 +11112,11 @@ class RAMtx:
         flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx=True,
         flag_spawn: Union[bool, None] = None,
     ):
-        """# 2022-08-07 01:38:02
+        """# 2026-10-17 14:05:21
         get total number of records in the current RAMtx for the given entries ('ba' filter).
         this function is mainly for the estimation of the total number of records to process for displaying progress information in the progress bar.
 
+        'int_num_entries_for_each_weight_calculation_batch' : deprecated. weights of all active entries are retrieved at once
         flag_spawn : bool = False # a flag indicating spawning should be used for operations that might not be fork-safe. By default, current object's 'flag_spawn' attribute will be used.
         """
         # set defaule arguments
@@ -10033,71 +11132,14 @@ class RAMtx:
                 ba = (
                     self.ba_active_entries
                 )  # if None is given, self.ba_active_entries bitarray will be used.
-        # initialize
-        # a namespace that can safely shared between function scopes
-        ns = {"int_num_records": 0, "l_int_entry_for_weight_calculation_batch": []}
-
-        # check if pre-calculated weights are available
-        axis = (
-            "features" if self.is_for_querying_features else "barcodes"
-        )  # retrieve axis of current ramtx
-        flag_weight_available = False  # initialize
-        for path_folder in [
-            self._path_folder_ramtx,
-            self._path_folder_ramtx_modifiable,
-        ]:
-            if path_folder is not None and self._fo.zarr_exists(
-                f"{path_folder}matrix.{axis}.number_of_records_for_each_entry.zarr/",
-            ):
-                path_folder_zarr_weight = f"{path_folder}matrix.{axis}.number_of_records_for_each_entry.zarr/"  # define an existing zarr object path
-                flag_weight_available = True
-                path_za_weight = path_folder_zarr_weight
-                self._zs.open(
-                    path_za_weight, "r"
-                )  # open zarr object containing weights if available
-                break
-
-        def __update_total_num_records():
-            """# 2022-08-05 00:56:12
-            retrieve indices of the current 'weight_current_batch', calculate weights, and yield a batch
-            """
-            """ retrieve weights """
-            if flag_weight_available and (
-                self.mode != "dense"
-                or not flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx
-            ):  # if weight is available
-                # load weight for the batch
-                arr_weight = self._zs.get_orthogonal_selection(
-                    path_za_weight, ns["l_int_entry_for_weight_calculation_batch"]
-                )  # retrieve weights
-            else:  # if weight is not available
-                arr_weight = np.full(
-                    len(ns["l_int_entry_for_weight_calculation_batch"]),
-                    self.len_axis_not_for_querying,
-                )  # if weight is not available, assumes all records are available (number of entries in non-indexed axis) for each entry
-            """ update total number of records """
-            ns["int_num_records"] += arr_weight.sum()  # update total number of records
-            ns[
-                "l_int_entry_for_weight_calculation_batch"
-            ] = []  # empty the weight calculation batch
-
-        for int_entry in BA.find(
-            ba
-        ):  # iterate through active entries of the given bitarray
-            ns["l_int_entry_for_weight_calculation_batch"].append(
-                int_entry
-            )  # collect int_entry for the current 'weight_calculation_batch'
-            # once 'weight_calculation' batch is full, process the 'weight_calculation' batch
-            if (
-                len(ns["l_int_entry_for_weight_calculation_batch"])
-                == int_num_entries_for_each_weight_calculation_batch
-            ):
-                __update_total_num_records()  # update total number of records
-        if (
-            len(ns["l_int_entry_for_weight_calculation_batch"]) > 0
-        ):  # if there is remaining entries to be processed
-            __update_total_num_records()
-        return int(ns["int_num_records"])  # return the total number of records
+        # retrieve the cumulative sum of weights
+        arr_cumsum_weight = self._get_plan_of_weights(
+            ba,
+            flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx,
+        )["arr_cumsum_weight"]
+        return (
+            int(arr_cumsum_weight[-1]) if len(arr_cumsum_weight) > 0 else 0
+        )  # return the total number of records
 
     def batch_generator(
         self,
@@ -10107,18 +11149,22 @@ class RAMtx:
         int_chunk_size_for_checking_boundary=None,
         flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx=False,
         flag_spawn: Union[bool, None] = None,
+        int_num_batches_to_prefetch: int = 0,
     ):
-        """# 2022-12-06 02:51:11
+        """# 2026-10-17 16:40:12
         generate batches of list of integer indices of the active entries in the given bitarray 'ba'.
         Each bach has the following characteristics:
             monotonous: active entries in a batch are in an increasing order
             the total number of records of a batch is around (but not exactly) 'int_total_weight_for_each_batch'
+        batch boundaries are computed from the cumulative sum of the weights of the active entries, and are cached for each filter and weight target so that repeated calls re-use the same plan.
 
         'ba' : (default None) if None is given, self.ba_active_entries bitarray will be used.
+        'int_num_entries_for_each_weight_calculation_batch' : deprecated. weights of all active entries are retrieved at once
         'int_chunk_size_for_checking_boundary' : if this argument is given, each batch will respect the chunk boundary of the given chunk size so that different batches share the same 'chunk'. setting this argument will override 'int_total_weight_for_each_batch' argument
         'int_total_weight_for_each_batch' : total number of records in a batch.
         'flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx' : when iterating through a dense matrix, interpret the length of the axis not for querying as the total number of records for every entry in the axis for querying. This will be more useful for restricting the memory usage when analysing dense RAMtx matrix.
         flag_spawn : bool = False # a flag indicating spawning should be used for operations that might not be fork-safe. By default, current object's 'flag_spawn' attribute will be used.
+        int_num_batches_to_prefetch : int = 0 # the number of upcoming batches of which data will be prefetched into the chunk cache (read-ahead) while the current batch is being processed (see 'RAMtx.prefetch'). effective only when a chunk fetcher is available (e.g. for a RAMtx hosted remotely) and the batches are processed in the process iterating the generator.
         """
         # set defaule arguments
         if flag_spawn is None:
@@ -10133,146 +11179,100 @@ class RAMtx:
                 ba = (
                     self.ba_active_entries
                 )  # if None is given, self.ba_active_entries bitarray will be used.
-        # initialize
-        # a namespace that can safely shared between functions
-        ns = {
-            "int_accumulated_weight_current_batch": 0,
-            "l_int_entry_current_batch": [],
-            "l_int_entry_for_weight_calculation_batch": [],
-            "index_chunk_end": None,
-            "index_batch": 0,
-            "int_num_of_previously_returned_entries": 0,
-        }  # initialize 'index_batch'
 
-        # check if pre-calculated weights are available
-        axis = (
-            "features" if self.is_for_querying_features else "barcodes"
-        )  # retrieve axis of current ramtx
-        flag_weight_available = False  # initialize
-        for path_folder in [
-            self._path_folder_ramtx,
-            self._path_folder_ramtx_modifiable,
-        ]:
-            if path_folder is not None and self._fo.exists(
-                f"{path_folder}matrix.{axis}.number_of_records_for_each_entry.zarr/",
+        if int_num_batches_to_prefetch > 0 and self._chunk_fetcher is not None:
+            # read-ahead: prefetch the data of the upcoming batches before the current batch is returned
+            q_batch = collections.deque()
+            for batch in self.batch_generator(
+                ba=ba,
+                int_total_weight_for_each_batch=int_total_weight_for_each_batch,
+                int_chunk_size_for_checking_boundary=int_chunk_size_for_checking_boundary,
+                flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx=flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx,
+                flag_spawn=flag_spawn,
             ):
-                path_folder_zarr_weight = f"{path_folder}matrix.{axis}.number_of_records_for_each_entry.zarr/"  # define an existing zarr object path
-                flag_weight_available = True
-                path_za_weight = path_folder_zarr_weight
-                self._zs.open(
-                    path_za_weight,
-                    "r",
-                )  # open zarr object containing weights if available (open a fork-safe version if 'flag_spawn')
-                break
+                self.prefetch(batch["l_int_entry_current_batch"])
+                q_batch.append(batch)
+                if len(q_batch) > int_num_batches_to_prefetch:
+                    yield q_batch.popleft()
+            while len(q_batch) > 0:
+                yield q_batch.popleft()
+            return
 
-        def __compose_batch():
-            """# 2022-08-05 23:34:28
-            compose batch from the values available in the namespace 'ns'
-            """
-            return {
-                "index_batch": ns["index_batch"],
-                "l_int_entry_current_batch": ns["l_int_entry_current_batch"],
-                "int_num_of_previously_returned_entries": ns[
-                    "int_num_of_previously_returned_entries"
-                ],
-                "int_accumulated_weight_current_batch": ns[
-                    "int_accumulated_weight_current_batch"
-                ],
-            }
+        # retrieve the plan
+        dict_plan = self._get_plan_of_weights(
+            ba,
+            flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx,
+        )
+        arr_int_entry, arr_cumsum_weight = (
+            dict_plan["arr_int_entry"],
+            dict_plan["arr_cumsum_weight"],
+        )
+        int_num_entries = len(arr_int_entry)
 
-        def find_batch():
-            """# 2022-08-05 00:56:12
-            retrieve indices of the current 'weight_current_batch', calculate weights, and yield a batch
+        def __find_boundaries():
+            """# 2026-10-17 14:05:21
+            find the end positions (exclusive) of the batches using the cumulative sum of weights.
+            a batch ends at the first entry at which the accumulated weight of the batch reaches 'int_total_weight_for_each_batch'. when chunk boundary checking is active, the batch is extended to the end of the chunk containing the entry.
             """
-            """ retrieve weights """
-            if flag_weight_available and (
-                self.mode != "dense"
-                or not flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx
-            ):  # if weight is available and if dense, 'flag_use_total_number_of_entries_of_axis_not_for_querying_as_weight_for_dense_ramtx' is False
-                # load weight for the batch
-                arr_weight = self._zs.get_orthogonal_selection(
-                    path_za_weight, ns["l_int_entry_for_weight_calculation_batch"]
-                )  # retrieve weights
-            else:  # if weight is not available
-                arr_weight = np.full(
-                    len(ns["l_int_entry_for_weight_calculation_batch"]),
-                    self.len_axis_not_for_querying,
-                )  # if weight is not available, assumes all records are available (number of entries in non-indexed axis) for each entry
-            """ search for batch """
-            for int_entry, weight in zip(
-                ns["l_int_entry_for_weight_calculation_batch"], arr_weight
-            ):
-                if (
-                    ns["index_chunk_end"] is not None
-                    and ns["index_chunk_end"]
-                    != int_entry // int_chunk_size_for_checking_boundary
-                ):  # if the chunk boundary has been set and the boundary has reached
-                    yield __compose_batch()  # return a batch
-                    # initialize the next batch
-                    ns["index_batch"] += 1
-                    ns["int_num_of_previously_returned_entries"] += len(
-                        ns["l_int_entry_current_batch"]
-                    )  # update the total number of entries returned
-                    ns["l_int_entry_current_batch"] = []
-                    ns["int_accumulated_weight_current_batch"] = 0
-                    ns["index_chunk_end"] = None
-
-                # update the current batch
-                ns["l_int_entry_current_batch"].append(int_entry)
-                ns["int_accumulated_weight_current_batch"] += weight
+            if int_chunk_size_for_checking_boundary is not None:
+                arr_index_chunk = (
+                    arr_int_entry // int_chunk_size_for_checking_boundary
+                )  # retrieve the index of chunk of each active entry (monotonously increasing)
+            l_index_end = []
+            index_start = 0
+            while index_start < int_num_entries:
+                int_weight_previous = (
+                    arr_cumsum_weight[index_start - 1] if index_start > 0 else 0
+                )  # accumulated weight of the previous batches
+                index_end = max(
+                    int(
+                        np.searchsorted(
+                            arr_cumsum_weight,
+                            int_weight_previous + int_total_weight_for_each_batch,
+                            side="left",
+                        )
+                    ),
+                    index_start,
+                )  # position of the entry at which the current batch becomes full
+                if index_end >= int_num_entries:  # the last batch
+                    l_index_end.append(int_num_entries)
+                    break
+                if int_chunk_size_for_checking_boundary is not None:
+                    index_end = int(
+                        np.searchsorted(
+                            arr_index_chunk, arr_index_chunk[index_end], side="right"
+                        )
+                    )  # extend the batch to the chunk boundary
+                else:
+                    index_end += 1
+                l_index_end.append(index_end)
+                index_start = index_end
+            return np.array(l_index_end, dtype=np.int64)
+
+        # retrieve batch boundaries from the cache
+        key_boundary = (
+            int_total_weight_for_each_batch,
+            int_chunk_size_for_checking_boundary,
+        )
+        if key_boundary not in dict_plan["dict_boundary"]:
+            dict_plan["dict_boundary"][key_boundary] = __find_boundaries()
+        arr_index_end = dict_plan["dict_boundary"][key_boundary]
 
-                # check whether the current batch is full
-                if (
-                    ns["int_accumulated_weight_current_batch"]
-                    >= int_total_weight_for_each_batch
-                    and ns["index_chunk_end"] is None
-                ):  # a current batch is full, yield the batch # when chunk boundary has not been set
-                    if (
-                        int_chunk_size_for_checking_boundary is not None
-                    ):  # when chunk boundary checking is active
-                        ns["index_chunk_end"] = (
-                            int_entry // int_chunk_size_for_checking_boundary
-                        )  # set the chunk boundary
-                    else:
-                        yield __compose_batch()  # return a batch
-                        # initialize the next batch
-                        ns["index_batch"] += 1
-                        ns["int_num_of_previously_returned_entries"] += len(
-                            ns["l_int_entry_current_batch"]
-                        )  # update the total number of entries returned
-                        ns["l_int_entry_current_batch"] = []
-                        ns["int_accumulated_weight_current_batch"] = 0
-
-            # initialize next 'weight_calculation_batch'
-            ns["l_int_entry_for_weight_calculation_batch"] = []
-
-        for int_entry in BA.find(
-            ba
-        ):  # iterate through active entries of the given bitarray
-            ns["l_int_entry_for_weight_calculation_batch"].append(
-                int_entry
-            )  # collect int_entry for the current 'weight_calculation_batch'
-            # once 'weight_calculation' batch is full, process the 'weight_calculation' batch
-            if (
-                len(ns["l_int_entry_for_weight_calculation_batch"])
-                == int_num_entries_for_each_weight_calculation_batch
-            ):  # if batch is full
-                for (
-                    e
-                ) in find_batch():  # generate batch from the 'weight_calculation' batch
-                    yield e
-        if (
-            len(ns["l_int_entry_for_weight_calculation_batch"]) > 0
-        ):  # process the remaining entries
-            for (
-                e
-            ) in (
-                find_batch()
-            ):  # generate batch from the last 'weight_calculation_batch'
-                yield e
-        # return the remaining int_entries as the last batch (if available)
-        if len(ns["l_int_entry_current_batch"]) > 0:
-            yield __compose_batch()  # return a batch
+        # generate batches
+        index_start = 0
+        for index_batch, index_end in enumerate(arr_index_end):
+            yield {
+                "index_batch": index_batch,
+                "l_int_entry_current_batch": arr_int_entry[
+                    index_start:index_end
+                ].tolist(),
+                "int_num_of_previously_returned_entries": index_start,
+                "int_accumulated_weight_current_batch": int(
+                    arr_cumsum_weight[index_end - 1]
+                    - (arr_cumsum_weight[index_start - 1] if index_start > 0 else 0)
+                ),
+            }
+            index_start = index_end
 
 
 """ a class for representing a layer of RamData """
@@ -10943,6 +11943,9 @@ class RamDataLayer:
 
                 # delete from the storage
                 self._fo.rm(f"{self._path_folder_ramdata_layer}{mode}/")
+                ZarrChunkCache.invalidate_all(
+                    f"{self._path_folder_ramdata_layer}{mode}/"
+                )  # drop the cached chunks of the deleted RAMtx
 
     def survey_number_of_records_for_each_entry(self):
         """# 2023-06-09 22:28:39
@@ -11061,12 +12064,14 @@ class RamData:
             "knn_classifier",
             "knn_embedder",
             "knngraph",
-            "knnindex",
         }
         self._set_type_model_keras_model = {
             "deep_learning.keras.classifier",
             "deep_learning.keras.embedder",
         }  # model containing keras model. keras model can be retrieved from the 'dict_model' using 'dl_model' as a key
+        self._set_type_model_memory_mapped_knnindex = {
+            "knnindex",
+        }  # model containing a kNN index that will be stored as memory-mappable arrays. the index can be retrieved from the 'dict_model' using 'knnindex' as a key
         self._dict_metadata_cached = None
 
         """ soft-coded settings """
@@ -12228,17 +13233,51 @@ class RamData:
             if path_file_src is None:  # if source file is not available
                 return False
 
-            # file-locking (simply checking the presense of the lock)
-            if self.use_locking:  # %% FILE LOCKING %%
-                path_folder_model_src = f"{path_file_src.rsplit( '/', 1 )[ 0 ]}/"  # retrieve the folder path of the models of the source RamData
-                self._lh.wait_lock(
-                    f"{path_folder_model_src}{str_prefix_file_model}.lock"
+            # file-locking (simply checking the presense of the lock)
+            if self.use_locking:  # %% FILE LOCKING %%
+                path_folder_model_src = f"{path_file_src.rsplit( '/', 1 )[ 0 ]}/"  # retrieve the folder path of the models of the source RamData
+                self._lh.wait_lock(
+                    f"{path_folder_model_src}{str_prefix_file_model}.lock"
+                )
+
+            self._fo.cp(path_file_src, path_file_dest)  # copy file
+
+        # load model
+        if type_model in self._set_type_model_memory_mapped_knnindex:
+            # define paths
+            name_model_file = f"{str_prefix_file_model}.tar.gz"
+            path_prefix_model = f"{path_folder_models}{str_prefix_file_model}"
+            path_file_model = path_prefix_model + ".tar.gz"
+
+            # download the model file
+            __search_and_download_model_file(name_model_file)
+
+            # exit if the file does not exists
+            if not self._fo.exists(path_file_model):
+                # load a model saved as a single pickle file (previous versions)
+                path_file_model = f"{path_prefix_model}.pickle"
+                return (
+                    bk.PICKLE_Read(path_file_model)
+                    if self._fo.exists(path_file_model)
+                    else None
                 )
 
-            self._fo.cp(path_file_src, path_file_dest)  # copy file
+            # extract tar.gz
+            if not self._fo.exists(
+                path_prefix_model
+            ):  # if the model has not been extracted from the tar.gz archive
+                tar_extract(path_file_model, path_folder_models)
 
-        # load model
-        if type_model in self._set_type_model_picklable:  # handle picklable models
+            model = bk.PICKLE_Read(
+                f"{path_prefix_model}/metadata.pickle"
+            )  # load metadata first
+            if (
+                "knnindex" not in model
+            ):  # if the index has been stored as arrays, memory-map the index
+                model["knnindex"] = MemoryMappedKNNIndex(
+                    f"{path_prefix_model}/knnindex/"
+                )
+        elif type_model in self._set_type_model_picklable:  # handle picklable models
             # define path
             name_model_file = f"{str_prefix_file_model}.pickle"
             path_file_model = f"{path_folder_models}{name_model_file}"
@@ -12376,6 +13415,7 @@ class RamData:
         # retrieve the prefix of the file
         str_prefix_file_model = self.get_model_prefix(name_model, type_model)
 
+        path_folder_knnindex_temp = None  # a temporary copy of a memory-mapped index
         try:
             # locking
             if self.use_locking:  # %% FILE LOCKING %%
@@ -12392,6 +13432,18 @@ class RamData:
                 path_folder_models_local = f"{self._path_folder_temp}models/"  # define a local folder to save/load model
                 self._fo.mkdir(path_folder_models_local)  # create a local folder
 
+            # copy a memory-mapped index to a temporary folder before deleting the previous model, since the index can be located in the folder of the previous model (e.g. an index loaded from the current RamData is saved again using the same name)
+            if (
+                type_model in self._set_type_model_memory_mapped_knnindex
+                and isinstance(model.get("knnindex"), MemoryMappedKNNIndex)
+            ):
+                path_folder_knnindex_temp = (
+                    f"{self._path_folder_temp}knnindex_{bk.UUID( )}/"
+                )
+                shutil.copytree(
+                    model["knnindex"].path_folder, path_folder_knnindex_temp
+                )
+
             # if the model already exists in the current RamData (excluding components), delete the model
             if self.check_model(
                 name_model=name_model,
@@ -12413,6 +13465,33 @@ class RamData:
                 tar_create(
                     path_file_model, path_prefix_model
                 )  # create tar.gz file of pumap object for efficient retrieval and download
+            elif type_model in self._set_type_model_memory_mapped_knnindex:
+                path_prefix_model = f"{path_folder_models_local}{str_prefix_file_model}"
+                path_file_model = path_prefix_model + ".tar.gz"
+                knnindex = model.pop(
+                    "knnindex"
+                )  # remove the index from dict_model, and save the index as memory-mappable arrays
+                if isinstance(knnindex, MemoryMappedKNNIndex):
+                    os.makedirs(path_prefix_model, exist_ok=True)
+                    shutil.move(
+                        path_folder_knnindex_temp, f"{path_prefix_model}/knnindex/"
+                    )  # move the copy of the index
+                elif MemoryMappedKNNIndex.is_convertible(knnindex):
+                    MemoryMappedKNNIndex.save_nndescent(
+                        knnindex, f"{path_prefix_model}/knnindex/"
+                    )
+                else:  # an index that cannot be converted will be pickled with the metadata
+                    model["knnindex"] = knnindex
+                os.makedirs(path_prefix_model, exist_ok=True)
+                bk.PICKLE_Write(
+                    f"{path_prefix_model}/metadata.pickle", model
+                )  # save metadata as a pickle file
+                model["knnindex"] = (
+                    knnindex  # put 'knnindex' back to the 'model' for its downstream usage
+                )
+                tar_create(
+                    path_file_model, path_prefix_model
+                )  # create tar.gz file of the model for efficient retrieval and download
             elif (
                 type_model in self._set_type_model_keras_model
             ):  # handle 'dict_model' containing 'dl_model'
@@ -12445,6 +13524,10 @@ class RamData:
                 )  # upload the model
                 self._fo.rm(path_file_model)  # delete the local copy
         finally:
+            if path_folder_knnindex_temp is not None and os.path.exists(
+                path_folder_knnindex_temp
+            ):  # delete the copy of the index if it has not been moved
+                shutil.rmtree(path_folder_knnindex_temp)
             # locking
             if self.use_locking:  # %% FILE LOCKING %%
                 self._lh.release_lock(
@@ -12524,6 +13607,11 @@ class RamData:
                 # if an extracted folder exists, delete the folder
                 if self._fo.exists(path_prefix_model):
                     self._fo.rm(path_prefix_model)
+                if (
+                    type_model in self._set_type_model_memory_mapped_knnindex
+                    and not self._fo.exists(path_file_model)
+                ):  # delete a model saved as a single pickle file (previous versions)
+                    path_file_model = path_prefix_model + ".pickle"
             int_file_size = os.path.getsize(
                 path_file_model
             )  # retrieve file size of the model
@@ -12917,6 +14005,9 @@ class RamData:
 
             # delete an entire layer
             self._fo.rm(f"{self._path_folder_ramdata}{name_layer}/")
+            ZarrChunkCache.invalidate_all(
+                f"{self._path_folder_ramdata}{name_layer}/"
+            )  # drop the cached chunks of the deleted layer
 
             # remove the current layer from the metadata
             self.update_metadata(l_name_layer_to_be_deleted=[name_layer])
@@ -13122,7 +14213,11 @@ class RamData:
         l_str_bc = None
         if flag_use_str_repr_bc:
             dict_map = self.bc.map_int
-            l_str_bc = list(dict_map[i] for i in BA.to_integer_indices(ba_entry_bc))
+            l_str_bc = (
+                list(dict_map[BA.to_integer_indices(ba_entry_bc)])
+                if isinstance(dict_map, np.ndarray)
+                else list(dict_map[i] for i in BA.to_integer_indices(ba_entry_bc))
+            )  # map integer representations to string representations
             del dict_map
         if (
             flag_str_not_loaded_bc
@@ -13139,7 +14234,11 @@ class RamData:
         l_str_ft = None
         if flag_use_str_repr_ft:
             dict_map = self.ft.map_int
-            l_str_ft = list(dict_map[i] for i in BA.to_integer_indices(ba_entry_ft))
+            l_str_ft = (
+                list(dict_map[BA.to_integer_indices(ba_entry_ft)])
+                if isinstance(dict_map, np.ndarray)
+                else list(dict_map[i] for i in BA.to_integer_indices(ba_entry_ft))
+            )  # map integer representations to string representations
             del dict_map
         if (
             flag_str_not_loaded_ft
@@ -13278,8 +14377,9 @@ class RamData:
         l_name_col_summarized: Union[list, None] = None,
         str_prefix: Union[str, None] = None,
         str_suffix: str = "",
+        flag_summarizing_func_for_a_batch: bool = False,
     ):
-        """# 2023-03-26 12:29:02
+        """# 2026-10-17 12:35:12
         this function summarize entries of the given axis (0 = barcode, 1 = feature) using the given function
 
         example usage: calculate total sum, standard deviation, pathway enrichment score calculation, etc.
@@ -13319,6 +14419,11 @@ class RamData:
         'str_prefix' : an additional prefix on the new columns of the axis metadata. if None is given (by default), f"{name_layer}_" will be used as a prefix
         'str_suffix' : an additional suffix of the new columns of the axis metadata that will contain summarized results
             * the output column name will be f"{str_prefix}{e}{str_suffix}", where {e} is the key of the dictionary returned by the 'summarizing_func'
+        'flag_summarizing_func_for_a_batch' : if True, the given 'summarizing_func' will be called once for each batch with the data of all entries of the batch given as a CSR-like block (see 'RAMtx.get_csr_block'), which avoids calling a Python function for each entry. the function should have the following signature:
+
+                    summarizing_func( self, arr_int_entry_of_axis_for_querying, arr_indptr, arr_int_entries_of_axis_not_for_querying, arr_value ) -> dictionary containing 'key' as summarized metric name and 'value' as an array of summarized values (one value for each entry of 'arr_int_entry_of_axis_for_querying')
+
+                    the records of the i-th entry are 'arr_int_entries_of_axis_not_for_querying[ arr_indptr[ i ] : arr_indptr[ i + 1 ] ]' and 'arr_value[ arr_indptr[ i ] : arr_indptr[ i + 1 ] ]'. (the pre-defined functions always use this signature)
 
         ** warning ** existing columns will be overwritten!
 
@@ -13371,98 +14476,85 @@ class RamData:
         )
 
         int_num_threads = self.int_num_cpus  # set the number of threads
+        summarizing_func_for_a_batch = (
+            None  # initialize a function summarizing all entries of a batch at once
+        )
         if summarizing_func == "sum":
 
-            def summarizing_func(
+            def summarizing_func_for_a_batch(
                 self,
-                int_entry_of_axis_for_querying,
+                arr_int_entry_of_axis_for_querying,
+                arr_indptr,
                 arr_int_entries_of_axis_not_for_querying,
                 arr_value,
             ):
-                """# 2022-08-01 21:05:06
-                calculate sum of the values of the current entry
+                """# 2026-10-17 12:10:44
+                calculate sum of the values of each entry of a batch (a CSR-like block)
 
-                assumes 'int_num_records' > 0
+                assumes 'int_num_records' > 0 for each entry
                 """
-                int_num_records = len(
-                    arr_value
-                )  # retrieve the number of records of the current entry
-                dict_summary = {
-                    "sum": np.sum(arr_value)
-                    if int_num_records > 30
-                    else sum(arr_value),
-                    "num_nonzero_values": int_num_records,
-                }  # if an input array has more than 30 elements, use np.sum to calculate the sum
-                dict_summary["mean"] = (
-                    dict_summary["sum"] / int_total_num_entries_not_indexed
-                )  # calculate the mean
-                return dict_summary
+                arr_sum = np.add.reduceat(arr_value, arr_indptr[:-1])
+                return {
+                    "sum": arr_sum,
+                    "num_nonzero_values": np.diff(arr_indptr),
+                    "mean": arr_sum
+                    / int_total_num_entries_not_indexed,  # calculate the mean
+                }
 
         elif summarizing_func == "sum_and_dev":
 
-            def summarizing_func(
+            def summarizing_func_for_a_batch(
                 self,
-                int_entry_of_axis_for_querying,
+                arr_int_entry_of_axis_for_querying,
+                arr_indptr,
                 arr_int_entries_of_axis_not_for_querying,
                 arr_value,
             ):
-                """# 2022-08-01 21:05:02
-                calculate sum and deviation of the values of the current entry
+                """# 2026-10-17 12:12:31
+                calculate sum and deviation of the values of each entry of a batch (a CSR-like block)
 
-                assumes 'int_num_records' > 0
+                assumes 'int_num_records' > 0 for each entry
                 """
-                int_num_records = len(
-                    arr_value
-                )  # retrieve the number of records of the current entry
-                dict_summary = {
-                    "sum": np.sum(arr_value)
-                    if int_num_records > 30
-                    else sum(arr_value),
-                    "num_nonzero_values": int_num_records,
-                }  # if an input array has more than 30 elements, use np.sum to calculate the sum
-                dict_summary["mean"] = (
-                    dict_summary["sum"] / int_total_num_entries_not_indexed
+                arr_int_num_records = np.diff(arr_indptr)
+                arr_sum = np.add.reduceat(arr_value, arr_indptr[:-1])
+                arr_mean = (
+                    arr_sum / int_total_num_entries_not_indexed
                 )  # calculate the mean
-                arr_dev = (
-                    arr_value - dict_summary["mean"]
-                ) ** 2  # calculate the deviation
-                dict_summary["deviation"] = (
-                    np.sum(arr_dev) if int_num_records > 30 else sum(arr_dev)
-                )
-                dict_summary["variance"] = (
-                    dict_summary["deviation"] / (int_total_num_entries_not_indexed - 1)
-                    if int_total_num_entries_not_indexed > 1
-                    else np.nan
-                )
-                return dict_summary
+                arr_deviation = np.add.reduceat(
+                    (arr_value - np.repeat(arr_mean, arr_int_num_records)) ** 2,
+                    arr_indptr[:-1],
+                )  # calculate the deviation
+                return {
+                    "sum": arr_sum,
+                    "num_nonzero_values": arr_int_num_records,
+                    "mean": arr_mean,
+                    "deviation": arr_deviation,
+                    "variance": (
+                        arr_deviation / (int_total_num_entries_not_indexed - 1)
+                        if int_total_num_entries_not_indexed > 1
+                        else np.full(len(arr_deviation), np.nan)
+                    ),
+                }
 
         elif summarizing_func == "count_min_max":
-            int_min_num_records_for_numpy = 30
 
-            def summarizing_func(
+            def summarizing_func_for_a_batch(
                 self,
-                int_entry_of_axis_for_querying,
+                arr_int_entry_of_axis_for_querying,
+                arr_indptr,
                 arr_int_entries_of_axis_not_for_querying,
                 arr_value,
             ):
-                """# 2022-07-27 15:29:07
-                calculate sum and deviation of the values of the current entry
+                """# 2026-10-17 12:14:02
+                calculate the number of records and the min and max values of each entry of a batch (a CSR-like block)
 
-                assumes 'int_num_records' > 0
+                assumes 'int_num_records' > 0 for each entry
                 """
-                int_num_records = len(
-                    arr_value
-                )  # retrieve the number of records of the current entry
-                dict_summary = {
-                    "count": int_num_records,
-                    "max": np.max(arr_value)
-                    if int_num_records > int_min_num_records_for_numpy
-                    else max(arr_value),
-                    "min": np.min(arr_value)
-                    if int_num_records > int_min_num_records_for_numpy
-                    else min(arr_value),
-                }  # if an input array has more than 'int_min_num_records_for_numpy' elements, use numpy to calculate min/max values
-                return dict_summary
+                return {
+                    "count": np.diff(arr_indptr),
+                    "max": np.maximum.reduceat(arr_value, arr_indptr[:-1]),
+                    "min": np.minimum.reduceat(arr_value, arr_indptr[:-1]),
+                }
 
         elif not hasattr(
             summarizing_func, "__call__"
@@ -13470,6 +14562,8 @@ class RamData:
             if self.verbose:
                 logger.info(f"given summarizing_func is not a function, exiting")
             return -1
+        elif flag_summarizing_func_for_a_batch:
+            summarizing_func_for_a_batch = summarizing_func  # use the given function that summarizes all entries of a batch at once
         # infer 'l_name_col_summarized'
         if l_name_col_summarized is None:
             # retrieve the list of key values returned by 'summarizing_func' by applying dummy values
@@ -13477,7 +14571,15 @@ class RamData:
                 10, dtype=int
             )
             l_name_col_summarized = list(
-                summarizing_func(self, 0, arr_dummy_zero, arr_dummy_one)
+                summarizing_func_for_a_batch(
+                    self,
+                    np.zeros(1, dtype=int),
+                    np.array([0, 10]),
+                    arr_dummy_zero,
+                    arr_dummy_one,
+                )
+                if summarizing_func_for_a_batch is not None
+                else summarizing_func(self, 0, arr_dummy_zero, arr_dummy_one)
             )
         l_name_col_summarized = sorted(
             l_name_col_summarized
@@ -13508,7 +14610,7 @@ class RamData:
 
             # define functions for multiprocessing step
             def process_batch(pipe_receiver_batch, pipe_sender_result):
-                """# 2022-05-08 13:19:07
+                """# 2026-10-17 14:31:05
                 summarize a given list of entries, and send summarized result through a pipe
                 """
                 while True:
@@ -13526,47 +14628,96 @@ class RamData:
                     if int_num_entries_in_a_batch == 0:
                         logger.info("empty batch detected")
 
-                    # iterate through the data of each entry
-                    dict_data = dict(
-                        (name_col, []) for name_col in l_name_col_summarized
-                    )  # collect results
-                    l_int_entry_of_axis_for_querying = (
-                        []
-                    )  # collect list of queried entries with valid results
-                    for (
-                        int_entry_of_axis_for_querying,
-                        arr_int_entry_of_axis_not_for_querying,
-                        arr_value,
-                    ) in zip(
-                        *rtx[l_int_entry_current_batch]
-                    ):  # retrieve data for the current batch
-                        # retrieve summary for the entry
-                        dict_res = summarizing_func(
-                            self,
-                            int_entry_of_axis_for_querying,
+                    if summarizing_func_for_a_batch is not None:
+                        # summarize all entries of the batch at once
+                        (
+                            l_int_entry_of_axis_for_querying,
+                            arr_indptr,
+                            arr_int_entry_of_axis_not_for_querying,
+                            arr_value,
+                        ) = rtx.get_csr_block(
+                            l_int_entry_current_batch
+                        )  # retrieve data for the current batch as a CSR-like block
+                        dict_res = (
+                            summarizing_func_for_a_batch(
+                                self,
+                                l_int_entry_of_axis_for_querying,
+                                arr_indptr,
+                                arr_int_entry_of_axis_not_for_querying,
+                                arr_value,
+                            )
+                            if len(l_int_entry_of_axis_for_querying) > 0
+                            else dict()
+                        )  # summarize the data of the batch
+                        dict_data = dict(
+                            (
+                                name_col,
+                                (
+                                    dict_res[name_col]
+                                    if name_col in dict_res
+                                    else np.full(
+                                        len(l_int_entry_of_axis_for_querying), np.nan
+                                    )
+                                ),
+                            )
+                            for name_col in l_name_col_summarized
+                        )  # collect results
+                        del (
+                            arr_indptr,
                             arr_int_entry_of_axis_not_for_querying,
                             arr_value,
-                        )  # summarize the data for the entry
-                        # if the result empty, does not collect the result
-                        if dict_res is None:
-                            continue
-                        # collect the result
-                        # collect the int_entry with a valid result
-                        l_int_entry_of_axis_for_querying.append(
-                            int_entry_of_axis_for_querying
                         )
-                        # collect the result
-                        for name_col in l_name_col_summarized:
-                            dict_data[name_col].append(
-                                dict_res[name_col] if name_col in dict_res else np.nan
+                    else:
+                        # iterate through the data of each entry
+                        dict_data = dict(
+                            (name_col, []) for name_col in l_name_col_summarized
+                        )  # collect results
+                        l_int_entry_of_axis_for_querying = (
+                            []
+                        )  # collect list of queried entries with valid results
+                        for (
+                            int_entry_of_axis_for_querying,
+                            arr_int_entry_of_axis_not_for_querying,
+                            arr_value,
+                        ) in zip(
+                            *rtx[l_int_entry_current_batch]
+                        ):  # retrieve data for the current batch
+                            # retrieve summary for the entry
+                            dict_res = summarizing_func(
+                                self,
+                                int_entry_of_axis_for_querying,
+                                arr_int_entry_of_axis_not_for_querying,
+                                arr_value,
+                            )  # summarize the data for the entry
+                            # if the result empty, does not collect the result
+                            if dict_res is None:
+                                continue
+                            # collect the result
+                            # collect the int_entry with a valid result
+                            l_int_entry_of_axis_for_querying.append(
+                                int_entry_of_axis_for_querying
                             )
+                            # collect the result
+                            for name_col in l_name_col_summarized:
+                                dict_data[name_col].append(
+                                    dict_res[name_col]
+                                    if name_col in dict_res
+                                    else np.nan
+                                )
+
                     pipe_sender_result.send(
                         (
                             int_num_processed_records,
                             l_int_entry_of_axis_for_querying,
-                            dict_data,
+                            dict(
+                                (name_col_with_prefix_and_suffix, dict_data[name_col])
+                                for name_col, name_col_with_prefix_and_suffix in zip(
+                                    l_name_col_summarized,
+                                    l_name_col_summarized_with_name_layer_prefix_and_suffix,
+                                )
+                            ),  # rename column names
                         )
-                    )  # send information about the output file
+                    )  # send the summarized result (arrays will be transferred through the shared memory)
                 pipe_sender_result.send(
                     None
                 )  # notify the worker has completed all works
@@ -13587,31 +14738,41 @@ class RamData:
             """ % writer process % """
 
             def _save_result(p_i, p_o):
-                """# 2023-11-15 15:54:21
-                a function for writing results to storage
+                """# 2026-10-17 14:33:27
+                a function for writing results to storage. the arrays of the results are retrieved from the shared memory of the workers, and released once the results have been written.
                 """
                 while True:
-                    inputs = p_i.recv()
-                    if inputs is None:
+                    res = p_i.recv()
+                    if res is None:
                         break
-                    l_int_entry_of_axis_for_querying, dict_data = inputs  # parse inputs
+                    (
+                        l_int_entry_of_axis_for_querying,
+                        dict_data,
+                    ) = bk.Unpack_Shared_Memory_Objects(
+                        res
+                    )  # retrieve views of the arrays
 
                     """ update metadata """
                     df = pd.DataFrame(
-                        dict_data, index=l_int_entry_of_axis_for_querying
-                    )  # compose dataframe using 'dict_data'
-                    df.rename(
-                        columns=dict(
-                            (name_col, name_col_with_prefix_and_suffix)
-                            for name_col, name_col_with_prefix_and_suffix in zip(
-                                l_name_col_summarized,
-                                l_name_col_summarized_with_name_layer_prefix_and_suffix,
-                            )
+                        dict(
+                            (
+                                name_col,
+                                (
+                                    list(dict_data[name_col])
+                                    if isinstance(dict_data[name_col], np.ndarray)
+                                    and dict_data[name_col].ndim > 1
+                                    else dict_data[name_col]
+                                ),
+                            )  # a multi-dimensional column is given as a list of arrays
+                            for name_col in dict_data
                         ),
-                        inplace=True,
-                    )  # rename column names
+                        index=l_int_entry_of_axis_for_querying,
+                    )  # compose dataframe using 'dict_data'
                     zdf.update(df, flag_use_index_as_integer_indices=True)
-                    del df
+                    del df, l_int_entry_of_axis_for_querying, dict_data
+                    bk.Release_Shared_Memory_Objects(
+                        res
+                    )  # release the space of the shared memory
                 p_o.send("completed")  # notify all works has been completed
 
             pm2w_s, pm2w_r = mp.Pipe()
@@ -13626,7 +14787,9 @@ class RamData:
             p_writer.start()
 
             def post_process_batch(res):
-                """# 2022-07-06 03:21:49"""
+                """# 2026-10-17 14:35:10
+                forward the result to the writer (arrays in the shared memory are not retrieved in the main process)
+                """
                 (
                     int_num_processed_records,
                     l_int_entry_of_axis_for_querying,
@@ -13634,6 +14797,7 @@ class RamData:
                 ) = res  # parse result
                 # exit if no result has been collected
                 if len(l_int_entry_of_axis_for_querying) == 0:
+                    bk.Release_Shared_Memory_Objects(res)
                     return
 
                 pbar.update(int_num_processed_records)  # update the progress bar
@@ -13653,6 +14817,9 @@ class RamData:
                     post_process_batch=post_process_batch,
                     int_num_threads=int_num_threads,
                     int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop=0.2,
+                    flag_use_shared_memory=True,
+                    flag_release_shared_memory_after_post_processing=False,  # arrays are released by the writer
+                    l_process_releasing_shared_memory=[p_writer],
                 )
                 """ % writer process % """
                 pm2w_s.send(
@@ -13693,8 +14860,10 @@ class RamData:
         dtype_sparse_mtx=np.float64,
         dtype_sparse_mtx_index=np.float64,
         dict_metadata_description: Union[dict, None] = dict(),
+        flag_func_for_a_batch: bool = False,
+        flag_compact_sparse_layout: bool = False,
     ):
-        """# 2023-07-16 13:05:44
+        """# 2026-10-17 15:10:12
         this function apply a function and/or filters to the records of the given data, and create a new data object with 'name_layer_new' as its name.
 
         example usage: calculate normalized count data, perform log1p transformation, cell filtering, etc.
@@ -13762,7 +14931,7 @@ class RamData:
                 Of note, output to 'Dense' format can be slow for remote file systems (e.g. Amazon S3), since writing the dense Zarr array will rely on a file-locking using a directory on the remote file system by default. Therefore, providing the path to store file-system based lock is highly recommended for creating a 'dense' matrix output.
 
                 Additionally, the follwoing arguments can be given with for each instruction.
-                    'dtype_of_row_and_col_indices',  'dtype_of_value',  'int_num_of_records_in_a_chunk_zarr_matrix',  'int_num_of_entries_in_a_chunk_zarr_matrix_index',  'chunks_dense',  'dtype_dense_mtx',  'dtype_sparse_mtx',  'dtype_sparse_mtx_index',
+                    'dtype_of_row_and_col_indices',  'dtype_of_value',  'int_num_of_records_in_a_chunk_zarr_matrix',  'int_num_of_entries_in_a_chunk_zarr_matrix_index',  'chunks_dense',  'dtype_dense_mtx',  'dtype_sparse_mtx',  'dtype_sparse_mtx_index',  'flag_compact_sparse_layout',
                 For example,
                 mode_instructions = [ [ 'dense_for_querying_features', 'dense_for_querying_barcode', { 'int_num_of_entries_in_a_chunk_zarr_matrix_index' : 1000 } ],
                                       [ 'dense', [ 'sparse_for_querying_features', 'dense', 'sparse_for_querying_barcodes' ], { 'chunks_dense' : ( 1000, 1000 ) } ] ]
@@ -13791,6 +14960,18 @@ class RamData:
         int_num_of_records_in_a_chunk_zarr_matrix = 500000, int_num_of_entries_in_a_chunk_zarr_matrix_index = 1000, chunks_dense = ( 2000, 1000 ) : determines the chunk size of the output ramtx objects
         dtype_dense_mtx = np.float64, dtype_sparse_mtx = np.float64, dtype_sparse_mtx_index = np.float64 : determines the output dtype
         dict_metadata_description : Union[ dict, None ] = dict( ) # the metadata (optional) of the newly created output layer.
+        flag_func_for_a_batch : bool = False # if True, the given 'func' (or the functions for each axis) will be called once for each batch with the data of all entries of the batch given as a CSR-like block (see 'RAMtx.get_csr_block'), which avoids calling a Python function for each entry. the function should have the following signature:
+
+                 func( self, arr_int_entry_of_axis_for_querying, arr_indptr, arr_int_entries_of_axis_not_for_querying, arr_value ) -> arr_int_entry_of_axis_for_querying, arr_indptr, arr_int_entries_of_axis_not_for_querying, arr_value
+
+                 the records of the i-th entry of 'arr_int_entry_of_axis_for_querying' are 'arr_int_entries_of_axis_not_for_querying[ arr_indptr[ i ] : arr_indptr[ i + 1 ] ]' and 'arr_value[ arr_indptr[ i ] : arr_indptr[ i + 1 ] ]'. entries can be discarded by removing them from the returned block.
+                 for example, the following function can be used for log1p transformation of all entries of a batch:
+
+                 def func( self, arr_int_entry_of_axis_for_querying, arr_indptr, arr_int_entries_of_axis_not_for_querying, arr_value ) :
+                     return arr_int_entry_of_axis_for_querying, arr_indptr, arr_int_entries_of_axis_not_for_querying, np.log1p( arr_value )
+
+                 (the pre-defined functions always use this signature)
+        flag_compact_sparse_layout : bool = False # if True, the output sparse RAMtx objects will be written in the compact (v2) layout, in which the indices (uint32) and the values ('dtype_of_value') of the records are stored in separate Zarr arrays ('matrix.indices.zarr' and 'matrix.data.zarr') and the index is stored as int64 ('dtype_sparse_mtx' and 'dtype_sparse_mtx_index' will be ignored). the layout is recorded in the metadata of the RAMtx object, and is detected automatically when the RAMtx object is loaded.
 
         =================
         input attributes
@@ -13863,33 +15044,38 @@ class RamData:
             # define identity function if 'func' has not been given
             def func_bc(
                 self,
-                int_entry_of_axis_for_querying,
+                arr_int_entry_of_axis_for_querying,
+                arr_indptr,
                 arr_int_entries_of_axis_not_for_querying,
                 arr_value,
             ):
                 return (
-                    int_entry_of_axis_for_querying,
+                    arr_int_entry_of_axis_for_querying,
+                    arr_indptr,
                     arr_int_entries_of_axis_not_for_querying,
                     arr_value,
                 )
 
             func_ft = func_bc  # use the same function for the other axis
+            flag_func_for_a_batch = True  # transform a batch at once
         elif func == "log1p":
 
             def func_bc(
                 self,
-                int_entry_of_axis_for_querying,
+                arr_int_entry_of_axis_for_querying,
+                arr_indptr,
                 arr_int_entries_of_axis_not_for_querying,
                 arr_value,
             ):
-                arr_value += 1
                 return (
-                    int_entry_of_axis_for_querying,
+                    arr_int_entry_of_axis_for_querying,
+                    arr_indptr,
                     arr_int_entries_of_axis_not_for_querying,
-                    np.log10(arr_value),
+                    np.log10(arr_value + 1),
                 )
 
             func_ft = func_bc  # use the same function for the other axis
+            flag_func_for_a_batch = True  # transform a batch at once
 
         # check the validility of the input arguments
         if not name_layer in self.layers:
@@ -13943,6 +15129,9 @@ class RamData:
             dtype_dense_mtx = dict_setting["dtype_dense_mtx"]
             dtype_sparse_mtx = dict_setting["dtype_sparse_mtx"]
             dtype_sparse_mtx_index = dict_setting["dtype_sparse_mtx_index"]
+            flag_compact_sparse_layout = dict_setting.get(
+                "flag_compact_sparse_layout", False
+            )
 
             # initialize
             flag_spawn = (
@@ -13993,18 +15182,29 @@ class RamData:
                 self._fo.mkdir(
                     path_folder_ramtx_sparse, exist_ok=True
                 )  # create the output ramtx object folder
-                path_folder_ramtx_sparse_mtx = f"{path_folder_ramtx_sparse}matrix.zarr/"  # retrieve the folder path of the output RAMtx Zarr matrix object.
-                # assert not fs.filesystem_operations( 'exists', path_folder_ramtx_sparse_mtx ) # output zarr object should NOT exists!
+                # compose the names, the shapes of a record, and the dtypes of the Zarr arrays storing the records of the output sparse RAMtx
+                if flag_compact_sparse_layout:
+                    dict_za_mtx_sparse = {
+                        "matrix.indices.zarr": ((), np.uint32),
+                        "matrix.data.zarr": ((), dtype_of_value),
+                    }  # in the compact layout, indices and values are stored in separate arrays with their native dtypes
+                    dtype_sparse_mtx_index = np.int64
+                else:
+                    dict_za_mtx_sparse = {
+                        "matrix.zarr": ((2,), dtype_sparse_mtx)
+                    }  # each record contains two values (index and value)
                 # assert not fs.filesystem_operations( 'exists', f'{path_folder_ramtx_sparse}matrix.index.zarr' ) # output zarr object should NOT exists!
                 # open fork-safe zarr objects (initialize zarr objects)
-                path_za_mtx_sparse = path_folder_ramtx_sparse_mtx
-                self._zs.open(
-                    path_za_mtx_sparse,
-                    mode="w",
-                    shape=(rtx._int_num_records, 2),
-                    chunks=(int_num_of_records_in_a_chunk_zarr_matrix, 2),
-                    dtype=dtype_sparse_mtx,
-                )  # use the same chunk size of the current RAMtx
+                for name_za, (shape_record, dtype_za) in dict_za_mtx_sparse.items():
+                    self._zs.open(
+                        f"{path_folder_ramtx_sparse}{name_za}/",
+                        mode="w",
+                        shape=(rtx._int_num_records,) + shape_record,
+                        chunks=(int_num_of_records_in_a_chunk_zarr_matrix,)
+                        + shape_record,
+                        dtype=dtype_za,
+                    )  # use the same chunk size of the current RAMtx
+                path_za_mtx_sparse = f"{path_folder_ramtx_sparse}{list( dict_za_mtx_sparse )[ -1 ]}/"  # the Zarr array containing values
                 self._zs.open(
                     f"{path_folder_ramtx_sparse}matrix.index.zarr",
                     mode="w",
@@ -14027,8 +15227,9 @@ class RamData:
 
             # define functions for multiprocessing step
             def process_batch(pipe_receiver_batch, pipe_sender_result):
-                """# 2022-05-08 13:19:07
+                """# 2026-10-17 12:41:26
                 retrieve data for a given list of entries, transform values, and save to a Zarr object and index the object, and returns the number of written records and the paths of the written objects (index and Zarr matrix)
+                if 'flag_func_for_a_batch' is True, the data of all entries of a batch will be transformed at once as a CSR-like block
                 """
                 str_uuid = bk.UUID()
 
@@ -14045,7 +15246,8 @@ class RamData:
                         break
                     # initialize
                     path_folder_zarr_output_sparse = None
-                    path_file_index_output_sparse = None
+                    arr_index_output_sparse = None
+                    dict_manifest_output_sparse = None
 
                     # parse batch
                     (
@@ -14073,68 +15275,78 @@ class RamData:
 
                     """ %% SPARSE %% """
                     if flag_sparse_ramtx_output:  # if sparse output is present
-                        # open an Zarr object
-                        path_folder_zarr_output_sparse = f"{path_folder_temp}{bk.UUID( )}.zarr/"  # define output Zarr object path
-                        path_za_output_sparse = path_folder_zarr_output_sparse
-                        self._zs.open(
-                            path_za_output_sparse,
-                            mode="w",
-                            shape=(rtx._int_num_records, 2),
-                            chunks=prop_za_mtx_sparse["chunks"],
-                            dtype=dtype_of_value,
-                        )  # 'za_output_sparse' will be stored locally, and ZarrServer will not be used
-                        # define an index file
-                        path_file_index_output_sparse = f"{path_folder_temp}{bk.UUID( )}.index.tsv.gz"  # define output index file path
+                        path_folder_zarr_output_sparse = f"{path_folder_temp}{bk.UUID( )}.zarr/"  # define output folder path containing Zarr objects of the batch
                         l_index = []  # collect index
 
-                    # iterate through the data of each entry and transform the data
-                    for (
-                        int_entry_of_axis_for_querying,
-                        arr_int_entry_of_axis_not_for_querying,
-                        arr_value,
-                    ) in zip(
-                        *rtx[l_int_entry_current_batch]
-                    ):  # retrieve data for the current batch
-                        # transform the values of an entry
+                    if flag_func_for_a_batch:
+                        # transform the values of all entries of the batch at once
                         (
-                            int_entry_of_axis_for_querying,
+                            arr_int_entry_of_axis_for_querying_of_a_batch,
+                            arr_indptr,
                             arr_int_entry_of_axis_not_for_querying,
                             arr_value,
                         ) = func(
                             self,
+                            *(
+                                arr if arr.flags.writeable else np.array(arr)
+                                for arr in rtx.get_csr_block(l_int_entry_current_batch)
+                            ),
+                        )  # retrieve data for the current batch as a CSR-like block, and transform the block # read-only arrays (memory-mapped layout) are copied, since 'func' can modify the arrays in-place
+                        int_num_entries_transformed = len(
+                            arr_int_entry_of_axis_for_querying_of_a_batch
+                        )  # retrieve the number of returned entries
+                    else:
+                        # iterate through the data of each entry and transform the data
+                        for (
                             int_entry_of_axis_for_querying,
                             arr_int_entry_of_axis_not_for_querying,
                             arr_value,
-                        )
-                        int_num_records = len(
-                            arr_value
-                        )  # retrieve number of returned records
-
-                        """ %% SPARSE %% """
-                        if flag_sparse_ramtx_output:  # if sparse output is present
-                            # collect index
-                            l_index.append(
-                                [
-                                    int_entry_of_axis_for_querying,
-                                    int_num_records_written,
-                                    int_num_records_written + int_num_records,
-                                ]
+                        ) in zip(
+                            *rtx[l_int_entry_current_batch]
+                        ):  # retrieve data for the current batch
+                            # transform the values of an entry
+                            (
+                                int_entry_of_axis_for_querying,
+                                arr_int_entry_of_axis_not_for_querying,
+                                arr_value,
+                            ) = func(
+                                self,
+                                int_entry_of_axis_for_querying,
+                                arr_int_entry_of_axis_not_for_querying,
+                                arr_value,
                             )
+                            int_num_records = len(
+                                arr_value
+                            )  # retrieve number of returned records
+
+                            """ %% SPARSE %% """
+                            if flag_sparse_ramtx_output:  # if sparse output is present
+                                # collect index
+                                l_index.append(
+                                    [
+                                        int_entry_of_axis_for_querying,
+                                        int_num_records_written,
+                                        int_num_records_written + int_num_records,
+                                    ]
+                                )
 
-                        # collect transformed data
-                        l_int_entry_of_axis_for_querying.append(
-                            int_entry_of_axis_for_querying
-                        )
-                        l_arr_int_entry_of_axis_not_for_querying.append(
-                            arr_int_entry_of_axis_not_for_querying
-                        )
-                        l_arr_value.append(arr_value)
-                        int_num_records_written += (
-                            int_num_records  # update the number of records written
-                        )
+                            # collect transformed data
+                            l_int_entry_of_axis_for_querying.append(
+                                int_entry_of_axis_for_querying
+                            )
+                            l_arr_int_entry_of_axis_not_for_querying.append(
+                                arr_int_entry_of_axis_not_for_querying
+                            )
+                            l_arr_value.append(arr_value)
+                            int_num_records_written += (
+                                int_num_records  # update the number of records written
+                            )
+                        int_num_entries_transformed = len(
+                            l_arr_int_entry_of_axis_not_for_querying
+                        )  # retrieve the number of returned entries
 
                     """ when returned result is empty, return an empty result """
-                    if len(l_arr_int_entry_of_axis_not_for_querying) == 0:
+                    if int_num_entries_transformed == 0:
                         pipe_sender_result.send(
                             (
                                 index_batch,
@@ -14142,9 +15354,40 @@ class RamData:
                                 int_num_records_written,
                                 None,
                                 None,
+                                None,
                             )
                         )
                         continue
+
+                    """ combine results """
+                    if flag_func_for_a_batch:
+                        arr_int_num_records = np.diff(
+                            arr_indptr
+                        )  # retrieve the number of records of each entry
+                        int_num_records_written = int(
+                            arr_indptr[-1]
+                        )  # retrieve the number of records written
+                        """ %% SPARSE %% """
+                        if flag_sparse_ramtx_output:  # if sparse output is present
+                            l_index = np.column_stack(
+                                (
+                                    arr_int_entry_of_axis_for_querying_of_a_batch,
+                                    arr_indptr[:-1],
+                                    arr_indptr[1:],
+                                )
+                            )  # compose index
+                        # compose 'arr_int_entry_of_axis_for_querying'
+                        arr_int_entry_of_axis_for_querying = np.repeat(
+                            arr_int_entry_of_axis_for_querying_of_a_batch.astype(
+                                self._dtype_of_feature_and_barcode_indices
+                            ),
+                            arr_int_num_records,
+                        )
+                        del (
+                            arr_int_entry_of_axis_for_querying_of_a_batch,
+                            arr_indptr,
+                            arr_int_num_records,
+                        )  # delete intermediate objects
                     else:
                         del (
                             int_entry_of_axis_for_querying,
@@ -14152,34 +15395,33 @@ class RamData:
                             arr_value,
                         )  # delete references
 
-                    """ combine results """
-                    # combine the arrays
-                    arr_int_entry_of_axis_not_for_querying = np.concatenate(
-                        l_arr_int_entry_of_axis_not_for_querying
-                    )
+                        # combine the arrays
+                        arr_int_entry_of_axis_not_for_querying = np.concatenate(
+                            l_arr_int_entry_of_axis_not_for_querying
+                        )
 
-                    arr_value = np.concatenate(l_arr_value)
-                    del l_arr_value  # delete intermediate objects
+                        arr_value = np.concatenate(l_arr_value)
+                        del l_arr_value  # delete intermediate objects
 
-                    # compose 'arr_int_entry_of_axis_for_querying'
-                    arr_int_entry_of_axis_for_querying = np.zeros(
-                        len(arr_int_entry_of_axis_not_for_querying),
-                        dtype=self._dtype_of_feature_and_barcode_indices,
-                    )  # create an empty array
-                    int_pos = 0
-                    for int_entry_of_axis_for_querying, a in zip(
-                        l_int_entry_of_axis_for_querying,
-                        l_arr_int_entry_of_axis_not_for_querying,
-                    ):
-                        n = len(a)
-                        arr_int_entry_of_axis_for_querying[
-                            int_pos : int_pos + n
-                        ] = int_entry_of_axis_for_querying  # compose 'arr_int_entry_of_axis_for_querying'
-                        int_pos += n  # update the current position
-                    del (
-                        l_int_entry_of_axis_for_querying,
-                        l_arr_int_entry_of_axis_not_for_querying,
-                    )  # delete intermediate objects
+                        # compose 'arr_int_entry_of_axis_for_querying'
+                        arr_int_entry_of_axis_for_querying = np.zeros(
+                            len(arr_int_entry_of_axis_not_for_querying),
+                            dtype=self._dtype_of_feature_and_barcode_indices,
+                        )  # create an empty array
+                        int_pos = 0
+                        for int_entry_of_axis_for_querying, a in zip(
+                            l_int_entry_of_axis_for_querying,
+                            l_arr_int_entry_of_axis_not_for_querying,
+                        ):
+                            n = len(a)
+                            arr_int_entry_of_axis_for_querying[
+                                int_pos : int_pos + n
+                            ] = int_entry_of_axis_for_querying  # compose 'arr_int_entry_of_axis_for_querying'
+                            int_pos += n  # update the current position
+                        del (
+                            l_int_entry_of_axis_for_querying,
+                            l_arr_int_entry_of_axis_not_for_querying,
+                        )  # delete intermediate objects
 
                     """ %% DENSE %% """
                     if flag_dense_ramtx_output:  # if dense output is present
@@ -14199,20 +15441,49 @@ class RamData:
 
                     """ %% SPARSE %% """
                     if flag_sparse_ramtx_output:  # if sparse output is present
-                        self._zs[
-                            path_za_output_sparse, :int_num_records_written
-                        ] = np.vstack(
-                            (arr_int_entry_of_axis_not_for_querying, arr_value)
-                        ).T  # save transformed data
-                        self._zs.resize(
-                            path_za_output_sparse, int_num_records_written, 2
-                        )  # resize the output Zarr object
-                        pd.DataFrame(l_index).to_csv(
-                            path_file_index_output_sparse,
-                            header=None,
-                            index=None,
-                            sep="\t",
-                        )  # write the index file
+                        for name_za, arr in zip(
+                            dict_za_mtx_sparse,
+                            (
+                                [arr_int_entry_of_axis_not_for_querying, arr_value]
+                                if flag_compact_sparse_layout
+                                else [
+                                    np.vstack(
+                                        (
+                                            arr_int_entry_of_axis_not_for_querying,
+                                            arr_value,
+                                        )
+                                    ).T
+                                ]
+                            ),
+                        ):
+                            shape_record, dtype_za = dict_za_mtx_sparse[name_za]
+                            zarr.open_array(
+                                f"{path_folder_zarr_output_sparse}{name_za}/",
+                                mode="w",
+                                shape=(int_num_records_written,) + shape_record,
+                                chunks=(int_num_records_in_a_chunk_of_mtx_sparse,)
+                                + shape_record,
+                                dtype=dtype_za,
+                                fill_value=0,
+                            )[
+                                :
+                            ] = arr  # save transformed data # the Zarr object of the batch is stored locally and private to the worker, therefore ZarrServer is not used, and the Zarr object is created with the exact size # use the same dtype, chunk size, and compressor of the output RAMtx so that chunks can be transferred by renaming
+                        dict_manifest_output_sparse = dict(
+                            (
+                                name_za,
+                                list(
+                                    e
+                                    for e in os.listdir(
+                                        f"{path_folder_zarr_output_sparse}{name_za}/"
+                                    )
+                                    if e[0] != "."
+                                ),
+                            )
+                            for name_za in dict_za_mtx_sparse
+                        )  # compose a manifest of the chunk files written for the batch (metadata files starting with '.' will be excluded)
+                        arr_index_output_sparse = np.asarray(
+                            l_index, dtype=np.int64
+                        )  # compose the index as a binary array, which will be directly sent to the post-processing worker
 
                     pipe_sender_result.send(
                         (
@@ -14220,9 +15491,10 @@ class RamData:
                             int_num_processed_records,
                             int_num_records_written,
                             path_folder_zarr_output_sparse,
-                            path_file_index_output_sparse,
+                            arr_index_output_sparse,
+                            dict_manifest_output_sparse,
                         )
-                    )  # send information about the output files
+                    )  # send information about the output files and the index
                 pipe_sender_result.send(
                     None
                 )  # notify the worker has completed all works
@@ -14245,29 +15517,34 @@ class RamData:
                 """create a worker process for off-laoding works (mostly file I/O) asynchronously so that main process can delegate works to the working processes without being blocked during file I/O."""
 
                 def post_processing_sparse_matrix_output(pipe_input, pipe_output):
-                    """# 2022-12-04 14:47:27
+                    """# 2026-10-17 15:21:39
                     post-process sparse matrix output
                     """
                     # initialize
                     flag_is_destination_remote = is_remote_url(
-                        path_folder_ramtx_sparse_mtx
+                        path_folder_ramtx_sparse
                     )  # flag indicating whether a output destination is remotely located
-                    path_folder_local_dest = (
-                        f"{path_folder_temp}matrix.zarr/"
-                        if flag_is_destination_remote
-                        else path_folder_ramtx_sparse_mtx
-                    )  # define a path to the local output folder, which is either final destionation (local output) or temporary destionation before being uploaded (remote output)
-
-                    self._fo.mkdir(
-                        path_folder_local_dest
-                    )  # make the local output folder
-                    # initialize zarr objects
-                    path_za_mtx_sparse = path_folder_ramtx_sparse_mtx
-                    self._zs.open(
-                        path_za_mtx_sparse,
-                        mode="a",
-                    )  # use the same chunk size of the current RAMtx
-                    prop_za_mtx_sparse = self._zs.properties[path_za_mtx_sparse]
+                    dict_path_folder_local_dest = dict(
+                        (
+                            name_za,
+                            (
+                                f"{path_folder_temp}{name_za}/"
+                                if flag_is_destination_remote
+                                else f"{path_folder_ramtx_sparse}{name_za}/"
+                            ),
+                        )
+                        for name_za in dict_za_mtx_sparse
+                    )  # define paths to the local output folders, which are either final destionations (local output) or temporary destionations before being uploaded (remote output)
+
+                    for name_za in dict_za_mtx_sparse:
+                        self._fo.mkdir(
+                            dict_path_folder_local_dest[name_za]
+                        )  # make the local output folder
+                        # initialize zarr objects
+                        self._zs.open(
+                            f"{path_folder_ramtx_sparse}{name_za}/",
+                            mode="a",
+                        )  # use the same chunk size of the current RAMtx
                     path_za_mtx_sparse_index = (
                         f"{path_folder_ramtx_sparse}matrix.index.zarr"
                     )
@@ -14289,7 +15566,8 @@ class RamData:
                             int_num_processed_records,
                             int_num_records_written,
                             path_folder_zarr_output,
-                            path_file_index_output,
+                            arr_index,
+                            dict_manifest,
                         ) = ins  # parse inputs
 
                         """ post-process sparse matrix output """
@@ -14301,56 +15579,67 @@ class RamData:
                             )
                         )  # retrieve the number of chunks that were written for a batch
 
-                        # check size of Zarr matrix object, and increase the size if needed.
                         int_min_num_rows_required = (
                             int_num_chunks_written_to_ramtx
                             + int_num_chunks_written_for_a_batch
                         ) * int_num_records_in_a_chunk_of_mtx_sparse  # calculate the minimal number of rows required in the RAMtx Zarr matrix object
-                        if (
-                            prop_za_mtx_sparse["shape"][0] < int_min_num_rows_required
-                        ):  # check whether the size of Zarr matrix is smaller than the minimum requirement
-                            self._zs.resize(
-                                path_za_mtx_sparse, int_min_num_rows_required, 2
-                            )  # resize the Zarr matrix so that data can be safely added to the matrix
-
-                        # copy Zarr chunks to the sparse RAMtx Zarr matrix object folder
-                        os.chdir(
-                            path_folder_zarr_output
-                        )  # to reduce the length of file path, change directory to the output folder before retrieving file paths of the chunks
-                        for e in glob.glob(
-                            "*.0"
-                        ):  # to reduce the size of file paths returned by glob, use relative path to retrieve the list of chunk files of the Zarr matrix of the current batch
-                            index_chunk = int(
-                                e.split(".0", 1)[0]
-                            )  # retrieve the integer index of the chunk
-                            os.rename(
-                                e,
-                                path_folder_local_dest
-                                + str(index_chunk + int_num_chunks_written_to_ramtx)
-                                + ".0",
-                            )  # simply rename the chunk to transfer stored values
-
-                        # upload chunks to remote locations and delete local chunks
-                        if flag_is_destination_remote:
-                            # %% REMOTE %%
-                            self._fo.cp(
-                                path_folder_local_dest,
-                                path_folder_ramtx_sparse,
-                                flag_recursive=True,
-                            )  # upload the processed chunks to the remote locations
-                            self._fo.rm(
-                                path_folder_local_dest, flag_recursive=True
-                            )  # delete the processed chunks
-                            self._fo.mkdir(
-                                path_folder_local_dest
-                            )  # re-create the local temporary output folder
-
-                        # retrieve index data of the current batch
-                        arr_index = pd.read_csv(
-                            path_file_index_output, header=None, sep="\t"
-                        ).values.astype(
-                            int
-                        )  # convert to integer dtype
+                        for name_za, (
+                            shape_record,
+                            dtype_za,
+                        ) in dict_za_mtx_sparse.items():
+                            # check size of Zarr matrix object, and increase the size if needed.
+                            path_za = f"{path_folder_ramtx_sparse}{name_za}/"
+                            if (
+                                self._zs.properties[path_za]["shape"][0]
+                                < int_min_num_rows_required
+                            ):  # check whether the size of Zarr matrix is smaller than the minimum requirement
+                                self._zs.resize(
+                                    path_za, int_min_num_rows_required, *shape_record
+                                )  # resize the Zarr matrix so that data can be safely added to the matrix
+
+                            # copy Zarr chunks to the sparse RAMtx Zarr matrix object folder
+                            path_folder_local_dest = dict_path_folder_local_dest[
+                                name_za
+                            ]
+                            path_folder_zarr_output_za = (
+                                f"{path_folder_zarr_output}{name_za}/"
+                            )
+                            for e in dict_manifest[
+                                name_za
+                            ]:  # use the manifest of the chunk files of the Zarr matrix of the current batch (without changing the working directory or listing the folder)
+                                str_index_chunk, *l_str_suffix = e.split(
+                                    "."
+                                )  # retrieve the integer index of the chunk along the first axis ('0' for 1D arrays, '0.0' for 2D arrays)
+                                os.rename(
+                                    path_folder_zarr_output_za + e,
+                                    path_folder_local_dest
+                                    + ".".join(
+                                        [
+                                            str(
+                                                int(str_index_chunk)
+                                                + int_num_chunks_written_to_ramtx
+                                            )
+                                        ]
+                                        + l_str_suffix
+                                    ),
+                                )  # simply rename the chunk to transfer stored values
+
+                            # upload chunks to remote locations and delete local chunks
+                            if flag_is_destination_remote:
+                                # %% REMOTE %%
+                                self._fo.cp(
+                                    path_folder_local_dest,
+                                    path_folder_ramtx_sparse,
+                                    flag_recursive=True,
+                                )  # upload the processed chunks to the remote locations
+                                self._fo.rm(
+                                    path_folder_local_dest, flag_recursive=True
+                                )  # delete the processed chunks
+                                self._fo.mkdir(
+                                    path_folder_local_dest
+                                )  # re-create the local temporary output folder
+
+                        # update the index data of the current batch
                         arr_index[:, 1:] += (
                             int_num_chunks_written_to_ramtx
                             * int_num_records_in_a_chunk_of_mtx_sparse
@@ -14367,16 +15656,16 @@ class RamData:
                             int_num_chunks_written_for_a_batch
                         )
 
-                        # delete temporary files and folders
+                        # delete temporary folders
                         self._fo.rm(path_folder_zarr_output)
-                        self._fo.rm(path_file_index_output)
                     """ send output and indicate the post-processing has been completed """
                     pipe_output.send(int_len_matrix)
                     # delete temporary folders
                     if (
                         flag_is_destination_remote
                     ):  # delete local destination folder only when the final destination folder is located remotely (when the final destination folder is located locally, the final destination folder is the 'path_folder_local_dest')
-                        self._fo.rm(path_folder_local_dest)
+                        for name_za in dict_path_folder_local_dest:
+                            self._fo.rm(dict_path_folder_local_dest[name_za])
                     return  # exit
 
                 # create pipes for communications
@@ -14409,7 +15698,8 @@ class RamData:
                     int_num_processed_records,
                     int_num_records_written,
                     path_folder_zarr_output,
-                    path_file_index_output,
+                    arr_index_output,
+                    dict_manifest_output,
                 ) = res
                 ns[
                     "int_num_records_written_to_ramtx"
@@ -14443,7 +15733,8 @@ class RamData:
                             int_num_processed_records,
                             int_num_records_written,
                             path_folder_zarr_output,
-                            path_file_index_output,
+                            arr_index_output,
+                            dict_manifest_output,
                         ) = res_batch_for_post_processing  # parse result
                         # if zero number of records were written, update the progress bar and continue to the next batch
                         if int_num_records_written == 0:
@@ -14472,9 +15763,6 @@ class RamData:
                         pbar.update(
                             int_num_processed_records
                         )  # update the progress bar
-                os.chdir(
-                    self.path_folder_temp
-                )  # change path to root temporary folder before deleting the current temp folder (to avoid deleting the working directory)
 
             # transform the values of the RAMtx using multiple processes
             bk.Multiprocessing_Batch_Generator_and_Workers(
@@ -14524,6 +15812,7 @@ class RamData:
                             "dict_metadata": {
                                 "mode": mode_sparse,
                                 "flag_ramtx_sorted_by_id_feature": rtx.is_for_querying_features,
+                                "flag_compact_sparse_layout": flag_compact_sparse_layout,
                                 "str_completed_time": bk.TIME_GET_timestamp(True),
                                 "int_num_features": int_num_features,
                                 "int_num_barcodes": int_num_barcodes,
@@ -14545,10 +15834,15 @@ class RamData:
                 )  # receive the length of the matrix
                 p_sparse_matrix_post_processing.join()  # dismiss worker
                 # resize the za_mtx_sparse matrix if its length is larger than 'int_len_matrix'
-                if prop_za_mtx_sparse["shape"][0] > int_len_matrix:
-                    self._zs.resize(
-                        path_za_mtx_sparse, int_len_matrix, 2
-                    )  # resize the Zarr matrix to according to the actual number of rows in the matrix
+                for name_za, (shape_record, dtype_za) in dict_za_mtx_sparse.items():
+                    path_za = f"{path_folder_ramtx_sparse}{name_za}/"
+                    self._zs.open(
+                        path_za, mode="a", reload=True
+                    )  # reload the Zarr matrix resized by the worker process
+                    if self._zs.properties[path_za]["shape"][0] > int_len_matrix:
+                        self._zs.resize(
+                            path_za, int(int_len_matrix), *shape_record
+                        )  # resize the Zarr matrix to according to the actual number of rows in the matrix
 
             # remove temp folder once all operations have been completed
             self._fo.rm(path_folder_temp)
@@ -14588,6 +15882,7 @@ class RamData:
             "dtype_dense_mtx": dtype_dense_mtx,
             "dtype_sparse_mtx": dtype_sparse_mtx,
             "dtype_sparse_mtx_index": dtype_sparse_mtx_index,
+            "flag_compact_sparse_layout": flag_compact_sparse_layout,
         }
         # { 'dense', 'dense_for_querying_barcodes', 'dense_for_querying_features', 'sparse_for_querying_barcodes', 'sparse_for_querying_features' }
         set_modes_valid = {
@@ -14900,6 +16195,9 @@ class RamData:
             # revert to the original the setting
             zarr_end_multiprocessing_write()
 
+            # drop the cached chunks of the output layer, which have been (re)written
+            ZarrChunkCache.invalidate_all(path_folder_layer_new)
+
             """
             update the metadata
             """
@@ -17242,18 +18540,12 @@ class RamData:
                 else:
                     ba_filter |= ba
         else:
-            mtx = rtx.get_sparse_matrix(
-                l_int_entry_query
-            )  # retrieve expr matrix of the queries in sparse format
-            arr_expr = np.array(
-                (
-                    mtx[l_int_entry_query]
-                    if flag_axis_for_querying_is_barcode
-                    else mtx[:, l_int_entry_query].T
-                ).sum(axis=0)
-            )[
-                0
-            ]  # retrieve summarized expression values of the queried entries # convert it to numpy array of shape (len_axis_not_for_querying, )
+            mtx, _ = rtx.get_sparse_matrix(
+                l_int_entry_query, flag_compact=True
+            )  # retrieve expr matrix of the queries in sparse format (rows = the queried entries)
+            arr_expr = np.asarray(
+                mtx.sum(axis=0)
+            ).ravel()  # retrieve summarized expression values of the queried entries # convert it to numpy array of shape (len_axis_not_for_querying, )
         ax_not_for_querying.restore_view()  # restore view
 
         """ save result as a column """
@@ -17285,11 +18577,12 @@ class RamData:
         float_prop_subsampling=1,
         name_col_filter_subsampled="filter_pca_subsampled",
         flag_ipca_whiten=False,
+        mode_training: Literal["ipca", "covariance"] = "ipca",
         int_num_threads=3,
         flag_show_graph=True,
         int_index_component_reference: Union[None, int] = None,
     ):
-        """# 2023-04-03 18:23:02
+        """# 2026-10-17 11:02:37
         Perform incremental PCA in a very memory-efficient manner.
         the resulting incremental PCA model will be saved in the RamData models database.
 
@@ -17303,6 +18596,9 @@ class RamData:
         'int_num_barcodes_in_ipca_batch' : number of barcodes in an Incremental PCA computation
         'float_prop_subsampling' : proportion of barcodes to used to train representation of single-barcode data using incremental PCA. 1 = all barcodes, 0.1 = 10% of barcodes, etc. subsampling will be performed using a random probability, meaning the actual number of barcodes subsampled will not be same every time.
         'flag_ipca_whiten' : a flag for an incremental PCA computation (Setting this flag to 'True' will reduce the efficiency of model learning, but might make the model more generalizable)
+        mode_training : Literal[ 'ipca', 'covariance' ] = 'ipca' # the method for training the PCA model.
+            'ipca' : the sparse matrix of each batch will be retrieved by the workers, and the incremental PCA model will be updated (using a dense array) for each batch in the main process.
+            'covariance' : the sufficient statistics (the number of 'observations', the sum, and the Gram matrix of the features) will be computed sparsely for each batch by the workers, and reduced in the main process. the principal components will be computed from the eigendecomposition of the covariance matrix once all batches have been processed. since the main process only sums the statistics, the training scales with 'int_num_threads'. the Gram matrix (the number of features x the number of features) is transferred for each batch, therefore this mode is suitable for a moderate number of features (e.g. ~2,000 highly variable features). the sufficient statistics will be saved with the model, so that the model can be updated with new training data later using the 'covariance' mode. the trained model is saved as an 'ipca' model compatible with 'apply_pca'.
         'int_num_threads' : number of threads for parallel data retrieval/iPCA transformation/ZarrDataFrame update. 3~5 would be ideal. should be larger than 2
         'axis' : Union[ int, str ] = 'barcodes' # axis representing samples or 'points'. the other axis will represents the features of the 'points'
         'flag_show_graph' : show graph
@@ -17334,6 +18630,8 @@ class RamData:
                 whiten=flag_ipca_whiten,
             )  # copy = False to increase memory-efficiency
 
+            dict_sufficient_statistics = None  # initialize the sufficient statistics
+
             # handle inputs
             flag_axis_is_barcode = self._determine_axis(
                 axis
@@ -17345,6 +18643,9 @@ class RamData:
                 )
             # parse the model
             ipca = model["ipca"]
+            dict_sufficient_statistics = model.get(
+                "dict_sufficient_statistics", None
+            )  # models trained by the 'ipca' mode do not contain sufficient statistics
             flag_axis_is_barcode = model["flag_axis_is_barcode"]
             int_num_components = model["int_num_components"]
             int_num_barcodes_in_ipca_batch = model["int_num_barcodes_in_ipca_batch"]
@@ -17362,6 +18663,23 @@ class RamData:
                     axis
                 )  # retrieve a flag indicating whether the data is summarized for each barcode or not # override settings from the loaded model
 
+            # an existing model trained without sufficient statistics can only be updated incrementally
+            if mode_training == "covariance" and dict_sufficient_statistics is None:
+                if self.verbose:
+                    logger.warning(
+                        f"existing iPCA model '{name_model}' does not contain sufficient statistics, and the model will be updated using the 'ipca' mode."
+                    )
+                mode_training = "ipca"
+
+        # check 'mode_training'
+        if mode_training not in {"ipca", "covariance"}:
+            if self.verbose:
+                logger.error(
+                    f"invalid argument 'mode_training' : '{mode_training}', should be either 'ipca' or 'covariance'."
+                )
+            return -1
+        flag_covariance_mode = mode_training == "covariance"
+
         """
         # load layer, axis, and RAMtx
         """
@@ -17460,16 +18778,27 @@ class RamData:
                 )
                 int_num_retrieved_entries = len(l_int_entry_current_batch)
 
+                X, _ = rtx.get_sparse_matrix(
+                    l_int_entry_current_batch,
+                    flag_compact=True,
+                    int_entry_start=int_num_of_previously_returned_entries,
+                    int_num_rows=int_num_retrieved_entries,
+                )  # retrieve a batch-sized sparse matrix
+                if flag_covariance_mode:
+                    # compute sufficient statistics of the batch sparsely
+                    X = scipy.sparse.csr_matrix(X, dtype=np.float64)
+                    X = (
+                        int_num_retrieved_entries,
+                        np.asarray(X.sum(axis=0)).ravel(),  # sum of each feature
+                        (X.T @ X).toarray(),  # Gram matrix
+                    )
                 pipe_sender_result.send(
                     (
                         int_num_of_previously_returned_entries,
                         int_num_retrieved_entries,
-                        rtx.get_sparse_matrix(l_int_entry_current_batch)[
-                            int_num_of_previously_returned_entries : int_num_of_previously_returned_entries
-                            + int_num_retrieved_entries
-                        ],
+                        X,
                     )
-                )  # retrieve and send sparse matrix as an input to the incremental PCA # resize sparse matrix
+                )  # send sparse matrix as an input to the incremental PCA, or the sufficient statistics of the batch
             pipe_sender_result.send(None)  # notify the worker has completed all works
 
         pbar = progress_bar(
@@ -17478,14 +18807,42 @@ class RamData:
         )  # initialize the progress bar
 
         def post_process_batch(res):
-            """# 2022-07-13 22:18:18
-            perform partial fit for batch
+            """# 2026-10-17 11:08:49
+            perform partial fit for batch, or reduce the sufficient statistics of the batch
             """
+            nonlocal dict_sufficient_statistics
             (
                 int_num_of_previously_returned_entries,
                 int_num_retrieved_entries,
                 X,
             ) = res  # parse the result
+            if flag_covariance_mode:
+                int_num_samples, arr_sum, arr_gram = X
+                if dict_sufficient_statistics is None:
+                    dict_sufficient_statistics = {
+                        "int_num_samples": int_num_samples,
+                        "arr_sum": arr_sum.copy(),
+                        "arr_gram": arr_gram.copy(),
+                    }  # copy the arrays, since the received arrays can be views of the shared memory
+                else:
+                    dict_sufficient_statistics["int_num_samples"] += int_num_samples
+                    dict_sufficient_statistics["arr_sum"] += arr_sum
+                    dict_sufficient_statistics["arr_gram"] += arr_gram
+            else:
+                fit_batch(X)
+            pbar.update(
+                int_num_retrieved_entries
+            )  # update the progress bar once the training has been completed
+
+            if self.verbose:  # report
+                logger.info(
+                    f"fit completed for {int_num_of_previously_returned_entries + 1}-{int_num_of_previously_returned_entries + int_num_retrieved_entries} barcodes"
+                )
+
+        def fit_batch(X):
+            """# 2026-10-17 11:09:31
+            perform partial fit of the incremental PCA model for batch
+            """
             try:
                 ipca.partial_fit(
                     X.toarray()
@@ -17497,14 +18854,6 @@ class RamData:
                     logger.info(
                         f"current batch contains less than {int_num_components} number of barcodes, which is incompatible with iPCA model. therefore, current batch will be skipped."
                     )
-            pbar.update(
-                int_num_retrieved_entries
-            )  # update the progress bar once the training has been completed
-
-            if self.verbose:  # report
-                logger.info(
-                    f"fit completed for {int_num_of_previously_returned_entries + 1}-{int_num_of_previously_returned_entries + int_num_retrieved_entries} barcodes"
-                )
 
         # fit iPCA using multiple processes
         bk.Multiprocessing_Batch_Generator_and_Workers(
@@ -17515,9 +18864,68 @@ class RamData:
             post_process_batch=post_process_batch,
             int_num_threads=max(int_num_threads, 2),
             int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop=0.2,
+            flag_use_shared_memory=True,  # transfer sparse matrices through the shared memory
+            int_num_bytes_shared_memory_buffer=max(
+                2**26, 3 * 8 * len(ax_features.meta) ** 2
+            ),  # the buffer should be able to hold the Gram matrices of the batches being transferred
         )  # number of threads for multi-processing is 2 ~ 5 # generate batch with fixed number of barcodes
         pbar.close()  # close the progress bar
 
+        # compute principal components from the sufficient statistics
+        if flag_covariance_mode and dict_sufficient_statistics is not None:
+            int_num_samples = dict_sufficient_statistics["int_num_samples"]
+            arr_mean = dict_sufficient_statistics["arr_sum"] / int_num_samples
+            arr_cov = (
+                dict_sufficient_statistics["arr_gram"]
+                - int_num_samples * np.outer(arr_mean, arr_mean)
+            ) / max(
+                int_num_samples - 1, 1
+            )  # unbiased covariance matrix
+            arr_cov = (arr_cov + arr_cov.T) / 2  # remove numerical asymmetry
+            arr_eigenvalue, arr_eigenvector = np.linalg.eigh(arr_cov)
+            arr_eigenvalue = np.clip(
+                arr_eigenvalue[::-1], 0, None
+            )  # sort in the descending order, and remove negative values from numerical errors
+            arr_component = arr_eigenvector[:, ::-1].T
+            arr_component *= np.sign(
+                arr_component[
+                    np.arange(len(arr_component)),
+                    np.abs(arr_component).argmax(axis=1),
+                ]
+            )[
+                :, None
+            ]  # flip the signs so that the largest absolute value of each component is positive (same convention as IncrementalPCA)
+            int_num_features = len(arr_mean)
+            int_num_components_fitted = min(
+                int_num_components, int_num_features, int_num_samples
+            )
+            # set the attributes of the IncrementalPCA object so that it can be used as a fitted model
+            ipca.n_components_ = int_num_components_fitted
+            ipca.n_features_in_ = int_num_features
+            ipca.n_samples_seen_ = int_num_samples
+            ipca.mean_ = arr_mean
+            ipca.var_ = np.clip(np.diag(arr_cov), 0, None) * (
+                (int_num_samples - 1) / int_num_samples
+            )  # biased variance (same convention as IncrementalPCA)
+            ipca.components_ = arr_component[:int_num_components_fitted]
+            ipca.explained_variance_ = arr_eigenvalue[:int_num_components_fitted]
+            float_total_variance = arr_eigenvalue.sum()
+            ipca.explained_variance_ratio_ = (
+                ipca.explained_variance_ / float_total_variance
+                if float_total_variance > 0
+                else np.zeros_like(ipca.explained_variance_)
+            )
+            ipca.singular_values_ = np.sqrt(
+                ipca.explained_variance_ * max(int_num_samples - 1, 1)
+            )
+            ipca.noise_variance_ = (
+                arr_eigenvalue[int_num_components_fitted:].mean()
+                if int_num_components_fitted < min(int_num_samples, int_num_features)
+                else 0.0
+            )
+        elif not flag_covariance_mode:
+            dict_sufficient_statistics = None  # the sufficient statistics are no longer valid once the model has been updated incrementally
+
         # report
         if self.verbose:
             logger.info("fit completed")
@@ -17554,6 +18962,7 @@ class RamData:
             ),  # retrieve string representations
             "filter_of_axis_features": ax_features.filter,
             "identifier": self.identifier,
+            "dict_sufficient_statistics": dict_sufficient_statistics,
         }
         if name_model is not None:  # if the given 'name_model' is valid
             self.save_model(model, name_model, "ipca")  # save model
@@ -17748,10 +19157,14 @@ class RamData:
                     (
                         int_num_processed_records,
                         l_int_entry_current_batch,
-                        rtx.get_sparse_matrix(l_int_entry_current_batch)[
-                            int_num_of_previously_returned_entries : int_num_of_previously_returned_entries
-                            + int_num_retrieved_entries
-                        ],
+                        rtx.get_sparse_matrix(
+                            l_int_entry_current_batch,
+                            flag_compact=True,
+                            int_entry_start=int_num_of_previously_returned_entries,
+                            int_num_rows=int_num_retrieved_entries,
+                        )[
+                            0
+                        ],  # retrieve a batch-sized sparse matrix
                     )
                 )  # retrieve data as a sparse matrix and send the result of PCA transformation # send the integer representations of the barcodes for PCA value update
             pipe_sender_result.send(None)  # notify the worker has completed all works
@@ -17822,6 +19235,7 @@ class RamData:
             post_process_batch=post_process_batch,
             int_num_threads=int_num_threads,
             int_num_seconds_to_wait_before_identifying_completed_processes_for_a_loop=0.2,
+            flag_use_shared_memory=True,  # transfer sparse matrices through the shared memory
         )
         pbar.close()  # close the progress bar
         # dismiss the worker
@@ -18129,6 +19543,149 @@ class RamData:
             clusterer,
         )  # return the trained model and computed cluster labels
 
+    def get_knngraph(
+        self,
+        name_col_data: str = "X_pca",
+        int_num_components_data: int = 15,
+        dict_kw_pynndescent_transformer: dict = {
+            "n_neighbors": 10,
+            "metric": "euclidean",
+            "low_memory": True,
+        },
+        knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
+        flag_use_cache: bool = True,
+        int_max_num_cached_knngraphs: int = 4,
+        name_model: Union[str, None] = None,
+    ):
+        """# 2026-10-17 22:05:12
+        retrieve a kNN graph (a CSR adjacency matrix) of the currently active barcodes.
+        the kNN graph is cached as a 'knngraph' model, whose name is composed from the current barcode filter, the data column, the number of components, the kNN parameters, and a fingerprint (SHA-256 hash) of the data, so that multiple clustering runs of the same barcodes (e.g. for different resolutions) can share a single kNN graph. when the data column has been re-written (e.g. PCA has been performed again), a new kNN graph will be built.
+
+        name_col_data : str = "X_pca" # 'name_col' of the column containing data. PCA data is recommended.
+        int_num_components_data : int = 15 # number of components of the data for constructing the kNN graph
+        dict_kw_pynndescent_transformer : dict # a dictionary containing keyworded arguments for the 'pynndescent.PyNNDescentTransformer' method for constructing kNN graph from the data
+        knn_backend : Literal[ "auto", "pynndescent", "brute_force" ] = "auto" # the kNN backend for constructing kNN graph (see 'build_knn_graph')
+        flag_use_cache : bool = True # if True, load the cached kNN graph if available, and cache the kNN graph after building it. if False, always build a new kNN graph without caching.
+        int_max_num_cached_knngraphs : int = 4 # the maximum number of cached kNN graphs. when a new kNN graph is cached, the oldest cached kNN graphs exceeding the limit will be deleted.
+        name_model : Union[ str, None ] = None # if given, the kNN graph will be saved as a 'knngraph' model using the name (see 'load_knngraph'). when the cache is used, a reference to the cached kNN graph will be saved instead of a copy of the kNN graph.
+        """
+        import hashlib
+
+        # retrieve 'Barcode' Axis object
+        ax = self.bc
+
+        # retrieve the data
+        arr_data = ax.meta[name_col_data, None, :int_num_components_data]
+
+        # compose the name of the cached model
+        hash_key = hashlib.sha256(
+            json.dumps(
+                {
+                    "name_col_data": name_col_data,
+                    "int_num_components_data": int_num_components_data,
+                    "dict_kw_pynndescent_transformer": dict_kw_pynndescent_transformer,
+                    "knn_backend": knn_backend,
+                    "int_num_entries": ax.int_num_entries,
+                    "shape": arr_data.shape,
+                    "dtype": str(arr_data.dtype),
+                },
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        if ax.filter is not None:  # hash the active barcodes
+            hash_key.update(ax.filter.tobytes())
+        hash_key.update(
+            np.ascontiguousarray(arr_data).tobytes()
+        )  # hash the data, so that a re-written data column will not be served from the cache
+        name_model_cache = f"knngraph_cache.{hash_key.hexdigest( )[ : 32 ]}"
+        type_model = "knngraph"
+
+        # load the cached knn graph
+        conn = self.load_model(name_model_cache, type_model) if flag_use_cache else None
+        if conn is not None:
+            if self.verbose:
+                logger.info(f"cached knn-graph '{name_model_cache}' loaded")
+        else:
+            # calculate the knngraph
+            conn = build_knn_graph(
+                arr_data,
+                knn_backend=knn_backend,
+                **dict_kw_pynndescent_transformer,
+            )
+
+            # save calculated knngraph
+            if flag_use_cache:
+                self.save_model(
+                    conn,
+                    name_model_cache,
+                    type_model,
+                    dict_metadata_description={
+                        "description": f"cached kNN graph of {conn.shape[ 0 ]} barcodes using the '{name_col_data}' column",
+                        "time_created": time.time(),
+                    },
+                )
+                self.delete_knngraph_cache(
+                    int_num_models_to_keep=int_max_num_cached_knngraphs
+                )  # evict the oldest cached kNN graphs
+        del arr_data
+
+        # save the knngraph (or a reference to the cached knngraph) using the given name
+        if name_model is not None:
+            self.save_model(
+                (
+                    {"name_model_knngraph_cache": name_model_cache}
+                    if flag_use_cache
+                    else conn
+                ),
+                name_model,
+                type_model,
+            )
+        return conn
+
+    def load_knngraph(self, name_model: str):
+        """# 2026-10-17 22:05:12
+        load a kNN graph saved as a 'knngraph' model. a reference to a cached kNN graph (see 'get_knngraph') will be resolved.
+
+        returns None if the model (or the referenced cached kNN graph) does not exist
+        """
+        type_model = "knngraph"
+        conn = self.load_model(name_model, type_model)
+        if isinstance(
+            conn, dict
+        ):  # resolve a reference to the cached kNN graph (None if the cached kNN graph has been deleted)
+            conn = self.load_model(conn["name_model_knngraph_cache"], type_model)
+        return conn
+
+    def delete_knngraph_cache(self, int_num_models_to_keep: int = 0):
+        """# 2026-10-17 22:05:12
+        delete the kNN graphs cached by 'get_knngraph' (the 'knngraph' models with the 'knngraph_cache.' prefix) of the current RamData (excluding components), except for the most recently cached kNN graphs.
+
+        int_num_models_to_keep : int = 0 # the number of the most recently cached kNN graphs to keep. by default, all cached kNN graphs will be deleted.
+
+        returns the number of deleted models
+        """
+        type_model = "knngraph"
+        models = self.models_excluding_components
+        l_time_and_name_model = sorted(
+            (
+                models[id_model].get("time_created", 0),
+                id_model.rsplit("|", 1)[0],
+            )
+            for id_model in models
+            if id_model.startswith("knngraph_cache.")
+            and id_model.endswith(f"|{type_model}")
+        )  # sorted from the oldest to the most recent models
+        l_name_model_to_delete = list(
+            name_model
+            for _, name_model in l_time_and_name_model[
+                : max(0, len(l_time_and_name_model) - int_num_models_to_keep)
+            ]
+        )
+        for name_model in l_name_model_to_delete:
+            self.delete_model(name_model, type_model)
+        return len(l_name_model_to_delete)
+
     def leiden(
         self,
         name_model: str = "leiden",
@@ -18149,12 +19706,14 @@ class RamData:
         name_col_embedding: Union[str, None] = None,
         dict_kw_scatter: dict = {"s": 10, "linewidth": 0, "alpha": 0.05},
         index_col_of_name_col_label: Union[int, None] = None,
+        knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
+        flag_use_knngraph_cache: bool = True,
     ) -> None:
-        """# 2022-08-09 02:19:31
+        """# 2026-10-17 22:05:12
         Perform leiden community detection algorithm (clustering) for the currently active barcodes
 
         arguments:
-        'name_model' : name of the model saved/will be saved in RamData.models database. if the model already exists, 'cut_distance' and 'min_cluster_size' arguments will become active.
+        'name_model' : name of the 'knngraph' model. if the model already exists, the kNN graph of the model will be used. otherwise, the kNN graph will be saved using the name (when the kNN graph cache is used, a reference to the cached kNN graph will be saved) (see 'get_knngraph')
 
         === data input ===
         'name_col_data' : 'name_col' of the column containing data. PCA data is recommended.
@@ -18171,6 +19730,8 @@ class RamData:
         'use_weights' : use weights of the kNN graph for the leiden partitioning
         'dict_kw_leiden_partition' : a dictionary containing keyworded arguments for the 'leidenalg.find_partition' method
         'dict_kw_pynndescent_transformer' : a dictionary containing keyworded arguments for the 'pynndescent.PyNNDescentTransformer' method for constructing kNN graph from the data
+        'knn_backend' : the kNN backend for constructing kNN graph. 'brute_force' performs an exact (deterministic) search, and 'pynndescent' performs an approximate search. if 'auto' is given, 'brute_force' will be used for a moderate number of entries (see 'build_knn_graph')
+        'flag_use_knngraph_cache' : if True, when the kNN graph model 'name_model' does not exist, the kNN graph cached for the current barcode filter and the kNN parameters will be used (the graph will be built and cached if the cache does not exist) (see 'get_knngraph'). the cached kNN graph is identified using a fingerprint of the data, and a new kNN graph will be built when the 'name_col_data' column (e.g. 'X_pca') has been re-written.
 
         === cell filter ===
         'name_col_filter' : the name of 'feature'/'barcode' Axis metadata column to retrieve selection filter for running the current method. if None is given, current barcode/feature filters (if it has been set) will be used as-is.
@@ -18184,7 +19745,6 @@ class RamData:
         # for leiden clustering
         import igraph as ig
         import leidenalg
-        import pynndescent
 
         """
         1) Prepare
@@ -18200,52 +19760,22 @@ class RamData:
         2) construct kNN graph
         """
         # load the knn graph
-        type_model = "knngraph"
-        conn = self.load_model(name_model, type_model)
+        conn = None if name_model is None else self.load_knngraph(name_model)
         if conn is None:  # if the knngraph does not exist, calculate the knngraph
-            knnmodel = pynndescent.PyNNDescentTransformer(
-                **dict_kw_pynndescent_transformer
-            )
-            conn = knnmodel.fit_transform(
-                ax.meta[name_col_data, None, :int_num_components_data]
-            )
-
-            # save calculated knngraph
-            if name_model is not None:  # check validity of 'name_model'
-                self.save_model(
-                    conn, name_model, type_model
-                )  # save knngraph to the RamData
+            conn = self.get_knngraph(
+                name_col_data=name_col_data,
+                int_num_components_data=int_num_components_data,
+                dict_kw_pynndescent_transformer=dict_kw_pynndescent_transformer,
+                knn_backend=knn_backend,
+                flag_use_cache=flag_use_knngraph_cache,
+                name_model=name_model,
+            )  # save calculated knngraph (or a reference to the cached knngraph) to the RamData
 
         """
         3) perform leiden clustering
         """
 
         # construct an igraph object from the knn graph
-        def get_igraph_from_adjacency(adjacency, directed=None):
-            """# 2022-08-09 02:28:09
-            Get igraph graph from adjacency matrix.
-            this code is mostly a copy of a function implemented in scanpy 'https://github.com/scverse/scanpy/blob/536ed15bc73ab5d1131c0d530dd9d4f2dc9aee36/scanpy/_utils/__init__.py'
-            """
-            import igraph as ig
-
-            sources, targets = adjacency.nonzero()
-            weights = adjacency[sources, targets]
-            if isinstance(weights, np.matrix):
-                weights = weights.A1
-            g = ig.Graph(directed=directed)
-            g.add_vertices(adjacency.shape[0])  # this adds adjacency.shape[0] vertices
-            g.add_edges(list(zip(sources, targets)))
-            try:
-                g.es["weight"] = weights
-            except KeyError:
-                pass
-            if g.vcount() != adjacency.shape[0]:
-                if self.verbose:
-                    logger.info(
-                        f"The constructed graph has only {g.vcount( )} nodes. Your adjacency matrix contained redundant nodes."
-                    )
-            return g
-
         g = get_igraph_from_adjacency(conn, directed)
         del conn
         if self.verbose:
@@ -18322,6 +19852,181 @@ class RamData:
 
         return
 
+    def leiden_multi_resolution(
+        self,
+        l_resolution: List[float] = [0.1, 0.2, 0.4, 0.8, 1.6],
+        name_col_data: str = "X_pca",
+        int_num_components_data: int = 15,
+        name_col_label: str = "leiden_multi_resolution",
+        directed: bool = True,
+        use_weights: bool = True,
+        dict_kw_leiden_partition: dict = {"n_iterations": -1, "seed": 0},
+        dict_kw_pynndescent_transformer: dict = {
+            "n_neighbors": 10,
+            "metric": "euclidean",
+            "low_memory": True,
+        },
+        name_col_filter: Union[str, None] = "filter_leiden",
+        knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
+        flag_use_knngraph_cache: bool = True,
+        int_num_processes: int = 5,
+    ) -> None:
+        """# 2026-10-17 22:05:12
+        Perform leiden community detection algorithm (clustering) for the currently active barcodes using multiple resolutions.
+        a single kNN graph is retrieved (see 'get_knngraph'), and leiden clustering for each resolution is performed in parallel using forked processes sharing the kNN graph.
+
+        === data input ===
+        'name_col_data' : 'name_col' of the column containing data. PCA data is recommended.
+        'int_num_components_data' : number of components of the data for clustering
+
+        === output ===
+        'name_col_label' : 'name_col' of the axis metadata that will contain cluster labels. the column will have a secondary axis of the length of 'l_resolution', and the cluster labels of the resolution 'l_resolution[ i ]' will be saved to the i-th column of the secondary axis. an existing column with a secondary axis of a different length will be deleted and re-initialized.
+
+        === clustering arguments ===
+        'l_resolution' : a list of resolutions. please refer to 'resolution_parameter' of 'leidenalg.find_partition' method
+        'directed' : create directed graph. it is recommended to set it to True
+        'use_weights' : use weights of the kNN graph for the leiden partitioning
+        'dict_kw_leiden_partition' : a dictionary containing keyworded arguments for the 'leidenalg.find_partition' method
+        'dict_kw_pynndescent_transformer' : a dictionary containing keyworded arguments for the 'pynndescent.PyNNDescentTransformer' method for constructing kNN graph from the data
+        'knn_backend' : the kNN backend for constructing kNN graph (see 'build_knn_graph')
+        'flag_use_knngraph_cache' : if True, use (and save) the kNN graph cached for the current barcode filter and the kNN parameters (see 'get_knngraph')
+
+        === cell filter ===
+        'name_col_filter' : the name of 'feature'/'barcode' Axis metadata column to retrieve selection filter for running the current method. if None is given, current barcode/feature filters (if it has been set) will be used as-is.
+
+        === multiprocessing ===
+        'int_num_processes' : the number of processes for running leiden clustering process in parallel. actual number of processes that will perform the leiden clustering will be 'int_num_processes' - 2 (for more information, please refer to biobookshelf.main.Multiprocessing_Batch_Generator_and_Workers). if 'int_num_processes' <= 3 or a single resolution was given, clustering will be performed in the main process.
+
+        returns:
+        """
+        # for leiden clustering
+        import leidenalg
+
+        # handle inputs
+        if len(l_resolution) == 0:  # if no resolution was given, exit early
+            return
+
+        # retrieve 'Barcode' Axis object
+        ax = self.bc
+
+        # set filters for operation
+        if name_col_filter is not None:
+            self.change_or_save_filter(name_col_filter)
+
+        # initialize the output column
+        if name_col_label in ax.meta and tuple(ax.meta.get_shape(name_col_label)) != (
+            len(l_resolution),
+        ):  # if the existing column was written for a different number of resolutions, delete the column before re-initializing the column
+            if self.verbose:
+                logger.info(
+                    f"'{name_col_label}' column of the shape {ax.meta.get_shape( name_col_label )} will be re-initialized for {len( l_resolution )} resolutions"
+                )
+            del ax.meta[name_col_label]
+        ax.meta.initialize_column(
+            name_col_label,
+            dtype=np.int32,
+            shape_not_primary_axis=(len(l_resolution),),
+            chunks=(1,),
+            categorical_values=None,
+            dict_metadata_description={
+                "description": f"leiden cluster labels for the resolutions {list( l_resolution )}"
+            },
+        )
+        if name_col_label not in ax.meta or tuple(
+            ax.meta.get_shape(name_col_label)
+        ) != (
+            len(l_resolution),
+        ):  # the column could not be (re-)initialized (e.g. the metadata is read-only)
+            raise RuntimeError(
+                f"'{name_col_label}' column cannot be initialized for saving the labels of {len( l_resolution )} resolutions"
+            )
+
+        # retrieve the knn graph and construct an igraph object from the knn graph
+        g = get_igraph_from_adjacency(
+            self.get_knngraph(
+                name_col_data=name_col_data,
+                int_num_components_data=int_num_components_data,
+                dict_kw_pynndescent_transformer=dict_kw_pynndescent_transformer,
+                knn_backend=knn_backend,
+                flag_use_cache=flag_use_knngraph_cache,
+            ),
+            directed,
+        )
+        if self.verbose:
+            logger.info(f"knn-graph loaded")
+
+        # compose partition arguments
+        dict_kw_leiden_partition = dict(
+            dict_kw_leiden_partition
+        )  # copy the arguments before modification
+        if use_weights:
+            dict_kw_leiden_partition["weights"] = np.array(g.es["weight"]).astype(
+                np.float64
+            )
+
+        def __find_partition(resolution: float):
+            """# 2026-10-17 22:05:12
+            perform leiden clustering using the given resolution
+            """
+            return np.array(
+                leidenalg.find_partition(
+                    g,
+                    leidenalg.RBConfigurationVertexPartition,
+                    resolution_parameter=resolution,
+                    **dict_kw_leiden_partition,
+                ).membership,
+                dtype=np.int32,
+            )
+
+        def __save_labels(index_resolution: int, arr_cluster_label: np.ndarray):
+            """# 2026-10-17 22:05:12
+            save the cluster labels of a resolution
+            """
+            ax.meta[name_col_label, None, index_resolution] = arr_cluster_label
+            if self.verbose:
+                logger.info(
+                    f"leiden clustering using resolution {l_resolution[ index_resolution ]} completed, with {len( set( arr_cluster_label ) )} clusters detected."
+                )
+
+        if (
+            len(l_resolution) == 1 or int_num_processes <= 3
+        ):  # perform leiden clustering in the main process only.
+            for index_resolution, resolution in enumerate(l_resolution):
+                __save_labels(index_resolution, __find_partition(resolution))
+        else:  # perform leiden clustering in forked processes sharing the igraph object
+
+            def __run_leiden(pipe_receiver, pipe_sender):
+                """# 2026-10-17 22:05:12"""
+                while True:
+                    ins = pipe_receiver.recv()
+                    if ins is None:
+                        break
+                    index_resolution, resolution = ins  # parse input
+                    pipe_sender.send(
+                        (index_resolution, __find_partition(resolution))
+                    )  # send the result to the main process
+                pipe_sender.send(None)  # notify the worker has completed all works
+
+            def __post_process_result(res):
+                """# 2026-10-17 22:05:12"""
+                __save_labels(*res)  # save the result in the main process
+
+            # run works using multiple workers
+            bk.Multiprocessing_Batch_Generator_and_Workers(
+                gen_batch=enumerate(l_resolution),
+                process_batch=__run_leiden,
+                post_process_batch=__post_process_result,
+                int_num_threads=int_num_processes,
+            )
+        del g
+
+        # report
+        if self.verbose:
+            logger.info(
+                f"clustering using {len( l_resolution )} resolutions completed for {ax.meta.n_rows} number of barcodes"
+            )
+        return
+
     """ for kNN-bsed label transfer """
 
     def train_label(
@@ -18339,8 +20044,9 @@ class RamData:
             "compressed": False,
         },
         index_col_of_name_col_label: Union[int, None] = None,
+        knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
     ) -> None:
-        """# 2022-08-08 16:42:16
+        """# 2026-10-17 21:12:40
         build nearest-neighbor search index from the entries of the given axis, and using the labels of the entries, construct a kNN classifier
 
         arguments:
@@ -18351,6 +20057,7 @@ class RamData:
         'name_model' : name of the nearest-neighbor index and associated lables of the entries of the index that was saved/will be saved in the RamData.models database. if the model already exists, the index and the associated labels will be loadeded, and will be used to predict labels of the remaining entries.
         'n_neighbors' : the number of neighbors to use for the index
         'dict_kw_pynndescent' : the remaining arguments for constructing the index pynndescent.NNDescen 'model'
+        'knn_backend' : the kNN backend for the index. 'brute_force' performs an exact (deterministic) search, and 'pynndescent' performs an approximate search. if 'auto' is given, 'brute_force' will be used for a moderate number of entries (see 'build_knn_index')
 
         === data input ===
         'name_col_filter' : the 'name_col' of the metadata of the given axis containing the filter marking the entries that will be used for trainining (building the index)
@@ -18362,8 +20069,6 @@ class RamData:
         returns:
         labels, index
         """
-        import pynndescent
-
         # handle inputs
         flag_axis_is_barcode = axis in {
             0,
@@ -18394,10 +20099,12 @@ class RamData:
                 else ax.meta[name_col_label, None, index_col_of_name_col_label]
             )  # retrieve labels
 
-            index = pynndescent.NNDescent(
-                data, n_neighbors=n_neighbors, **dict_kw_pynndescent
-            )
-            index.prepare()  # prepare index for searching
+            index = build_knn_index(
+                data,
+                n_neighbors=n_neighbors,
+                knn_backend=knn_backend,
+                **dict_kw_pynndescent,
+            )  # build and prepare index for searching
 
             # save trained model
             if name_model is not None:  # check validity of 'name_model'
@@ -18487,9 +20194,13 @@ class RamData:
         # initialize the counter for counting labels
         dict_label_counter = dict()
 
+        # encode labels of the entries of the index as integer codes for vectorized majority voting
+        arr_label_code, arr_label = pd.factorize(labels, use_na_sentinel=False)
+        arr_label = np.asarray(arr_label)
+
         # define functions for multiprocessing step
         def process_batch(pipe_receiver_batch, pipe_sender_result):
-            """# 2022-09-06 17:05:15"""
+            """# 2026-10-17 19:42:18"""
             while True:
                 batch = pipe_receiver_batch.recv()
                 if batch is None:
@@ -18511,9 +20222,12 @@ class RamData:
                 del data, distances
 
                 labels_assigned = list(
-                    bk.DICTIONARY_Find_keys_with_max_value(bk.COUNTER(labels[e]))[0][0]
-                    for e in neighbors
-                )  # assign labels using the labels of nearest neighbors
+                    arr_label[
+                        find_labels_with_largest_sum_of_weights(
+                            arr_label_code[neighbors], int_num_labels=len(arr_label)
+                        )
+                    ]
+                )  # assign labels using the majority voting of the labels of nearest neighbors
                 del neighbors
 
                 pipe_sender_result.send(
@@ -18600,8 +20314,9 @@ class RamData:
         },
         int_num_threads: int = 10,
         int_num_entries_in_a_batch: int = 10000,
+        knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
     ):
-        """# 2022-10-02 23:53:54
+        """# 2026-10-17 21:12:40
         subsample informative entries through iterative density-based subsampling combined with community detection algorithm
 
         arguments:
@@ -18620,6 +20335,7 @@ class RamData:
         === nearest-neighbor search index ===
         'n_neighbors' : the number of neighbors to use for the index
         'dict_kw_pynndescent' : the remaining arguments for constructing the index pynndescent.NNDescen 'model'
+        'knn_backend' : the kNN backend for the indices and the kNN graphs. 'brute_force' performs an exact (deterministic) search, and 'pynndescent' performs an approximate search. if 'auto' is given, 'brute_force' will be used for a moderate number of entries (see 'build_knn_index')
 
         === clustering arguments ===
         'resolution' : initial resolution of cluster. please refer to 'resolution_parameter' of 'leidenalg.find_partition' method
@@ -18640,8 +20356,6 @@ class RamData:
 
         returns:
         """
-        import pynndescent
-
         # handle inputs
         flag_axis_is_barcode = axis in {
             0,
@@ -18714,7 +20428,9 @@ class RamData:
                 name_col_filter=None,
                 name_col_embedding=None,
                 index_col_of_name_col_label=index_iteration,
-            )  # clustering result will be saved 'index_iteration' column in the 'name_col_label' # does not save model
+                knn_backend=knn_backend,
+                flag_use_knngraph_cache=False,
+            )  # clustering result will be saved 'index_iteration' column in the 'name_col_label' # does not save model # the filter changes for every iteration, and the knn graph will not be cached
 
             # assign labels and retrieve label counts
             self.delete_model(name_model, type_model)  # reset the model before training
@@ -18728,6 +20444,7 @@ class RamData:
                 name_col_filter=None,
                 dict_kw_pynndescent=dict_kw_pynndescent,
                 index_col_of_name_col_label=index_iteration,
+                knn_backend=knn_backend,
             )
             dict_label_count = self.apply_label(
                 name_model=name_model,
@@ -18752,12 +20469,12 @@ class RamData:
             self.change_filter(
                 name_col_filter_subsampled
             )  # change filter to currently subsampled entries for building knn search index
-            index = pynndescent.NNDescent(
+            index = build_knn_index(
                 ax.meta[name_col_data, None, :int_num_components_data],
                 n_neighbors=n_neighbors,
+                knn_backend=knn_backend,
                 **dict_kw_pynndescent,
-            )
-            index.prepare()  # prepare index for searching
+            )  # build and prepare index for searching
 
             """
             calculate density - summarize the distances
@@ -19699,6 +21416,7 @@ class RamData:
         load the associated data objects
         """
         int_num_neighbors = knnindex.n_neighbors  # retrieve the number of neighbors
+        knnindex.prepare()  # prepare the index for searching before forking workers, so that the workers share the prepared (memory-mapped) index
 
         # retrieve a setting for the number of nearest neighbors to use
         if (
@@ -19790,6 +21508,11 @@ class RamData:
             # initialize 'AgglomerativeClustering' instance
             if flag_use_agglomerative_clustering_of_embeddings_of_neighbors_for_outlier_detection:
                 from sklearn.cluster import AgglomerativeClustering
+            arr_label_code, arr_label = None, None
+        else:  # %% CLASSIFIER %%
+            # encode labels of the entries of the index as integer codes once (before forking the workers) for vectorized majority voting
+            arr_label_code, arr_label = pd.factorize(y_knnindex, use_na_sentinel=False)
+            arr_label = np.asarray(arr_label)
 
         """
         assign labels or retrieve embeddings
@@ -19801,25 +21524,35 @@ class RamData:
 
         # define functions for multiprocessing step
         def process_batch(pipe_receiver_batch, pipe_sender_result):
-            """# 2022-12-16 01:30:06"""
+            """# 2026-10-17 19:42:18"""
             ax_meta = ax.meta  # retrieve metadata object
             ax_meta.change_operator()  # change operator
 
             # define functions
-            def __find_label_with_largest_sum_of_weights(labels, weights):
-                """# 2022-12-20 23:49:05
-                fine labels with the largest sum of weights
-                """
-                # sum weights for each label
-                dict_label_to_weight = dict()
-                for label, weight in zip(labels, weights):
-                    if label not in dict_label_to_weight:
-                        dict_label_to_weight[label] = weight
-                    else:
-                        dict_label_to_weight[label] += weight
-                return bk.DICTIONARY_Find_keys_with_max_value(dict_label_to_weight)[0][
-                    0
-                ]  # find the label with the maximum weight
+            if (
+                flag_embedder
+                and flag_use_agglomerative_clustering_of_embeddings_of_neighbors_for_outlier_detection
+            ):
+                ac = AgglomerativeClustering(
+                    n_clusters=None,
+                    distance_threshold=y_dist_threshold,
+                    linkage=linkage_for_agglomerative_clustering_of_embeddings_of_neighbors,
+                )  # initialize the clustering instance
+
+                def __find_mask_not_outlier(y_knnindex_of_an_entry, weights):
+                    """# 2026-10-17 19:42:18
+                    perform agglomerative clustering of the embeddings of the neighbors of an entry to exclude embeddings of the outliers, and return the mask of neighbors belonging to the cluster with the largest sum of weights
+                    """
+                    arr_labels = ac.fit_predict(y_knnindex_of_an_entry)
+                    return (
+                        arr_labels
+                        == find_labels_with_largest_sum_of_weights(
+                            arr_labels[None, :], weights[None, :]
+                        )[0]
+                    )
+
+            else:
+                __find_mask_not_outlier = None
 
             while True:
                 batch = pipe_receiver_batch.recv()
@@ -19857,75 +21590,24 @@ class RamData:
                         ba_neighbors[e] = True
 
                 # knn-index based assignment of label/embedding
-                l_res = []
-                for neighbors_of_an_entry, distances_of_an_entry in zip(
-                    neighbors, distances
-                ):
-                    # mark entries with zero distance
-                    mask_zero_distance = distances_of_an_entry == 0
-                    if (
-                        mask_zero_distance
-                    ).sum():  # if there is 'neighbor' with 0 distance, use the y of the 0-distance neighbor
-                        res = y_knnindex[neighbors_of_an_entry][mask_zero_distance][
-                            0
-                        ]  # use the y of the first 0-distance neighbor (there should be at most 1 0-distance neighbor)
-                    else:  # when there is no neighbors with 0-distance (all distance values should be larger than 0)
-                        weights = (
-                            1 / distances_of_an_entry
-                        )  # calculate weights based on distances
-                        if flag_embedder:  # %% EMBEDDER %%
-                            y_knnindex_of_an_entry = y_knnindex[
-                                neighbors_of_an_entry
-                            ]  # retrieve y-values of an entry
-                            if sum(
-                                y_knnindex_of_an_entry.std(axis=0) > y_std_threshold
-                            ):  # detect whether outliers are included in the neighbors (since knnindex is linear, but most embeddings are non-linear, knn-distance based method can identify very distant points in the embedding, and averaging these points should be avoided)
-                                if flag_use_agglomerative_clustering_of_embeddings_of_neighbors_for_outlier_detection:
-                                    ac = AgglomerativeClustering(
-                                        n_clusters=None,
-                                        distance_threshold=y_dist_threshold,
-                                        linkage=linkage_for_agglomerative_clustering_of_embeddings_of_neighbors,
-                                    )  # initialize the clustering instance
-                                    arr_labels = ac.fit_predict(
-                                        y_knnindex_of_an_entry
-                                    )  # perform agglomerative clustering of the embeddings of the neighbors to exclude embeddings of the outliers
-                                    mask_not_outlier = (
-                                        arr_labels
-                                        == __find_label_with_largest_sum_of_weights(
-                                            arr_labels, weights
-                                        )
-                                    )  # retrieve the mask of neighbors belonging to the cluster with the largest sum of weights
-                                else:
-                                    # when very distant points are identified as 'neighbors', use the embedding of the closest point, in order to avoid weighted averaging of the embeddings including those of the distant points
-                                    mask_not_outlier = (
-                                        np.sqrt(
-                                            (
-                                                (
-                                                    y_knnindex_of_an_entry
-                                                    - y_knnindex_of_an_entry[0]
-                                                )
-                                                ** 2
-                                            ).sum(axis=1)
-                                        )
-                                        < y_dist_threshold
-                                    )  # retrieve points that are in the radius of the threshold distance from the closest point
-                                # exclude embeddings of the outliers
-                                weights = weights[mask_not_outlier]
-                                y_knnindex_of_an_entry = y_knnindex_of_an_entry[
-                                    mask_not_outlier
-                                ]
-                                if len(weights) == int_num_neighbors:
-                                    logger.warning("outliers not filtered out")
-                                    plt.plot(*y_knnindex_of_an_entry.T, ".")
-                                    plt.show()
-                            res = (y_knnindex_of_an_entry.T * weights).sum(
-                                axis=1
-                            ) / weights.sum()  # calculate weighted average of the y values for embedding mode
-                        else:  # %% CLASSIFIER %%
-                            res = __find_label_with_largest_sum_of_weights(
-                                y_knnindex[neighbors_of_an_entry], weights
-                            )  # find the label with the maximum weight
-                    l_res.append(res)  # collect a result
+                (
+                    l_res,
+                    int_num_entries_with_outliers_not_filtered,
+                ) = assign_using_nearest_neighbors(
+                    neighbors,
+                    distances,
+                    y_knnindex,
+                    flag_embedder=flag_embedder,
+                    y_std_threshold=y_std_threshold if flag_embedder else None,
+                    y_dist_threshold=y_dist_threshold if flag_embedder else None,
+                    func_find_mask_not_outlier=__find_mask_not_outlier,
+                    arr_label_code=arr_label_code,
+                    arr_label=arr_label,
+                )
+                if int_num_entries_with_outliers_not_filtered > 0:
+                    logger.warning(
+                        f"outliers not filtered out for {int_num_entries_with_outliers_not_filtered} entries"
+                    )
                 del neighbors, distances
 
                 pipe_sender_result.send(
@@ -20508,9 +22190,12 @@ class RamData:
         method_pval: str = "wilcoxon",
         int_chunk_size_secondary=10,
     ):
-        """# 2022-08-21 13:37:02
+        """# 2026-10-17 13:02:48
         find marker features for each cluster label by calculating a AUROC metric, log2FC, and Wilcoxon (or alternatively, t-test or Mann-Whitney-U rank test)
 
+        the values of each feature are ranked only once (using non-zero values and a single tie block of zero values), and the metrics of all clusters are calculated at once from per-cluster rank sums, sums, and the number of non-zero values, without densifying the data of each feature.
+        p-values are calculated using normal approximations (t-distribution for 't-test'), which are identical to the default outputs of the 'scipy.stats' functions for large samples.
+
         name_layer : str = 'normalized_log1p_scaled' : a layer containing expression data to use for finding marker. scaled data is recommended
         name_col_label : str = 'subsampling_label' : the name of the column of 'barcodes' metadata containing cluster labels
         index_name_col_label : int = -1 : the index of the column (secondary axis) of the 'name_col_label' metadata column. if no secondary axis is available, this argument will be ignored.
@@ -20527,7 +22212,6 @@ class RamData:
         an array with a shape of ( the number of all features ) X ( the number of all cluster labels ), stored in the feature metadata using the given column name
         information about which column of the output array represent which cluster label is available in the column metadata.
         """
-        from sklearn.metrics import roc_auc_score
         import scipy.stats
 
         # handle inputs
@@ -20551,8 +22235,7 @@ class RamData:
         flag_calculate_pval = name_col_pval is not None
         assert name_col_log2fc is not None  # 'name_col_log2fc' should not be None
 
-        # retrieve function for testing p-value
-        test = None
+        # check the method for testing p-value
         if flag_calculate_pval:
             if method_pval not in {"wilcoxon", "t-test", "mann-whitney-u"}:
                 if self.verbose:
@@ -20560,12 +22243,6 @@ class RamData:
                         f"[RamData.find_markers] 'method_pval' {method_pval} is invalid, exiting"
                     )
                 return
-            if method_pval == "t-test":
-                test = scipy.stats.ttest_ind
-            elif method_pval == "wilcoxon":
-                test = scipy.stats.ranksums
-            elif method_pval == "mann-whitney-u":
-                test = scipy.stats.mannwhitneyu
 
         # compose 'l_name_col_summarized', a list of output column names
         l_name_col_summarized = [name_col_log2fc]
@@ -20639,63 +22316,215 @@ class RamData:
         if flag_view_was_not_active:  # create view
             self.bc.create_view()
 
+        # retrieve cluster index of each barcode and the size of each cluster
+        arr_index_cluster = np.array(
+            list(
+                dict_cluster_label_to_index[convert_numpy_dtype_number_to_number(e)]
+                for e in arr_cluster_label
+            ),
+            dtype=np.int64,
+        )  # map cluster labels to integer indices
+        arr_int_num_barcodes_clus = np.bincount(
+            arr_index_cluster, minlength=int_num_cluster_labels
+        ).astype(
+            float
+        )  # retrieve the number of barcodes of each cluster
+        arr_int_num_barcodes_rest = (
+            int_num_barcodes - arr_int_num_barcodes_clus
+        )  # retrieve the number of the rest of the barcodes for each cluster
+        mask_clus_to_analyze = np.zeros(int_num_cluster_labels, dtype=bool)
+        mask_clus_to_analyze[
+            list(
+                dict_cluster_label_to_index[e]
+                for e in l_unique_cluster_label_to_analyze
+            )
+        ] = True
+        mask_clus_to_analyze &= (arr_int_num_barcodes_clus > 0) & (
+            arr_int_num_barcodes_rest > 0
+        )  # metrics can be calculated only when both groups are not empty
+
         def func(
             self,
-            int_entry_of_axis_for_querying: int,
+            arr_int_entry_of_axis_for_querying: np.ndarray,
+            arr_indptr: np.ndarray,
             arr_int_entries_of_axis_not_for_querying: np.ndarray,
             arr_value: np.ndarray,
-        ):  # normalize count data of a single feature containing (possibly) multiple barcodes
-            """# 2022-08-22 11:25:57
-            find markers
+        ):
+            """# 2026-10-17 13:05:21
+            find markers for all features of a batch (a CSR-like block) and all clusters at once.
+
+            values of each feature are ranked once using only the non-zero values (zero values form a single tie block), and AUROC, log2FC, and p-values of all clusters are calculated from the per-cluster rank sums, sums, and the number of non-zero values.
             """
-            if (
-                len(arr_value) == 0
-            ):  # handle when no expression values are available, exit
-                return
+            int_num_entries = len(arr_int_entry_of_axis_for_querying)
+            arr_int_num_records = np.diff(arr_indptr)
+            arr_pos_entry = np.repeat(
+                np.arange(int_num_entries), arr_int_num_records
+            )  # retrieve the position of the entry of each record
+            arr_value = arr_value.astype(float)
+
+            # compose keys of (entry, cluster) pairs for each record
+            arr_key = (
+                arr_pos_entry * int_num_cluster_labels
+                + arr_index_cluster[arr_int_entries_of_axis_not_for_querying]
+            )
+            int_num_keys = int_num_entries * int_num_cluster_labels
 
+            def __sum_for_each_entry_and_cluster(arr_weight=None):
+                """# 2026-10-17 13:06:40
+                sum weights of records for each ( entry, cluster ) pair
+                """
+                return np.bincount(
+                    arr_key, weights=arr_weight, minlength=int_num_keys
+                ).reshape((int_num_entries, int_num_cluster_labels))
+
+            arr_num_nonzero_clus = __sum_for_each_entry_and_cluster()
+            arr_sum_clus = __sum_for_each_entry_and_cluster(arr_value)
+            arr_sum_total = np.add.reduceat(arr_value, arr_indptr[:-1])[
+                :, None
+            ]  # assumes 'int_num_records' > 0 for each entry
+            arr_num_barcodes_clus = arr_int_num_barcodes_clus[None, :]
+            arr_num_barcodes_rest = arr_int_num_barcodes_rest[None, :]
+
+            # initialize output arrays
             dict_summary = dict(
-                (name_col, [fill_value] * int_num_cluster_labels)
+                (
+                    name_col,
+                    np.full(
+                        (int_num_entries, int_num_cluster_labels),
+                        fill_value,
+                        dtype=float,
+                    ),
+                )
                 for name_col, fill_value in zip(l_name_col_summarized, l_fill_value)
-            )  # initialize output dictionary
-
-            arr_expr = np.zeros(
-                int_num_barcodes
-            )  # initialize expression values in dense format
-            arr_expr[
-                arr_int_entries_of_axis_not_for_querying
-            ] = arr_value  # convert sparse to dense format
-
-            # for each cluster
-            for name_clus in l_unique_cluster_label_to_analyze:
-                index_clus = dict_cluster_label_to_index[
-                    name_clus
-                ]  # retrieve index of the current cluster
-                # retrieve expression values of cluster and the rest of the barcodes
-                mask = arr_cluster_label == name_clus
-                arr_expr_clus = arr_expr[mask]
-                arr_expr_rest = arr_expr[~mask]
+            )
+            mask_output = np.broadcast_to(
+                mask_clus_to_analyze, (int_num_entries, int_num_cluster_labels)
+            )
 
+            with np.errstate(divide="ignore", invalid="ignore"):
                 # calculate log2fc values
-                mean_arr_expr_rest = arr_expr_rest.mean()
-                if mean_arr_expr_rest != 0:
-                    try:
-                        dict_summary[name_col_log2fc][index_clus] = math.log2(
-                            arr_expr_clus.mean() / mean_arr_expr_rest
+                arr_mean_clus = arr_sum_clus / arr_num_barcodes_clus
+                arr_mean_rest = (arr_sum_total - arr_sum_clus) / arr_num_barcodes_rest
+                arr_ratio = arr_mean_clus / arr_mean_rest
+                mask = mask_output & (arr_mean_rest != 0) & (arr_ratio > 0)
+                dict_summary[name_col_log2fc][mask] = np.log2(arr_ratio[mask])
+
+                if flag_calcualte_auroc or (
+                    flag_calculate_pval
+                    and method_pval in {"wilcoxon", "mann-whitney-u"}
+                ):
+                    """rank non-zero values of each entry"""
+                    arr_order = np.lexsort(
+                        (arr_value, arr_pos_entry)
+                    )  # sort values of each entry
+                    arr_value_sorted = arr_value[arr_order]
+                    arr_pos_entry_sorted = arr_pos_entry[arr_order]
+                    int_num_records = len(arr_value)
+                    # identify blocks of tied values
+                    mask_start_tie = np.ones(int_num_records, dtype=bool)
+                    mask_start_tie[1:] = (
+                        arr_value_sorted[1:] != arr_value_sorted[:-1]
+                    ) | (arr_pos_entry_sorted[1:] != arr_pos_entry_sorted[:-1])
+                    arr_start_tie = np.flatnonzero(mask_start_tie)
+                    arr_num_tied = np.diff(np.append(arr_start_tie, int_num_records))
+                    # calculate average ranks among the non-zero values (1-based)
+                    arr_rank_tie = (
+                        arr_start_tie
+                        - arr_indptr[:-1][arr_pos_entry_sorted[arr_start_tie]]
+                        + (arr_num_tied + 1) / 2
+                    )
+                    arr_rank = np.empty(int_num_records)
+                    arr_rank[arr_order] = np.repeat(arr_rank_tie, arr_num_tied)
+
+                    # consider the tie block of zero values
+                    arr_num_zeros = int_num_barcodes - arr_int_num_records
+                    arr_rank += (arr_value > 0) * arr_num_zeros[
+                        arr_pos_entry
+                    ]  # ranks of positive values are shifted by the number of zeros
+                    arr_rank_zero = (
+                        np.bincount(
+                            arr_pos_entry,
+                            weights=arr_value < 0,
+                            minlength=int_num_entries,
                         )
-                    except ValueError:  # catch math.log2 domain error
-                        pass
+                        + (arr_num_zeros + 1) / 2
+                    )  # average rank of zero values
+
+                    # calculate the rank sum of each cluster
+                    arr_rank_sum_clus = (
+                        __sum_for_each_entry_and_cluster(arr_rank)
+                        + (arr_num_barcodes_clus - arr_num_nonzero_clus)
+                        * arr_rank_zero[:, None]
+                    )
+                    arr_u_clus = (
+                        arr_rank_sum_clus
+                        - arr_num_barcodes_clus * (arr_num_barcodes_clus + 1) / 2
+                    )  # Mann-Whitney U statistic of the cluster
+                    arr_n1n2 = arr_num_barcodes_clus * arr_num_barcodes_rest
 
                 # calculate auroc
                 if flag_calcualte_auroc:
-                    dict_summary[name_col_auroc][index_clus] = roc_auc_score(
-                        mask, arr_expr
-                    )
+                    dict_summary[name_col_auroc][mask_output] = (arr_u_clus / arr_n1n2)[
+                        mask_output
+                    ]
 
-                # calculate ttest
-                if flag_calculate_pval and test is not None:
-                    dict_summary[name_col_pval][index_clus] = test(
-                        arr_expr_clus, arr_expr_rest
-                    ).pvalue
+                # calculate p-values
+                if flag_calculate_pval:
+                    if method_pval == "wilcoxon":
+                        # Wilcoxon rank-sum statistic (equivalent to 'scipy.stats.ranksums')
+                        arr_z = (
+                            arr_rank_sum_clus
+                            - arr_num_barcodes_clus * (int_num_barcodes + 1) / 2
+                        ) / np.sqrt(arr_n1n2 * (int_num_barcodes + 1) / 12)
+                        arr_pval = 2 * scipy.stats.norm.sf(np.abs(arr_z))
+                    elif method_pval == "mann-whitney-u":
+                        # asymptotic Mann-Whitney U test with tie correction and continuity correction (equivalent to 'scipy.stats.mannwhitneyu' for large samples)
+                        arr_tie_term = np.bincount(
+                            arr_pos_entry_sorted[arr_start_tie],
+                            weights=arr_num_tied.astype(float) ** 3 - arr_num_tied,
+                            minlength=int_num_entries,
+                        ) + (arr_num_zeros.astype(float) ** 3 - arr_num_zeros)
+                        arr_sd = np.sqrt(
+                            arr_n1n2
+                            / 12
+                            * (
+                                (int_num_barcodes + 1)
+                                - arr_tie_term[:, None]
+                                / (int_num_barcodes * (int_num_barcodes - 1))
+                            )
+                        )
+                        arr_z = (
+                            np.maximum(arr_u_clus, arr_n1n2 - arr_u_clus)
+                            - arr_n1n2 / 2
+                            - 0.5
+                        ) / arr_sd
+                        arr_pval = np.minimum(2 * scipy.stats.norm.sf(arr_z), 1)
+                    elif method_pval == "t-test":
+                        # Student's t-test with equal variances (equivalent to 'scipy.stats.ttest_ind')
+                        arr_sum_of_squares_clus = __sum_for_each_entry_and_cluster(
+                            arr_value**2
+                        )
+                        arr_sum_of_squares_total = arr_sum_of_squares_clus.sum(axis=1)[
+                            :, None
+                        ]
+                        arr_ss_clus = (
+                            arr_sum_of_squares_clus
+                            - arr_sum_clus**2 / arr_num_barcodes_clus
+                        )  # sum of squared deviations of the cluster
+                        arr_ss_rest = (
+                            arr_sum_of_squares_total
+                            - arr_sum_of_squares_clus
+                            - (arr_sum_total - arr_sum_clus) ** 2
+                            / arr_num_barcodes_rest
+                        )  # sum of squared deviations of the rest of the barcodes
+                        int_df = int_num_barcodes - 2
+                        arr_t = (arr_mean_clus - arr_mean_rest) / np.sqrt(
+                            (arr_ss_clus + arr_ss_rest)
+                            / int_df
+                            * (1 / arr_num_barcodes_clus + 1 / arr_num_barcodes_rest)
+                        )
+                        arr_pval = 2 * scipy.stats.t.sf(np.abs(arr_t), int_df)
+                    dict_summary[name_col_pval][mask_output] = arr_pval[mask_output]
             return dict_summary
 
         # report
@@ -20706,7 +22535,11 @@ class RamData:
 
         # calculate the metric for identifying marker features
         self.summarize(
-            name_layer, "features", func, l_name_col_summarized=l_name_col_summarized
+            name_layer,
+            "features",
+            func,
+            l_name_col_summarized=l_name_col_summarized,
+            flag_summarizing_func_for_a_batch=True,
         )
 
         # destroy view if a view was not active
@@ -23,6 +23,12 @@ import matplotlib.pyplot as plt
 import scipy.sparse
 import io
 import concurrent.futures  # for multiprocessing
+import threading  # for thread-safe caches
+import asyncio
+import atexit
+import weakref
+import itertools
+from collections import OrderedDict
 
 pd.options.mode.chained_assignment = None  # default='warn' # to disable worining
 
@@ -499,13 +505,15 @@ def MTX_10X_Split(
     int_max_num_entries_for_chunk=10000000,
     flag_split_mtx=True,
     flag_split_mtx_again=False,
+    int_num_threads=1,
 ):
-    """# 2022-04-28 01:16:35
+    """# 2026-10-17 18:06:45
     split input mtx file into multiple files and write a flag file indicating the splitting has been completed.
     return the list of split mtx files
 
     'flag_split_mtx' : if 'flag_split_mtx' is True, split input mtx file into multiple files. if False, does not split the input matrix, and just return the list containing a single path pointing to the input matrix. This flag exists for the compatibility with single-thread operations
     'flag_split_mtx_again' : split the input matrix again even if it has beem already split. It will remove previously split files.
+    'int_num_threads' : the number of threads for decompressing the input mtx file (see 'open_gzip_file')
     """
     # 'flag_split_mtx' : if False, does not split the input matrix, and just return the list containing a single path pointing to the input matrix
     if not flag_split_mtx:
@@ -533,7 +541,11 @@ def MTX_10X_Split(
             f"{path_folder_mtx_10x_output}matrix.mtx.gz.{index_mtx_10x}.gz"
         ]
         int_num_entries_written_for_the_current_chunk = 0
-        with gzip.open(f"{path_folder_mtx_10x_output}matrix.mtx.gz", "rb") as file:
+        with open_gzip_file(
+            f"{path_folder_mtx_10x_output}matrix.mtx.gz",
+            "rb",
+            int_num_threads=int_num_threads,
+        ) as file:
             while True:
                 line = file.readline()  # binary string
                 if len(line) == 0:
@@ -1144,6 +1156,7 @@ def MTX_10X_Combine(
         MTX_10X_Split(
             path_folder_mtx_10x_output,
             int_max_num_entries_for_chunk=int_max_num_entries_for_chunk,
+            int_num_threads=int_num_threads,
         )
 
 
@@ -1421,6 +1434,7 @@ def MTX_10X_Summarize_Counts(
             int_max_num_entries_for_chunk=int_max_num_entries_for_chunk,
             flag_split_mtx=flag_split_mtx,
             flag_split_mtx_again=flag_split_mtx_again,
+            int_num_threads=int_num_threads,
         )
         str_data_type = _MTX_Detect_data_type(
             path_file_input_mtx
@@ -1861,6 +1875,7 @@ def MTX_10X_Calculate_Average_Log10_Transformed_Normalized_Expr(
             path_folder_mtx_10x_input,
             int_max_num_entries_for_chunk=int_max_num_entries_for_chunk,
             flag_split_mtx=flag_split_mtx,
+            int_num_threads=int_num_threads,
         )
 
         """ retrieve number of cells, features, and entries from the matrix file """
@@ -2201,6 +2216,7 @@ def MTX_10X_Filter(
         path_folder_mtx_10x_input,
         int_max_num_entries_for_chunk=int_max_num_entries_for_chunk,
         flag_split_mtx=flag_split_mtx,
+        int_num_threads=int_num_threads,
     )
 
     """ summarizes counts """
@@ -2914,6 +2930,268 @@ def gunzip_bytes(bytes_content_gzipped):
     return bytes_content
 
 
+def _locate_gzip_members(path_file: str, int_num_bytes_in_a_batch: int = 2**22):
+    """# 2026-10-17 17:05:12
+    locate the start positions of the members of a gzip file without decompressing the file.
+    for a BGZF file (blocked gzip file, in which the size of each member is recorded in the header of the member), the positions are exact, and consecutive members are grouped into batches of about 'int_num_bytes_in_a_batch' compressed bytes.
+    for other (multi-member) gzip files, the positions matching the signature of a gzip member header are returned. since the signature can appear inside the compressed data by chance, the members should be validated by decompressing the members in order (see 'ParallelGzipReader').
+
+    returns
+    flag_bgzf, l_int_pos : whether the file is a BGZF file, a sorted list of (candidate) start positions of the members (or the batches of members)
+    """
+    import re
+    import mmap
+
+    with open(path_file, "rb") as file:
+        int_num_bytes = os.fstat(file.fileno()).st_size
+        if int_num_bytes == 0:  # an empty file
+            return False, []
+
+        """ detect BGZF file """
+        l_int_pos, int_pos, int_pos_batch = [], 0, -int_num_bytes_in_a_batch
+        flag_bgzf = True
+        while int_pos < int_num_bytes:
+            file.seek(int_pos)
+            header = file.read(18)
+            if not (
+                len(header) == 18
+                and header[:4] == b"\x1f\x8b\x08\x04"  # FEXTRA flag is set
+                and header[12:16] == b"BC\x02\x00"  # BGZF subfield
+            ):
+                flag_bgzf = False
+                break
+            if int_pos - int_pos_batch >= int_num_bytes_in_a_batch:
+                l_int_pos.append(int_pos)  # start a new batch
+                int_pos_batch = int_pos
+            int_pos += int.from_bytes(header[16:18], "little") + 1  # BSIZE + 1
+        if flag_bgzf:
+            return True, l_int_pos
+
+        """ search the signatures of gzip member headers (magic bytes, deflate method, and a valid flag byte) """
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            l_int_pos = list(
+                m.start() for m in re.finditer(rb"\x1f\x8b\x08[\x00-\x1f]", mm)
+            )
+    return False, l_int_pos
+
+
+class ParallelGzipReader(io.RawIOBase):
+    """# 2026-10-17 17:24:40
+    a read-only binary file object that decompresses a multi-member gzip file, or a list of gzip files (read as a single concatenated stream, for example, the split files written by 'MTX_10X_Split'), using multiple threads.
+
+    members of the gzip files (or batches of members for BGZF files) are decompressed ahead of the current position by a pool of threads (zlib releases the GIL during decompression), and delivered in order. the member at the current position is decompressed in a streaming manner when it has not been decompressed ahead, so that a large single-member gzip file can be read using a small memory footprint (without a speed-up).
+    the start of each member is identified by decompressing the previous member, and the results for the positions that are not the start of a member (a false-positive signature) are discarded, so that the output is identical to that of 'gzip.open'.
+
+    'l_path_file' : a list of paths of local gzip files
+    'int_num_threads' : the number of threads for decompressing members ahead
+    'int_max_num_members_in_a_queue' : the maximum number of members (or batches of members) being decompressed ahead. the memory usage is proportional to this number times the size of the decompressed members. by default, twice the number of threads.
+    'int_num_bytes_in_a_batch' : the number of compressed bytes in a batch of members of BGZF files
+    """
+
+    def __init__(
+        self,
+        l_path_file: List[str],
+        int_num_threads: int = 4,
+        int_max_num_members_in_a_queue: Union[int, None] = None,
+        int_num_bytes_in_a_batch: int = 2**22,
+    ):
+        """# 2026-10-17 17:24:40"""
+        super().__init__()
+        self._l_path_file = list(l_path_file)
+        self._int_num_threads = max(1, int(int_num_threads))
+        self._int_max_num_members_in_a_queue = (
+            2 * self._int_num_threads
+            if int_max_num_members_in_a_queue is None
+            else max(1, int(int_max_num_members_in_a_queue))
+        )
+        self._int_num_bytes_in_a_batch = int_num_bytes_in_a_batch
+        self._gen = self._iter_chunks()
+        self._mv, self._int_pos_in_chunk = None, 0  # the current chunk
+
+    def _iter_chunks(self):
+        """# 2026-10-17 17:24:40
+        yield decompressed chunks in order
+        """
+        import zlib
+
+        int_num_bytes_in_a_read = 2**20
+        l_fd = list(os.open(path_file, os.O_RDONLY) for path_file in self._l_path_file)
+        l_int_num_bytes = list(os.fstat(fd).st_size for fd in l_fd)
+
+        # collect the (candidate) start positions of members of all files
+        l_t_member = []  # ( index_file, int_pos_start, int_pos_end_limit )
+        for index_file, path_file in enumerate(self._l_path_file):
+            flag_bgzf, l_int_pos = _locate_gzip_members(
+                path_file, self._int_num_bytes_in_a_batch
+            )
+            if flag_bgzf:  # decompress batches of members until the end of the batch
+                l_t_member.extend(
+                    zip(
+                        [index_file] * len(l_int_pos),
+                        l_int_pos,
+                        l_int_pos[1:] + [l_int_num_bytes[index_file]],
+                    )
+                )
+            else:  # decompress a single member
+                l_t_member.extend((index_file, int_pos, None) for int_pos in l_int_pos)
+
+        dict_t_pos_to_int_pos_end_limit = dict(
+            (t_member[:2], t_member[2]) for t_member in l_t_member
+        )
+
+        def __iter_decompress(index_file, int_pos, int_pos_end_limit):
+            """# 2026-10-17 17:24:40
+            decompress member(s) starting at 'int_pos', and yield decompressed chunks. returns the end position of the last member.
+            if 'int_pos_end_limit' is None, decompress a single member. otherwise, decompress members until reaching 'int_pos_end_limit'
+            """
+            fd = l_fd[index_file]
+            while True:
+                d = zlib.decompressobj(31)  # gzip header
+                while not d.eof:
+                    bytes_content = os.pread(fd, int_num_bytes_in_a_read, int_pos)
+                    if len(bytes_content) == 0:
+                        raise EOFError(
+                            "Compressed file ended before the end-of-stream marker was reached"
+                        )
+                    bytes_decompressed = d.decompress(bytes_content)
+                    int_pos += len(bytes_content) - len(d.unused_data)
+                    if len(bytes_decompressed) > 0:
+                        yield bytes_decompressed
+                if int_pos_end_limit is None or int_pos >= int_pos_end_limit:
+                    return int_pos
+
+        def __decompress(t_member):
+            """# 2026-10-17 17:24:40
+            decompress member(s) at once. returns None if the member(s) cannot be decompressed (a false-positive signature)
+            """
+            gen, l_bytes = __iter_decompress(*t_member), []
+            try:
+                while True:
+                    l_bytes.append(next(gen))
+            except StopIteration as e:
+                return b"".join(l_bytes), e.value
+            except (zlib.error, EOFError, OSError):
+                return None
+
+        executor = concurrent.futures.ThreadPoolExecutor(self._int_num_threads)
+        try:
+            dict_future = dict()  # t_pos ( index_file, int_pos ) -> future
+            index_member_to_submit = 0
+            t_pos = (0, 0)  # current position
+            while t_pos[0] < len(l_fd):
+                index_file, int_pos = t_pos
+                if int_pos >= l_int_num_bytes[index_file]:  # move to the next file
+                    t_pos = (index_file + 1, 0)
+                    continue
+                # discard the members before the current position
+                for t_pos_future in list(dict_future):
+                    if t_pos_future < t_pos:
+                        dict_future.pop(t_pos_future).cancel()
+                # decompress members after the current position ahead
+                while (
+                    index_member_to_submit < len(l_t_member)
+                    and len(dict_future) < self._int_max_num_members_in_a_queue
+                ):
+                    t_member = l_t_member[index_member_to_submit]
+                    index_member_to_submit += 1
+                    if t_member[:2] > t_pos:
+                        dict_future[t_member[:2]] = executor.submit(
+                            __decompress, t_member
+                        )
+                # retrieve the member at the current position
+                res = dict_future.pop(t_pos).result() if t_pos in dict_future else None
+                if res is not None:
+                    bytes_decompressed, int_pos_end = res
+                    if len(bytes_decompressed) > 0:
+                        yield bytes_decompressed
+                else:  # decompress the member in a streaming manner
+                    if os.pread(l_fd[index_file], 2, int_pos) != b"\x1f\x8b":
+                        if int_pos == 0:
+                            raise gzip.BadGzipFile(
+                                f"Not a gzipped file ({self._l_path_file[ index_file ]})"
+                            )
+                        int_pos_end = l_int_num_bytes[
+                            index_file
+                        ]  # ignore trailing data
+                    else:
+                        int_pos_end = yield from __iter_decompress(
+                            index_file,
+                            int_pos,
+                            dict_t_pos_to_int_pos_end_limit.get(t_pos),
+                        )
+                t_pos = (index_file, int_pos_end)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for fd in l_fd:
+                os.close(fd)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        """# 2026-10-17 17:24:40"""
+        while self._mv is None or self._int_pos_in_chunk >= len(self._mv):
+            bytes_decompressed = next(self._gen, None)
+            if bytes_decompressed is None:  # end of the stream
+                return 0
+            self._mv, self._int_pos_in_chunk = memoryview(bytes_decompressed), 0
+        int_num_bytes = min(len(b), len(self._mv) - self._int_pos_in_chunk)
+        b[:int_num_bytes] = self._mv[
+            self._int_pos_in_chunk : self._int_pos_in_chunk + int_num_bytes
+        ]
+        self._int_pos_in_chunk += int_num_bytes
+        return int_num_bytes
+
+    def close(self):
+        """# 2026-10-17 17:24:40"""
+        if not self.closed:
+            self._gen.close()  # stop the workers and close the files
+            self._mv = None
+        super().close()
+
+
+def open_gzip_file(
+    path_file: Union[str, List[str]],
+    mode: Literal["rb", "rt"] = "rb",
+    int_num_threads: int = 1,
+    **kwargs,
+):
+    """# 2026-10-17 17:24:40
+    open a gzip file for reading, decompressing the file using multiple threads when possible (see 'ParallelGzipReader').
+
+    'path_file' : a path to a gzip file, or a list of paths to gzip files, which will be read as a single concatenated stream (for example, the split files written by 'MTX_10X_Split')
+    'mode' : 'rb' or 'rt'
+    'int_num_threads' : the number of threads for decompression. if 1 is given and a single file is given, 'gzip.open' will be used.
+    kwargs : keyworded arguments for 'ParallelGzipReader'
+    """
+    l_path_file = [path_file] if isinstance(path_file, str) else list(path_file)
+    if len(l_path_file) == 1 and (
+        int_num_threads <= 1 or is_s3_url(l_path_file[0]) or is_http_url(l_path_file[0])
+    ):
+        return gzip.open(l_path_file[0], mode)
+    file = io.BufferedReader(
+        ParallelGzipReader(l_path_file, int_num_threads=int_num_threads, **kwargs),
+        buffer_size=2**20,
+    )
+    return io.TextIOWrapper(file) if "t" in mode else file
+
+
+def _get_split_mtx_files(path_file_mtx: str):
+    """# 2026-10-17 17:24:40
+    retrieve the list of split files of the given matrix market file (written by 'MTX_10X_Split' or 'MTX_10X_Combine') in order.
+    the split files together contain all records of the matrix (the header and the description line may be present at the start of the first file).
+    returns None if the split files are not available
+    """
+    if not filesystem_operations("exists", f"{path_file_mtx}.split.flag"):
+        return None
+    df = bk.GLOB_Retrive_Strings_in_Wildcards(f"{path_file_mtx}.*.gz")
+    if len(df) == 0:
+        return None
+    df.wildcard_0 = df.wildcard_0.astype(int)
+    df.sort_values("wildcard_0", ascending=True, inplace=True)
+    return list(df.path.values)
+
+
 def _feather_bytes_to_df(bytes_content):
     """# 2022-05-25 01:50:46
     convert bytes to df using pyarrow.feather
@@ -3917,9 +4195,13 @@ class FileSystemServer:
 # latest 2022-07-28 11:31:12
 # implementation using pipe (~3 times more efficient)
 def create_stream_from_a_gzip_file_using_pipe(
-    path_file_gzip, pipe_sender, func, int_buffer_size=100
+    path_file_gzip,
+    pipe_sender,
+    func,
+    int_buffer_size=100,
+    int_num_threads_for_decompression=1,
 ):
-    """# 2022-07-27 06:50:29
+    """# 2026-10-17 17:55:37
     parse and decorate mtx record for sorting. the resulting records only contains two values, index of axis that were not indexed and the data value, for more efficient pipe operation
     return a generator yielding ungziped records
 
@@ -3927,6 +4209,7 @@ def create_stream_from_a_gzip_file_using_pipe(
     'pipe_sender' : pipe for retrieving decorated mtx records. when all records are parsed, None will be given.
     'func' : a function for transforming each 'line' in the input gzip file to a (decorated) record. if None is returned, the line will be ignored and will not be included in the output stream.
     'int_buffer_size' : the number of entries for each batch that will be given to 'pipe_sender'. increasing this number will reduce the overhead associated with interprocess-communication through pipe, but will require more memory usage
+    'int_num_threads_for_decompression' : the number of threads for decompressing the input gzip file (see 'open_gzip_file'). 'path_file_gzip' can be a list of gzip files (e.g., split files) that will be read as a single concatenated stream.
 
     returns:
     return the process that will be used for unzipping the input gzip file and creating a stream.
@@ -3939,7 +4222,9 @@ def create_stream_from_a_gzip_file_using_pipe(
         """# 2022-07-25 22:22:33
         unzip gzip file and create a stream using the given pipe
         """
-        with gzip.open(path_file_gzip, "rt") as file:
+        with open_gzip_file(
+            path_file_gzip, "rt", int_num_threads=int_num_threads_for_decompression
+        ) as file:
             l_buffer = []  # initialize the buffer
             for line in file:
                 rec = func(line)  # convert gzipped line into a decorated record
@@ -4119,35 +4404,46 @@ def write_stream_as_a_gzip_file_using_pipe(
     return p  # return the process
 
 
-def write_stream_as_a_sparse_ramtx_zarr_using_pipe(pipe_receiver, za_mtx, za_mtx_index):
-    """# 2022-07-29 09:54:57
+def write_stream_as_a_sparse_ramtx_zarr_using_pipe(
+    pipe_receiver, za_mtx, za_mtx_index, za_mtx_data=None
+):
+    """# 2026-10-17 15:52:06
     write a stream of decorated mtx records to a sparse ramtx zarr object, sorted by barcodes or features (and its associated index)
 
     arguments:
     'pipe_receiver' : pipe for retrieving decorated mtx records. when all records are parsed, None should be given.
     'za_mtx', 'za_mtx_index' : output zarr objects
+    'za_mtx_data' : (default None) an output zarr object for storing values of the records in the compact sparse layout. if given, 'za_mtx' will only contain the indices of the records (a 1D array), and the values will be written to 'za_mtx_data'
 
     returns:
     return the list of processes that will be used for building a ramtx zarr from the input stream
     """
     # retrieve settings
-    dtype_mtx = za_mtx.dtype
+    flag_compact_sparse_layout = za_mtx_data is not None
+    dtype_mtx = (
+        np.float64 if flag_compact_sparse_layout else za_mtx.dtype
+    )  # in the compact layout, records are converted to the dtypes of the output arrays when they are written
     dtype_mtx_index = za_mtx_index.dtype
     # set buffer size
     int_buffer_size_mtx_index = za_mtx_index.chunks[0] * 10
     int_buffer_size_mtx = za_mtx.chunks[0] * 10
 
     # define a function for doing the work
-    def __write_zarr(pipe_receiver, za):
-        """# 2022-07-29 09:41:08
+    def __write_zarr(pipe_receiver, za, za_data=None):
+        """# 2026-10-17 15:52:06
         write an array of a specific coordinates to a given zarr object
+        if 'za_data' is given, the first and the second columns of the array will be written to 'za' and 'za_data', respectively (compact sparse layout)
         """
         while True:
             r = pipe_receiver.recv()
             if r is None:  # exist once the stream ends
                 break
             st, en, arr = r  # parse the received record
-            za[st:en] = arr  # write zarr object
+            if za_data is None:
+                za[st:en] = arr  # write zarr object
+            else:
+                za[st:en] = arr[:, 0]  # write indices
+                za_data[st:en] = arr[:, 1]  # write values
 
     def __compose_array(
         pipe_receiver, pipe_sender_to_mtx_writer, pipe_sender_to_mtx_index_writer
@@ -4158,6 +4454,9 @@ def write_stream_as_a_sparse_ramtx_zarr_using_pipe(pipe_receiver, za_mtx, za_mtx
         # perform merge sorting
         int_entry_currently_being_written = None  # place holder value
         int_num_mtx_records_written = 0
+        int_pos_start_of_current_entry = (
+            0  # the position of the first record of the entry currently being written
+        )
         l_mtx_record = []
         int_num_mtx_index_records_written = 0
         l_mtx_index = []
@@ -4170,6 +4469,10 @@ def write_stream_as_a_sparse_ramtx_zarr_using_pipe(pipe_receiver, za_mtx, za_mtx
             for r in l_r:  # iterate through the list of records
                 int_entry_of_the_current_record, mtx_record = r
                 if int_entry_currently_being_written is None:
+                    for int_entry in range(
+                        int_entry_of_the_current_record
+                    ):  # for the int_entry before the first entry, put place holder values
+                        l_mtx_index.append([0, 0])
                     int_entry_currently_being_written = (
                         int_entry_of_the_current_record  # update current int_entry
                     )
@@ -4179,13 +4482,16 @@ def write_stream_as_a_sparse_ramtx_zarr_using_pipe(pipe_receiver, za_mtx, za_mtx
                     """compose index"""
                     l_mtx_index.append(
                         [
-                            int_num_mtx_records_written,
+                            int_pos_start_of_current_entry,
                             int_num_mtx_records_written + len(l_mtx_record),
                         ]
                     )  # collect information required for indexing # add records to mtx_index
+                    int_pos_start_of_current_entry = int_num_mtx_records_written + len(
+                        l_mtx_record
+                    )  # update the start position for the next entry
                     if (
                         int_entry_currently_being_written + 1
-                        > int_entry_of_the_current_record
+                        < int_entry_of_the_current_record
                     ):
                         for int_entry in range(
                             int_entry_currently_being_written + 1,
@@ -4233,7 +4539,7 @@ def write_stream_as_a_sparse_ramtx_zarr_using_pipe(pipe_receiver, za_mtx, za_mtx
         """ compose index """
         l_mtx_index.append(
             [
-                int_num_mtx_records_written,
+                int_pos_start_of_current_entry,
                 int_num_mtx_records_written + len(l_mtx_record),
             ]
         )  # collect information required for indexing # add records to mtx_index
@@ -4282,7 +4588,10 @@ def write_stream_as_a_sparse_ramtx_zarr_using_pipe(pipe_receiver, za_mtx, za_mtx
         )
     )
     l_p.append(
-        mp.Process(target=__write_zarr, args=(pipe_receiver_to_mtx_writer, za_mtx))
+        mp.Process(
+            target=__write_zarr,
+            args=(pipe_receiver_to_mtx_writer, za_mtx, za_mtx_data),
+        )
     )
     l_p.append(
         mp.Process(
@@ -4306,8 +4615,9 @@ def concurrent_merge_sort_using_pipe_mtx(
     header=None,
     za_mtx=None,
     za_mtx_index=None,
+    za_mtx_data=None,
 ):
-    """# 2022-07-27 06:50:06
+    """# 2026-10-17 15:52:06
 
     'path_file_output' : output mtx gzip file path
     'l_path_file' : list of input mtx gzip file paths
@@ -4321,6 +4631,7 @@ def concurrent_merge_sort_using_pipe_mtx(
     'header' : a header text to include. if None is given, no header will be written.
     'flag_delete_input_files' : delete input files
     'za_mtx', 'za_mtx_index' : to build ramtx zarr object from the input mtx files, please use these arguments to pass over zarr mtx and zarr mtx index objects.
+    'za_mtx_data' : to build ramtx zarr object in the compact sparse layout, please use this argument to pass over zarr object for storing values ('za_mtx' will store indices)
     """
     # handle invalid input
     if len(l_path_file) == 0:  # if the list of input files are empty, exit
@@ -4410,7 +4721,7 @@ def concurrent_merge_sort_using_pipe_mtx(
     else:  # when the output is a ramtx zarr object
         l_p.extend(
             write_stream_as_a_sparse_ramtx_zarr_using_pipe(
-                pipe_receiver, za_mtx, za_mtx_index
+                pipe_receiver, za_mtx, za_mtx_index, za_mtx_data=za_mtx_data
             )
         )
 
@@ -4446,8 +4757,9 @@ def create_and_sort_chunk(
     int_num_records_in_a_chunk=10000000,
     int_num_threads_for_sorting_and_writing=5,
     int_buffer_size=300,
+    int_num_threads_for_decompression=1,
 ):
-    """# 2022-11-28 23:43:38
+    """# 2026-10-17 17:55:37
     split an input gzip file into smaller chunks and sort individual chunks.
     returns a list of processes that will perform the operation.
 
@@ -4460,6 +4772,7 @@ def create_and_sort_chunk(
     'int_num_records_in_a_chunk' : the number of maximum records in a chunk
     'int_num_threads_for_sorting_and_writing' : number of workers for sorting and writing operations. the number of worker for reading the input gzip file will be 1.
     'int_buffer_size' : the number of entries for each batch that will be given to 'pipe_sender'. increasing this number will reduce the overhead associated with interprocess-communication through pipe, but will require more memory usage
+    'int_num_threads_for_decompression' : the number of threads for decompressing the input gzip file (see 'open_gzip_file'). 'path_file_gzip' can be a list of gzip files (e.g., split files) that will be read as a single concatenated stream.
 
     """
     # handle arguments
@@ -4561,7 +4874,9 @@ def create_and_sort_chunk(
                 time.sleep(1)  # sleep for one second before collecting completed works
 
         # iterate through lines in the input gzip file and assign works to the workers
-        with gzip.open(path_file_gzip, "rt") as file:
+        with open_gzip_file(
+            path_file_gzip, "rt", int_num_threads=int_num_threads_for_decompression
+        ) as file:
             l_buffer = []  # initialize the buffer
             int_num_sent_records = 0  # initialize the number of send records
             index_worker = 0  # initialize the worker for receiving records
@@ -4614,7 +4929,9 @@ def create_and_sort_chunk(
                 if len(line) == 0:
                     break
 
-        if len(l_buffer) > 0:  # if there is some buffer remaining, flush the buffer
+        if (
+            len(l_buffer) > 0 or int_num_sent_records > 0
+        ):  # if there is some buffer remaining or records were sent for the last chunk, flush the buffer
             l_pipe_sender_record[index_worker].send(l_buffer)  # send a list of records
             l_pipe_sender_record[index_worker].send(
                 f"{path_prefix_chunk}.{bk.UUID( )}.gz"
@@ -4650,6 +4967,219 @@ def create_and_sort_chunk(
     return l_p  # return the list of processes
 
 
+def _iter_mtx_blocks(
+    path_file_mtx: Union[str, List[str]],
+    int_num_records_in_a_block: int = 10000000,
+    int_num_threads_for_decompression: int = 1,
+):
+    """# 2026-10-17 17:41:03
+    iterate over the records of a matrix market file (gzipped or not) as blocks of numeric arrays. the records are parsed in large blocks by the C engine of pandas, without creating Python objects for each record.
+    if the file starts with comment lines (starting with '%'), the comment lines and the description line (the number of rows, columns, and records) will be skipped. otherwise, the file is considered as a part of a matrix without the header (for example, the split files written by 'MTX_10X_Split' or 'MTX_10X_Combine').
+
+    'path_file_mtx' : a path to a matrix market file, or a list of paths to gzipped parts of a matrix market file, which will be read as a single concatenated stream
+    'int_num_records_in_a_block' : the number of records in each block
+    'int_num_threads_for_decompression' : the number of threads for decompressing gzipped file(s) (see 'open_gzip_file')
+
+    yields
+    arr_int_row, arr_int_col, arr_value : 0-based row (feature) and column (barcode) indices (np.int64) and values (np.float64) of the records of a block
+    """
+    with (
+        open(path_file_mtx, "rb")
+        if isinstance(path_file_mtx, str) and path_file_mtx.rsplit(".", 1)[-1] != "gz"
+        else open_gzip_file(
+            path_file_mtx, "rb", int_num_threads=int_num_threads_for_decompression
+        )
+    ) as file:
+        if file.peek(1)[:1] == b"%":
+            # consume comment lines and the description line
+            line = file.readline()
+            while len(line) > 0 and line[:1] == b"%":
+                line = file.readline()
+        if len(file.peek(1)) == 0:  # if no records are available, exit
+            return
+        # parse the remaining records block-by-block
+        for df in pd.read_csv(
+            file,
+            sep=r"\s+",
+            header=None,
+            usecols=[0, 1, 2],
+            dtype={0: np.int64, 1: np.int64, 2: np.float64},
+            chunksize=int(int_num_records_in_a_block),
+            engine="c",
+        ):
+            arr_int_row, arr_int_col, arr_value = (df[i].values for i in range(3))
+            yield arr_int_row - 1, arr_int_col - 1, arr_value  # 1-based > 0-based coordinates
+
+
+def write_mtx_as_a_sparse_ramtx_zarr(
+    path_file_mtx: str,
+    za_mtx,
+    za_mtx_index,
+    za_mtx_data=None,
+    flag_mtx_sorted_by_id_feature: bool = True,
+    int_num_records_in_a_chunk: int = 10000000,
+    path_folder_temp: Union[str, None] = None,
+    int_num_threads: int = 1,
+):
+    """# 2026-10-17 17:48:26
+    sort the records of a given matrix market file and write a sparse ramtx zarr object (and its index) using numeric arrays, without parsing and sorting records as Python objects.
+
+    (1) the input file is parsed into blocks of 'int_num_records_in_a_chunk' records (see '_iter_mtx_blocks'). each block is sorted by ( the entry of the axis for querying, the entry of the other axis ) using 'np.lexsort', and written to the temporary folder as binary numpy arrays (a sorted run). the number of records of each entry is counted.
+        if the input matrix has been split (see 'MTX_10X_Split') and 'int_num_threads' > 1, the split files will be processed concurrently by worker processes. otherwise, the input file will be decompressed using 'int_num_threads' threads (see 'open_gzip_file').
+    (2) the output is written sequentially in batches of entries. since each run is sorted, the records of a range of entries are located in a contiguous slice of each run (retrieved from memory-mapped runs using binary search), and the slices of all runs are merged by sorting.
+
+    'path_file_mtx' : file path of an input matrix market file (gzipped or not)
+    'za_mtx', 'za_mtx_index' : output zarr objects
+    'za_mtx_data' : (default None) an output zarr object for storing values of the records in the compact sparse layout. if given, 'za_mtx' will only contain the indices of the records (a 1D array), and the values will be written to 'za_mtx_data'
+    'flag_mtx_sorted_by_id_feature' : whether to sort records by id_feature (True) or id_barcode (False)
+    'int_num_records_in_a_chunk' : the number of records in a sorted run and in a batch of output records. determines the memory usage.
+    'path_folder_temp' : a folder for writing temporary files. by default, a temporary folder will be created in the folder of the input file.
+    'int_num_threads' : the number of threads (processes) for parsing the input file
+
+    returns
+    int_num_records : the number of records written
+    """
+    # create a temporary folder
+    flag_delete_temp_folder = path_folder_temp is None
+    if path_folder_temp is None:
+        path_folder_temp = f"{path_file_mtx.rsplit( '/', 1 )[ 0 ]}/temp_{bk.UUID( )}/"
+    filesystem_operations("mkdir", path_folder_temp, exist_ok=True)
+    int_num_entries = za_mtx_index.shape[0]
+
+    """ (1) create sorted runs """
+
+    def __create_sorted_runs(
+        path_file_input, str_name_run, int_num_threads_for_decompression
+    ):
+        """# 2026-10-17 17:48:26
+        create sorted runs from the given input file, and return the list of prefixes of the runs and the number of records of each entry
+        """
+        arr_num_records = np.zeros(
+            int_num_entries, dtype=np.int64
+        )  # the number of records of each entry
+        l_path_prefix_run = []
+        for arr_int_row, arr_int_col, arr_value in _iter_mtx_blocks(
+            path_file_input,
+            int_num_records_in_a_block=int_num_records_in_a_chunk,
+            int_num_threads_for_decompression=int_num_threads_for_decompression,
+        ):
+            arr_key, arr_int_entry_not_for_querying = (
+                (arr_int_row, arr_int_col)
+                if flag_mtx_sorted_by_id_feature
+                else (arr_int_col, arr_int_row)
+            )
+            arr_argsort = np.lexsort((arr_int_entry_not_for_querying, arr_key))
+            path_prefix_run = (
+                f"{path_folder_temp}{str_name_run}.{len( l_path_prefix_run )}"
+            )
+            for name_arr, arr in zip(
+                ["key", "idx", "val"],
+                [arr_key, arr_int_entry_not_for_querying, arr_value],
+            ):
+                np.save(f"{path_prefix_run}.{name_arr}.npy", arr[arr_argsort])
+            l_path_prefix_run.append(path_prefix_run)
+            arr_num_records += np.bincount(arr_key, minlength=int_num_entries)[
+                :int_num_entries
+            ]
+            del arr_int_row, arr_int_col, arr_value, arr_argsort
+        return l_path_prefix_run, arr_num_records
+
+    l_path_file_split = (
+        _get_split_mtx_files(path_file_mtx) if int_num_threads > 1 else None
+    )  # retrieve the split files of the input matrix
+    if l_path_file_split is None or len(l_path_file_split) < 2:
+        l_path_prefix_run, arr_num_records = __create_sorted_runs(
+            path_file_mtx, "run", int_num_threads
+        )
+    else:  # process the split files concurrently
+        l_path_prefix_run = []
+        arr_num_records = np.zeros(int_num_entries, dtype=np.int64)
+
+        def __process_batch(pipe_receiver, pipe_sender):
+            """# 2026-10-17 17:48:26"""
+            while True:
+                ins = pipe_receiver.recv()
+                if ins is None:
+                    break
+                index_file, path_file_input = ins
+                pipe_sender.send(
+                    __create_sorted_runs(path_file_input, f"run.{index_file}", 1)
+                )
+            pipe_sender.send(None)  # notify the worker has completed all works
+
+        def __post_process_batch(res):
+            """# 2026-10-17 17:48:26"""
+            nonlocal arr_num_records
+            l_path_prefix_run.extend(res[0])
+            arr_num_records += res[1]
+
+        bk.Multiprocessing_Batch_Generator_and_Workers(
+            enumerate(l_path_file_split),
+            __process_batch,
+            __post_process_batch,
+            int_num_threads=int_num_threads,
+        )
+
+    """ write the index """
+    arr_pos_end = np.cumsum(arr_num_records)
+    arr_index = np.column_stack((arr_pos_end - arr_num_records, arr_pos_end))
+    arr_index[arr_num_records == 0] = (
+        0  # put place holder values for int_entry lacking count data
+    )
+    za_mtx_index[:] = arr_index.astype(za_mtx_index.dtype)
+    del arr_index
+
+    """ (2) merge the runs and write the records """
+    l_run = list(
+        dict(
+            (name_arr, np.load(f"{path_prefix_run}.{name_arr}.npy", mmap_mode="r"))
+            for name_arr in ["key", "idx", "val"]
+        )
+        for path_prefix_run in l_path_prefix_run
+    )  # load memory-mapped runs
+    int_num_records = int(arr_pos_end[-1]) if int_num_entries > 0 else 0
+    int_entry_start = 0
+    int_pos_start = 0
+    while int_pos_start < int_num_records:
+        int_entry_end = max(
+            int_entry_start + 1,
+            int(
+                np.searchsorted(
+                    arr_pos_end, int_pos_start + int_num_records_in_a_chunk, "right"
+                )
+            ),
+        )  # retrieve the entries of the batch (at least one entry)
+        int_pos_end = int(arr_pos_end[int_entry_end - 1])
+        # collect the records of the entries of the batch from each run
+        l_key, l_idx, l_val = [], [], []
+        for run in l_run:
+            st, en = np.searchsorted(run["key"], [int_entry_start, int_entry_end])
+            if st < en:
+                l_key.append(np.asarray(run["key"][st:en]))
+                l_idx.append(np.asarray(run["idx"][st:en]))
+                l_val.append(np.asarray(run["val"][st:en]))
+        arr_key, arr_idx, arr_val = (np.concatenate(l) for l in (l_key, l_idx, l_val))
+        del l_key, l_idx, l_val
+        arr_argsort = np.lexsort((arr_idx, arr_key))  # merge the runs
+        arr_idx, arr_val = arr_idx[arr_argsort], arr_val[arr_argsort]
+        sl = slice(int_pos_start, int_pos_end)
+        if za_mtx_data is None:
+            za_mtx[sl] = np.column_stack((arr_idx, arr_val)).astype(za_mtx.dtype)
+        else:
+            za_mtx[sl] = arr_idx.astype(za_mtx.dtype)  # write indices
+            za_mtx_data[sl] = arr_val.astype(za_mtx_data.dtype)  # write values
+        int_entry_start, int_pos_start = int_entry_end, int_pos_end
+    del l_run
+
+    # delete temporary files
+    for path_prefix_run in l_path_prefix_run:
+        for name_arr in ["key", "idx", "val"]:
+            filesystem_operations("rm", f"{path_prefix_run}.{name_arr}.npy")
+    if flag_delete_temp_folder:
+        filesystem_operations("rm", path_folder_temp)
+    return int_num_records
+
+
 def sort_mtx(
     path_file_gzip,
     path_file_gzip_sorted=None,
@@ -4664,13 +5194,15 @@ def sort_mtx(
     int_num_chunks_to_combine_before_concurrent_merge_sorting=8,
     za_mtx=None,
     za_mtx_index=None,
+    za_mtx_data=None,
+    flag_use_numeric_engine: bool = True,
 ):
-    """# 2022-07-28 11:07:44
+    """# 2026-10-17 17:59:20
     sort a given mtx file in a very time- and memory-efficient manner
 
     'path_file_gzip' : file path of an input gzip file
     'int_num_records_in_a_chunk' : the number of maximum records in a chunk
-    'int_num_threads_for_chunking' : number of workers for sorting and writing operations. the number of worker for reading the input gzip file will be 1.
+    'int_num_threads_for_chunking' : number of workers for sorting and writing operations. the same number of threads will be used for decompressing the input gzip file (see 'open_gzip_file'). if the input file has been split (see 'MTX_10X_Split'), the split files will be read instead of the input file (and processed concurrently by the numeric engine).
     'int_buffer_size' : the number of entries for each batch that will be given to 'pipe_sender'. increasing this number will reduce the overhead associated with interprocess-communication through pipe, but will require more memory usage
     'flag_mtx_sorted_by_id_feature' : whether to create decoration with id_feature / id_barcode
     'compresslevel' : compression level of the output Gzip file. 6 by default
@@ -4679,6 +5211,8 @@ def sort_mtx(
     'int_num_threads_for_writing' : the number of threads for gzip writer. if 'int_num_threads' > 1, pgzip will be used to write the output gzip file. please note that pgzip (multithreaded version of gzip module) has some memory-leaking issue for large inputs.
     'flag_delete_input_files' : delete input files
     'za_mtx', 'za_mtx_index' : to build ramtx zarr object from the input mtx files, please use these arguments to pass over zarr mtx and zarr mtx index objects.
+    'za_mtx_data' : to build ramtx zarr object in the compact sparse layout, please use this argument to pass over zarr object for storing values ('za_mtx' will store indices)
+    'flag_use_numeric_engine' : (default True) when building a ramtx zarr object, parse and sort records as blocks of numeric arrays (see 'write_mtx_as_a_sparse_ramtx_zarr') instead of the line-based chunking and merge sorting. the output mtx.gz file (when 'path_file_gzip_sorted' is given) is always written using the line-based engine.
 
     """
     # check validity of inputs
@@ -4691,6 +5225,23 @@ def sort_mtx(
     path_folder_temp = f"{path_folder}temp_{bk.UUID( )}/"
     filesystem_operations("mkdir", path_folder_temp, exist_ok=True)
 
+    if (
+        path_file_gzip_sorted is None and flag_use_numeric_engine
+    ):  # write a ramtx zarr object using the numeric engine
+        write_mtx_as_a_sparse_ramtx_zarr(
+            path_file_gzip,
+            za_mtx=za_mtx,
+            za_mtx_index=za_mtx_index,
+            za_mtx_data=za_mtx_data,
+            flag_mtx_sorted_by_id_feature=flag_mtx_sorted_by_id_feature,
+            int_num_records_in_a_chunk=int_num_records_in_a_chunk,
+            path_folder_temp=path_folder_temp,
+            int_num_threads=int_num_threads_for_chunking,
+        )
+        # delete temp folder
+        filesystem_operations("rm", path_folder_temp)
+        return
+
     # create and sort chunks
     def __detect_header_mtx(file):
         """# 2022-07-28 10:21:15
@@ -4754,7 +5305,7 @@ def sort_mtx(
 
     pipe_sender, pipe_receiver = mp.Pipe()  # create a link
     l_p = create_and_sort_chunk(
-        path_file_gzip,
+        _get_split_mtx_files(path_file_gzip) or path_file_gzip,
         f"{path_folder_temp}chunk",
         __encode_mtx,
         __decode_mtx,
@@ -4763,6 +5314,7 @@ def sort_mtx(
         int_num_records_in_a_chunk=int_num_records_in_a_chunk,
         int_num_threads_for_sorting_and_writing=int_num_threads_for_chunking,
         int_buffer_size=int_buffer_size,
+        int_num_threads_for_decompression=int_num_threads_for_chunking,
     )  # retrieve processes
     for p in l_p:
         p.start()  # start chunking
@@ -4900,6 +5452,7 @@ def sort_mtx(
             flag_delete_input_files=True,
             za_mtx=za_mtx,
             za_mtx_index=za_mtx_index,
+            za_mtx_data=za_mtx_data,
         )  # write ramtx zarr object
 
     # delete temp folder
@@ -4914,17 +5467,24 @@ def create_zarr_from_mtx(
     chunks_dense=(1000, 1000),
     dtype_mtx=np.float64,
     flag_combine_duplicate_records: bool = False,
+    flag_use_numeric_engine: bool = True,
+    int_num_records_in_a_block: int = 1000000,
+    int_num_threads_for_decompression: int = 1,
 ):
-    """# 2023-01-27 12:30:25
+    """# 2026-10-17 18:20:11
     create dense ramtx (dense zarr object) from matrix sorted by barcodes.
+    the records are distributed to the workers by row blocks (chunks along the barcode axis, 'chunks_dense[0]' barcodes), and each row block is owned by a single worker, which writes each chunk of the row block at once.
 
     'path_file_input_mtx' : input mtx gzip file
     'path_folder_zarr' : output zarr object folder
     'int_buffer_size' : number of lines for a pipe communcation. larger value will decrease an overhead for interprocess coummuncaiton. however, it will lead to more memory usage.
-    'int_num_workers_for_writing_ramtx' : the number of worker for writing zarr object
+    'int_num_workers_for_writing_ramtx' : the number of worker for writing zarr object. row block 'i' is written by worker 'i % int_num_workers_for_writing_ramtx'
     'chunks_dense' : chunk size of the output zarr object. smaller number of rows in a chunk will lead to smaller memory consumption, since data of all genes for the cells in a chunk will be collected before writing. ( int_num_barcodes_in_a_chunk, int_num_features_in_a_chunk )
     'dtype_mtx' : zarr object dtype
     flag_combine_duplicate_records : bool = False # by default, it has been set to False to increase the performance. if True, for duplicate records in the given matrix market file, values will be summed. (for example, if ( 1, 2, 10 ) and ( 1, 2, 5 ) records will be combined into ( 1, 2, 15 )).
+    flag_use_numeric_engine : bool = True # if True, parse records as blocks of numeric arrays (see '_iter_mtx_blocks') and distribute records of each chunk as arrays. if False, use the line-based parsing.
+    int_num_records_in_a_block : int = 1000000 # the number of records in a block parsed by the numeric engine
+    int_num_threads_for_decompression : int = 1 # the number of threads for decompressing the input gzip file (see 'open_gzip_file'). if the input file has been split (see 'MTX_10X_Split'), the split files will be read (in order) instead of the input file.
     """
     int_num_barcodes_in_a_chunk = chunks_dense[0]
 
@@ -4943,26 +5503,33 @@ def create_zarr_from_mtx(
         shape=(int_num_barcodes, int_num_features),
         chunks=chunks_dense,
         dtype=dtype_mtx,
-        synchronizer=zarr.ThreadSynchronizer(),
-    )  # each mtx record will contains two values instead of three values for more compact storage
+    )  # each row block (a chunk along the barcode axis) is written by a single worker, and a synchronizer is not needed
 
     """ assumes input mtx is sorted by id_barcode (sorted by columns of the matrix market formatted matrix) """
+    path_file_or_l_path_file_input_mtx = (
+        _get_split_mtx_files(path_file_input_mtx) or path_file_input_mtx
+    )  # read the split files of the input matrix, if available
 
     def __gunzip(path_file_input_mtx, pipe_sender):
         """# 2022-11-28 23:39:34
         create a stream of lines from a gzipped mtx file
         """
-        with gzip.open(path_file_input_mtx, "rt") as file:
+        with open_gzip_file(
+            path_file_input_mtx,
+            "rt",
+            int_num_threads=int_num_threads_for_decompression,
+        ) as file:
             line = file.readline()
             if len(line) == 0:  # if the file is empty, exit
                 pipe_sender.send(None)  # indicates that the file reading is completed
             else:
-                # consume comment lines
-                while line[0] == "%":
-                    line = file.readline()  # read the next line
-                line = (
-                    file.readline()
-                )  # discard the description line (the number of barcodes/features/records) and read the next line
+                if line[0] == "%":
+                    # consume comment lines
+                    while line[0] == "%":
+                        line = file.readline()  # read the next line
+                    line = (
+                        file.readline()
+                    )  # discard the description line (the number of barcodes/features/records) and read the next line
 
                 # use the buffer to reduce the overhead of interprocess communications
                 l_buffer = []  # initialize the buffer
@@ -4985,42 +5552,87 @@ def create_zarr_from_mtx(
         """# 2022-07-29 23:28:37"""
 
         def __write_zarr(pipe_receiver):
-            """# 2022-07-29 23:29:00"""
+            """# 2026-10-17 18:20:11
+            write the records of the row blocks (the chunks along the barcode axis) owned by the current worker.
+            the records of a row block are grouped by the chunks along the feature axis, and each chunk containing records is filled in a preallocated buffer and written exactly once.
+            """
+            int_num_features_in_a_chunk = chunks_dense[1]
+            arr_buffer = np.zeros(
+                chunks_dense,
+                dtype=np.float64 if flag_combine_duplicate_records else dtype_mtx,
+            )  # preallocate a buffer for a chunk
+            set_int_index_chunk_written = (
+                set()
+            )  # the row blocks that have been written by the current worker
             while True:
                 r = pipe_receiver.recv()
                 if r is None:  # when all works are completed, exit
                     break
-                coords_barcodes, coords_features, values = r  # parse received records
-
-                if (
-                    flag_combine_duplicate_records
-                ):  # handle duplicate records (combine values of duplicate records)
-                    # combine values for each unique set of coordinates
-                    dict_t_coords_to_combined_value = dict()
-                    for coord_bc, coord_ft, value in zip(
-                        coords_barcodes, coords_features, values
-                    ):
-                        t_coords = (coord_bc, coord_ft)
-                        if t_coords in dict_t_coords_to_combined_value:
-                            dict_t_coords_to_combined_value[t_coords] += value
-                        else:
-                            dict_t_coords_to_combined_value[t_coords] = value
-
-                    # construct new, de-duplicated 'coords_barcodes', 'coords_features', and 'values'
-                    coords_barcodes, coords_features, values = [], [], []
-                    for t_coords in dict_t_coords_to_combined_value:
-                        coords_barcodes.append(t_coords[0])
-                        coords_features.append(t_coords[1])
-                        values.append(dict_t_coords_to_combined_value[t_coords])
-
-                za_mtx.set_coordinate_selection(
-                    (coords_barcodes, coords_features), values
-                )  # write zarr matrix
+                coords_barcodes, coords_features, values = (
+                    np.asarray(e) for e in r
+                )  # parse received records (records of a row block)
+                int_index_chunk = int(coords_barcodes[0]) // int_num_barcodes_in_a_chunk
+                int_bc_start = int_index_chunk * int_num_barcodes_in_a_chunk
+                int_bc_end = min(
+                    int_bc_start + int_num_barcodes_in_a_chunk, int_num_barcodes
+                )
+                flag_chunk_written = (
+                    int_index_chunk in set_int_index_chunk_written
+                )  # a row block can be received more than once if the input matrix is not sorted by barcodes
+                set_int_index_chunk_written.add(int_index_chunk)
+
+                # group the records by the chunks along the feature axis (a stable sort preserves the order of duplicate records)
+                arr_index_chunk_feature = coords_features // int_num_features_in_a_chunk
+                arr_argsort = np.argsort(arr_index_chunk_feature, kind="stable")
+                coords_barcodes, coords_features, values, arr_index_chunk_feature = (
+                    arr[arr_argsort]
+                    for arr in (
+                        coords_barcodes,
+                        coords_features,
+                        values,
+                        arr_index_chunk_feature,
+                    )
+                )
+                arr_pos_boundary = np.concatenate(
+                    (
+                        [0],
+                        np.flatnonzero(np.diff(arr_index_chunk_feature)) + 1,
+                        [len(arr_index_chunk_feature)],
+                    )
+                )
+                for st, en in zip(arr_pos_boundary[:-1], arr_pos_boundary[1:]):
+                    int_ft_start = (
+                        int(arr_index_chunk_feature[st]) * int_num_features_in_a_chunk
+                    )
+                    int_ft_end = min(
+                        int_ft_start + int_num_features_in_a_chunk, int_num_features
+                    )
+                    sl_chunk = (
+                        slice(int_bc_start, int_bc_end),
+                        slice(int_ft_start, int_ft_end),
+                    )
+                    arr_chunk = arr_buffer[
+                        : int_bc_end - int_bc_start, : int_ft_end - int_ft_start
+                    ]
+                    if flag_chunk_written:  # merge with the previously written records
+                        arr_chunk[:] = za_mtx[sl_chunk]
+                    else:
+                        arr_chunk.fill(0)
+                    t_coords = (
+                        coords_barcodes[st:en] - int_bc_start,
+                        coords_features[st:en] - int_ft_start,
+                    )
+                    if (
+                        flag_combine_duplicate_records
+                    ):  # handle duplicate records (combine values of duplicate records)
+                        np.add.at(arr_chunk, t_coords, values[st:en])
+                    else:
+                        arr_chunk[t_coords] = values[st:en]
+                    za_mtx[sl_chunk] = arr_chunk  # write a chunk
 
         # start workers for writing zarr
         l_p = []
         l_pipe_sender = []
-        index_process = 0  # initialize index of process
         for index_worker in range(int_num_workers_for_writing_ramtx):
             (
                 pipe_sender_for_a_worker,
@@ -5032,6 +5644,57 @@ def create_zarr_from_mtx(
             l_pipe_sender.append(pipe_sender_for_a_worker)  # collect pipe_sender
 
         # distribute works to workers
+        if flag_use_numeric_engine:
+            l_arr_barcode, l_arr_feature, l_arr_value = [], [], []
+
+            def __flush_arrays():
+                """# 2026-10-17 16:41:27
+                send the collected records of a chunk to a worker as arrays
+                """
+                nonlocal l_arr_barcode, l_arr_feature, l_arr_value
+                if len(l_arr_barcode) == 0:
+                    return
+                l_pipe_sender[
+                    int_index_chunk_being_collected % int_num_workers_for_writing_ramtx
+                ].send(
+                    tuple(
+                        np.concatenate(l)
+                        for l in (l_arr_barcode, l_arr_feature, l_arr_value)
+                    )
+                )  # send the records to the worker owning the row block
+                l_arr_barcode, l_arr_feature, l_arr_value = [], [], []
+
+            int_index_chunk_being_collected = None
+            for arr_int_feature, arr_int_barcode, arr_value in _iter_mtx_blocks(
+                path_file_or_l_path_file_input_mtx,
+                int_num_records_in_a_block,
+                int_num_threads_for_decompression,
+            ):
+                arr_int_index_chunk = arr_int_barcode // int_num_barcodes_in_a_chunk
+                # split the block into runs of records belonging to the same chunk
+                arr_pos_boundary = np.concatenate(
+                    (
+                        [0],
+                        np.flatnonzero(np.diff(arr_int_index_chunk)) + 1,
+                        [len(arr_int_index_chunk)],
+                    )
+                )
+                for st, en in zip(arr_pos_boundary[:-1], arr_pos_boundary[1:]):
+                    int_index_chunk = arr_int_index_chunk[st]
+                    if int_index_chunk_being_collected != int_index_chunk:
+                        __flush_arrays()  # flush the chunk
+                        int_index_chunk_being_collected = int_index_chunk
+                    # collect records
+                    l_arr_barcode.append(arr_int_barcode[st:en])
+                    l_arr_feature.append(arr_int_feature[st:en])
+                    l_arr_value.append(arr_value[st:en])
+            __flush_arrays()  # write the last chunk
+
+            # terminate the workers
+            for pipe_sender in l_pipe_sender:
+                pipe_sender.send(None)
+            return
+
         int_index_chunk_being_collected = None
         l_int_feature, l_int_barcode, l_float_value = [], [], []
         while True:
@@ -5062,13 +5725,12 @@ def create_zarr_from_mtx(
 
                 # flush the chunk
                 if int_index_chunk_being_collected != int_index_chunk:
-                    l_pipe_sender[index_process].send(
+                    l_pipe_sender[
+                        int_index_chunk_being_collected
+                        % int_num_workers_for_writing_ramtx
+                    ].send(
                         (l_int_barcode, l_int_feature, l_float_value)
-                    )
-                    # change the worker
-                    index_process = (
-                        index_process + 1
-                    ) % int_num_workers_for_writing_ramtx
+                    )  # send the records to the worker owning the row block
                     # initialize the next chunk
                     l_int_feature, l_int_barcode, l_float_value = [], [], []
                     int_index_chunk_being_collected = int_index_chunk
@@ -5080,9 +5742,9 @@ def create_zarr_from_mtx(
 
         # write the last chunk if valid unwritten chunk exists
         if len(l_int_barcode) > 0:
-            l_pipe_sender[index_process].send(
-                (l_int_barcode, l_int_feature, l_float_value)
-            )
+            l_pipe_sender[
+                int_index_chunk_being_collected % int_num_workers_for_writing_ramtx
+            ].send((l_int_barcode, l_int_feature, l_float_value))
 
         # terminate the workers
         for pipe_sender in l_pipe_sender:
@@ -5091,7 +5753,15 @@ def create_zarr_from_mtx(
     # compose processes
     l_p = []
     pipe_sender, pipe_receiver = mp.Pipe()  # create a link
-    l_p.append(mp.Process(target=__gunzip, args=(path_file_input_mtx, pipe_sender)))
+    if (
+        not flag_use_numeric_engine
+    ):  # the numeric engine reads the input file in the distributing process
+        l_p.append(
+            mp.Process(
+                target=__gunzip,
+                args=(path_file_or_l_path_file_input_mtx, pipe_sender),
+            )
+        )
     l_p.append(
         mp.Process(
             target=__distribute,
@@ -5666,6 +6336,1463 @@ def zarr_object_server(
             pipe_sender_output.send(None)  # return None value
 
 
+class ZarrChunkCache:
+    """# 2026-10-17 10:12:41
+    A size-bounded, thread-safe LRU cache of decoded zarr chunks, keyed by (path of the zarr array, chunk index).
+    Repeated reads of the same rows/columns (e.g. iterating a layer several times, or overlapping batches) are served from memory instead of fetching and decoding the chunks again.
+    The cache can be used with a zarr.Array, a ZarrServer, or a fsoperator zarr objects server (together with the path of the zarr array).
+
+    int_max_num_bytes : int = 2 ** 28 # the maximum total size of the cached chunks in bytes. least-recently-used chunks are evicted when the limit is exceeded. set to 0 to disable the cache.
+    """
+
+    _set_cache = weakref.WeakSet()  # all caches in the current process
+
+    def __init__(self, int_max_num_bytes: int = 2**28):
+        """# 2026-10-17 10:12:41"""
+        ZarrChunkCache._set_cache.add(self)
+        self._lock = threading.Lock()
+        self._dict_chunk = OrderedDict()  # (path_folder_zarr, t_idx_chunk) > arr_chunk
+        self._int_max_num_bytes = int(int_max_num_bytes)
+        self._int_num_bytes = 0
+        self.reset_counters()
+
+    def __getstate__(self):
+        """# 2026-10-17 10:12:41
+        do not transfer the cached chunks and the lock (e.g. to a spawned process)
+        """
+        return {"int_max_num_bytes": self._int_max_num_bytes}
+
+    def __setstate__(self, state):
+        """# 2026-10-17 10:12:41"""
+        self.__init__(state["int_max_num_bytes"])
+
+    def __repr__(self):
+        """# 2026-10-17 10:12:41"""
+        return f"<ZarrChunkCache of {len(self._dict_chunk)} chunks ({self._int_num_bytes}/{self._int_max_num_bytes} bytes), {self.int_num_hits} hits, {self.int_num_misses} misses, {self.int_num_evictions} evictions>"
+
+    @property
+    def int_max_num_bytes(self):
+        """# 2026-10-17 10:12:41"""
+        return self._int_max_num_bytes
+
+    @property
+    def int_num_bytes(self):
+        """# 2026-10-17 10:12:41
+        total size of the currently cached chunks in bytes
+        """
+        return self._int_num_bytes
+
+    @property
+    def is_enabled(self):
+        """# 2026-10-17 10:12:41"""
+        return self._int_max_num_bytes > 0
+
+    @property
+    def dict_stats(self):
+        """# 2026-10-17 10:12:41
+        return hit/miss/eviction counters and the current usage of the cache
+        """
+        return {
+            "int_num_hits": self.int_num_hits,
+            "int_num_misses": self.int_num_misses,
+            "int_num_evictions": self.int_num_evictions,
+            "int_num_chunks": len(self._dict_chunk),
+            "int_num_bytes": self._int_num_bytes,
+            "int_max_num_bytes": self._int_max_num_bytes,
+        }
+
+    def reset_counters(self):
+        """# 2026-10-17 10:12:41"""
+        self.int_num_hits = 0
+        self.int_num_misses = 0
+        self.int_num_evictions = 0
+
+    def _evict(self, int_max_num_bytes: int):
+        """# 2026-10-17 10:12:41
+        evict least-recently-used chunks until the total size does not exceed 'int_max_num_bytes' (the lock should be acquired by the caller)
+        """
+        while self._int_num_bytes > int_max_num_bytes and len(self._dict_chunk) > 0:
+            _, arr_chunk = self._dict_chunk.popitem(last=False)
+            self._int_num_bytes -= arr_chunk.nbytes
+            self.int_num_evictions += 1
+
+    def resize(self, int_max_num_bytes: int):
+        """# 2026-10-17 10:12:41
+        change the maximum size of the cache, evicting chunks if needed
+        """
+        with self._lock:
+            self._int_max_num_bytes = int(int_max_num_bytes)
+            self._evict(max(0, self._int_max_num_bytes))
+
+    def get(self, path_folder_zarr: str, t_idx_chunk: tuple):
+        """# 2026-10-17 10:12:41
+        return the cached chunk, or None if the chunk has not been cached
+        """
+        key = (path_folder_zarr, t_idx_chunk)
+        with self._lock:
+            arr_chunk = self._dict_chunk.get(key)
+            if arr_chunk is None:
+                self.int_num_misses += 1
+            else:
+                self._dict_chunk.move_to_end(
+                    key
+                )  # mark as the most-recently-used chunk
+                self.int_num_hits += 1
+            return arr_chunk
+
+    def put(self, path_folder_zarr: str, t_idx_chunk: tuple, arr_chunk: np.ndarray):
+        """# 2026-10-17 10:12:41
+        add a decoded chunk to the cache. chunks larger than the cache are not cached.
+        """
+        if arr_chunk.nbytes > self._int_max_num_bytes:
+            return
+        arr_chunk.flags.writeable = (
+            False  # cached chunks are shared, and should not be modified
+        )
+        key = (path_folder_zarr, t_idx_chunk)
+        with self._lock:
+            if key in self._dict_chunk:
+                self._int_num_bytes -= self._dict_chunk.pop(key).nbytes
+            self._dict_chunk[key] = arr_chunk
+            self._int_num_bytes += arr_chunk.nbytes
+            self._evict(self._int_max_num_bytes)
+
+    def invalidate(self, path_folder: str):
+        """# 2026-10-17 10:12:41
+        drop all cached chunks of the zarr arrays located in the given folder (or of the given zarr array). should be called when a zarr array (e.g. a layer) has been rewritten or deleted.
+
+        returns the number of chunks dropped
+        """
+        path_folder = path_folder.rstrip("/")
+        with self._lock:
+            l_key = list(
+                key
+                for key in self._dict_chunk
+                if key[0] == path_folder or key[0].startswith(path_folder + "/")
+            )
+            for key in l_key:
+                self._int_num_bytes -= self._dict_chunk.pop(key).nbytes
+        return len(l_key)
+
+    @classmethod
+    def invalidate_all(cls, path_folder: str):
+        """# 2026-10-17 10:12:41
+        drop the cached chunks of the zarr arrays located in the given folder from all caches in the current process
+        """
+        zarr_chunk_fetcher.invalidate(
+            path_folder
+        )  # drop the metadata of the rewritten zarr arrays
+        if zarr_chunk_fetcher.disk_cache is not None and is_remote_url(path_folder):
+            zarr_chunk_fetcher.disk_cache.invalidate(
+                path_folder
+            )  # drop the chunks of the rewritten remote zarr arrays
+        return sum(cache.invalidate(path_folder) for cache in list(cls._set_cache))
+
+    def clear(self):
+        """# 2026-10-17 10:12:41
+        drop all cached chunks
+        """
+        with self._lock:
+            self._dict_chunk.clear()
+            self._int_num_bytes = 0
+
+    @staticmethod
+    def _get_zarr_accessor(za, path_folder_zarr: Union[str, None] = None):
+        """# 2026-10-17 10:12:41
+        return (path of the zarr array, shape, chunks, function for orthogonal selection) of the given zarr object
+        """
+        if (
+            path_folder_zarr is not None
+        ):  # a zarr objects server hosting multiple zarr arrays
+            prop = za.properties[path_folder_zarr]
+            return (
+                path_folder_zarr.rstrip("/"),
+                prop["shape"],
+                prop["chunks"],
+                lambda sel: za.get_orthogonal_selection(path_folder_zarr, sel),
+            )
+        if hasattr(za, "is_zarr_server"):  # ZarrServer
+            path_folder_zarr = za.path_folder
+        else:  # zarr.Array
+            path_folder_zarr = getattr(za.store, "path", None)
+            path_folder_zarr = (
+                f"{path_folder_zarr}/{za.path}"
+                if isinstance(path_folder_zarr, str)
+                else f"{id(za.store)}/{za.path}"  # in-memory stores
+            )
+        return (
+            path_folder_zarr.rstrip("/"),
+            za.shape,
+            za.chunks,
+            za.get_orthogonal_selection,
+        )
+
+    def get_orthogonal_selection(
+        self,
+        za,
+        selection,
+        path_folder_zarr: Union[str, None] = None,
+        chunk_fetcher=None,
+    ):
+        """# 2026-10-17 16:02:37
+        a drop-in replacement of 'get_orthogonal_selection' that reads whole chunks through the cache.
+        supports slices (with a step of 1), integers, and integer/boolean arrays along each axis. other selections are passed to the zarr object directly.
+
+        za # a zarr.Array, a ZarrServer, or a fsoperator zarr objects server. for a zarr objects server, 'path_folder_zarr' should be given.
+        selection # orthogonal selection
+        path_folder_zarr : Union[str, None] = None # the path to the zarr array in the zarr objects server
+        chunk_fetcher : Union[ZarrChunkFetcher, None] = None # if given, the chunks missing from the cache will be fetched concurrently using the fetcher (instead of one by one through the zarr object). the path of the zarr array should be accessible by the fetcher.
+        """
+        path_folder_zarr, shape, chunks, func_get = self._get_zarr_accessor(
+            za, path_folder_zarr
+        )
+        if not self.is_enabled or shape is None:  # cache disabled or not an array
+            return func_get(selection)
+
+        """ parse the selection """
+        t_sel = selection if isinstance(selection, tuple) else (selection,)
+        if len(t_sel) > len(shape):
+            return func_get(selection)
+        t_sel = t_sel + (slice(None),) * (len(shape) - len(t_sel))
+        l_sel, l_flag_dim_dropped = [], []
+        for sel, int_len_axis in zip(t_sel, shape):
+            if isinstance(sel, slice):
+                st, en, step = sel.indices(int_len_axis)
+                if step != 1:
+                    return func_get(selection)
+                l_sel.append(slice(st, max(st, en)))
+                l_flag_dim_dropped.append(False)
+            elif isinstance(sel, (int, np.integer)):
+                sel = int(sel) + int_len_axis if sel < 0 else int(sel)
+                if not 0 <= sel < int_len_axis:
+                    raise IndexError(
+                        f"index {sel} is out of bounds for an axis with size {int_len_axis}"
+                    )
+                l_sel.append(slice(sel, sel + 1))
+                l_flag_dim_dropped.append(True)
+            else:
+                arr = np.asarray(sel)
+                if arr.ndim != 1:
+                    return func_get(selection)
+                if arr.dtype == bool:
+                    arr = np.nonzero(arr)[0]
+                elif arr.dtype.kind not in "iu":
+                    if len(arr) > 0:
+                        return func_get(selection)
+                    arr = arr.astype(np.int64)
+                arr = arr.astype(np.int64)
+                arr[arr < 0] += int_len_axis
+                if len(arr) > 0 and (arr.min() < 0 or arr.max() >= int_len_axis):
+                    raise IndexError(
+                        f"index is out of bounds for an axis with size {int_len_axis}"
+                    )
+                l_sel.append(arr)
+                l_flag_dim_dropped.append(False)
+
+        """ for each axis, group the selected positions by chunk """
+        l_dict_chunk = (
+            []
+        )  # for each axis, idx_chunk > (selection of output, selection of chunk)
+        for sel, int_size_chunk in zip(l_sel, chunks):
+            dict_chunk = dict()
+            if isinstance(sel, slice):
+                for idx_chunk in range(
+                    sel.start // int_size_chunk,
+                    (sel.stop - 1) // int_size_chunk + 1 if sel.stop > sel.start else 0,
+                ):
+                    st_chunk = idx_chunk * int_size_chunk
+                    st, en = max(sel.start, st_chunk), min(
+                        sel.stop, st_chunk + int_size_chunk
+                    )
+                    dict_chunk[idx_chunk] = (
+                        slice(st - sel.start, en - sel.start),
+                        slice(st - st_chunk, en - st_chunk),
+                    )
+            else:
+                arr_idx_chunk = sel // int_size_chunk
+                arr_pos = np.argsort(arr_idx_chunk, kind="stable")
+                arr_idx_chunk_sorted = arr_idx_chunk[arr_pos]
+                arr_idx_chunk_unique, arr_st = np.unique(
+                    arr_idx_chunk_sorted, return_index=True
+                )
+                for idx_chunk, arr_pos_chunk in zip(
+                    arr_idx_chunk_unique, np.split(arr_pos, arr_st[1:])
+                ):
+                    dict_chunk[int(idx_chunk)] = (
+                        arr_pos_chunk,
+                        sel[arr_pos_chunk] - int(idx_chunk) * int_size_chunk,
+                    )
+            l_dict_chunk.append(dict_chunk)
+
+        """ retrieve the chunks missing from the cache at once """
+        dict_chunk_fetched = dict()
+        if chunk_fetcher is not None:
+            l_t_idx_chunk_missing = list(
+                t_idx_chunk
+                for t_idx_chunk in itertools.product(*l_dict_chunk)
+                if (path_folder_zarr, t_idx_chunk) not in self._dict_chunk
+            )
+            if len(l_t_idx_chunk_missing) > 0:
+                dict_chunk_fetched = chunk_fetcher.fetch(
+                    path_folder_zarr, l_t_idx_chunk_missing, chunk_cache=self
+                )
+                with self._lock:
+                    self.int_num_misses += len(l_t_idx_chunk_missing)
+
+        """ assemble the output using the (cached) chunks """
+        arr_out = None
+        flag_ix = any(not isinstance(sel, slice) for sel in l_sel)
+        for t_idx_chunk in itertools.product(*l_dict_chunk):
+            arr_chunk = dict_chunk_fetched.get(t_idx_chunk)
+            if arr_chunk is None:
+                arr_chunk = self.get(path_folder_zarr, t_idx_chunk)
+            if arr_chunk is None:  # fetch and cache the chunk
+                arr_chunk = np.asarray(
+                    func_get(
+                        tuple(
+                            slice(
+                                idx_chunk * int_size_chunk,
+                                min((idx_chunk + 1) * int_size_chunk, int_len_axis),
+                            )
+                            for idx_chunk, int_size_chunk, int_len_axis in zip(
+                                t_idx_chunk, chunks, shape
+                            )
+                        )
+                    )
+                )
+                self.put(path_folder_zarr, t_idx_chunk, arr_chunk)
+            if arr_out is None:
+                arr_out = np.empty(
+                    tuple(
+                        sel.stop - sel.start if isinstance(sel, slice) else len(sel)
+                        for sel in l_sel
+                    ),
+                    dtype=arr_chunk.dtype,
+                )
+            l_sel_out, l_sel_chunk = zip(
+                *(
+                    dict_chunk[idx_chunk]
+                    for dict_chunk, idx_chunk in zip(l_dict_chunk, t_idx_chunk)
+                )
+            )
+            if flag_ix:  # convert slices to arrays for the outer indexing
+                l_sel_out = np.ix_(
+                    *(
+                        np.arange(s.start, s.stop) if isinstance(s, slice) else s
+                        for s in l_sel_out
+                    )
+                )
+                l_sel_chunk = np.ix_(
+                    *(
+                        np.arange(s.start, s.stop) if isinstance(s, slice) else s
+                        for s in l_sel_chunk
+                    )
+                )
+            arr_out[tuple(l_sel_out)] = arr_chunk[tuple(l_sel_chunk)]
+        if arr_out is None:  # empty selection
+            return func_get(selection)
+        return arr_out[tuple(0 if flag else slice(None) for flag in l_flag_dim_dropped)]
+
+
+class ZarrChunkDiskCache:
+    """# 2026-10-17 18:21:05
+    A persistent, size-capped cache of the (encoded) chunks of remote zarr arrays in a local folder, so that the chunks downloaded in a session are re-used in the next sessions.
+    The cache can be safely shared by multiple processes on a node. Each chunk is stored in a separate file written atomically, and a manifest (a SQLite database) records the ETag of the remote object, the SHA-256 hash of the content, the size, and the last access time of each chunk.
+    The content of a chunk is checked against the hash before use, and a corrupted chunk is discarded (and downloaded again).
+    When the total size exceeds the limit, least-recently-used chunks are deleted.
+
+    path_folder : str # the local folder of the cache
+    int_max_num_bytes : int = 2 ** 33 # the maximum total size of the cached chunks in bytes
+    flag_revalidate : bool = False # if True, the ETag of a cached chunk will be checked against the remote object (a conditional request) before use. by default, the remote objects are assumed to be immutable once cached (chunks of a rewritten zarr array should be dropped using the 'invalidate' method).
+    """
+
+    def __init__(
+        self,
+        path_folder: str,
+        int_max_num_bytes: int = 2**33,
+        flag_revalidate: bool = False,
+    ):
+        """# 2026-10-17 18:21:05"""
+        self._path_folder = os.path.abspath(path_folder) + "/"
+        self.int_max_num_bytes = int(int_max_num_bytes)
+        self.flag_revalidate = flag_revalidate
+        self._pid = None  # the process in which the database connection has been opened
+
+    def __getstate__(self):
+        """# 2026-10-17 18:21:05
+        do not transfer the database connection
+        """
+        return {
+            "path_folder": self._path_folder,
+            "int_max_num_bytes": self.int_max_num_bytes,
+            "flag_revalidate": self.flag_revalidate,
+        }
+
+    def __setstate__(self, state):
+        """# 2026-10-17 18:21:05"""
+        self.__init__(**state)
+
+    def __repr__(self):
+        """# 2026-10-17 18:21:05"""
+        return f"<ZarrChunkDiskCache at {self._path_folder} ({self.int_max_num_bytes} bytes)>"
+
+    @property
+    def path_folder(self):
+        """# 2026-10-17 18:21:05"""
+        return self._path_folder
+
+    def _connect(self):
+        """# 2026-10-17 18:21:05
+        open the manifest (once for each process)
+        """
+        import sqlite3
+
+        if self._pid == os.getpid():
+            return self._conn
+        os.makedirs(self._path_folder, exist_ok=True)
+        self._lock = threading.Lock()  # the connection is shared by the threads
+        self._conn = sqlite3.connect(
+            f"{self._path_folder}manifest.sqlite",
+            timeout=600,
+            isolation_level=None,  # autocommit
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk (key TEXT PRIMARY KEY, name_file TEXT, etag TEXT, sha256 TEXT, int_num_bytes INTEGER, time_last_access REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_time_last_access ON chunk (time_last_access)"
+        )
+        self._pid = os.getpid()
+        return self._conn
+
+    def _get_path_file(self, name_file: str):
+        """# 2026-10-17 18:21:05"""
+        return f"{self._path_folder}{name_file[:2]}/{name_file}"
+
+    def get(self, key: str):
+        """# 2026-10-17 18:21:05
+        retrieve a chunk from the cache
+
+        key : str # the path (URL) of the chunk
+
+        returns
+        (bytes_content, etag) : (None, None) if the chunk has not been cached (or the cached chunk is corrupted)
+        """
+        import hashlib
+
+        conn = self._connect()
+        with self._lock:
+            row = conn.execute(
+                "SELECT name_file, etag, sha256 FROM chunk WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None, None
+        name_file, etag, sha256 = row
+        try:
+            with open(self._get_path_file(name_file), "rb") as file:
+                bytes_content = file.read()
+        except OSError:
+            bytes_content = None
+        if (
+            bytes_content is None or hashlib.sha256(bytes_content).hexdigest() != sha256
+        ):  # discard a missing or corrupted chunk
+            self._delete([(key, name_file)])
+            return None, None
+        with self._lock:
+            conn.execute(
+                "UPDATE chunk SET time_last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return bytes_content, etag
+
+    def put(self, key: str, bytes_content: bytes, etag: Union[str, None] = None):
+        """# 2026-10-17 18:21:05
+        add a chunk to the cache, and delete least-recently-used chunks if the total size exceeds the limit
+
+        key : str # the path (URL) of the chunk
+        bytes_content : bytes # the (encoded) content of the chunk
+        etag : Union[str, None] = None # the ETag of the remote object
+        """
+        import hashlib
+
+        if len(bytes_content) > self.int_max_num_bytes:
+            return
+        conn = self._connect()
+        sha256 = hashlib.sha256(bytes_content).hexdigest()
+        name_file = hashlib.sha256(key.encode()).hexdigest()
+        path_file = self._get_path_file(name_file)
+        os.makedirs(os.path.dirname(path_file), exist_ok=True)
+        path_file_temp = f"{path_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path_file_temp, "wb") as file:
+            file.write(bytes_content)
+        os.replace(path_file_temp, path_file)  # write the chunk atomically
+        with self._lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunk VALUES (?, ?, ?, ?, ?, ?)",
+                (key, name_file, etag, sha256, len(bytes_content), time.time()),
+            )
+            int_num_bytes = conn.execute(
+                "SELECT COALESCE(SUM(int_num_bytes), 0) FROM chunk"
+            ).fetchone()[0]
+        if int_num_bytes > self.int_max_num_bytes:
+            self._evict(int_num_bytes - int(self.int_max_num_bytes * 0.9))
+
+    def _delete(self, l_key_and_name_file: list):
+        """# 2026-10-17 18:21:05
+        delete the given chunks from the manifest and the folder
+        """
+        conn = self._connect()
+        with self._lock:
+            conn.executemany(
+                "DELETE FROM chunk WHERE key = ?",
+                list((key,) for key, _ in l_key_and_name_file),
+            )
+        for _, name_file in l_key_and_name_file:
+            try:
+                os.remove(self._get_path_file(name_file))
+            except OSError:
+                pass
+
+    def _evict(self, int_num_bytes_to_free: int):
+        """# 2026-10-17 18:21:05
+        delete least-recently-used chunks to free the given number of bytes
+        """
+        conn = self._connect()
+        l_key_and_name_file = []
+        with self._lock:
+            for key, name_file, int_num_bytes in conn.execute(
+                "SELECT key, name_file, int_num_bytes FROM chunk ORDER BY time_last_access"
+            ):
+                if int_num_bytes_to_free <= 0:
+                    break
+                l_key_and_name_file.append((key, name_file))
+                int_num_bytes_to_free -= int_num_bytes
+        self._delete(l_key_and_name_file)
+
+    def invalidate(self, path_folder: str):
+        """# 2026-10-17 18:21:05
+        delete all cached chunks of the zarr arrays located in the given folder. should be called when a remote zarr array has been rewritten.
+
+        returns the number of chunks deleted
+        """
+        conn = self._connect()
+        path_folder = path_folder.rstrip("/") + "/"
+        with self._lock:
+            l_key_and_name_file = conn.execute(
+                "SELECT key, name_file FROM chunk WHERE substr(key, 1, ?) = ?",
+                (len(path_folder), path_folder),
+            ).fetchall()
+        self._delete(l_key_and_name_file)
+        return len(l_key_and_name_file)
+
+    def clear(self):
+        """# 2026-10-17 18:21:05
+        delete all cached chunks
+        """
+        conn = self._connect()
+        with self._lock:
+            l_key_and_name_file = conn.execute(
+                "SELECT key, name_file FROM chunk"
+            ).fetchall()
+        self._delete(l_key_and_name_file)
+
+    @property
+    def dict_stats(self):
+        """# 2026-10-17 18:21:05
+        return the number of chunks and the total size of the cached chunks
+        """
+        conn = self._connect()
+        with self._lock:
+            int_num_chunks, int_num_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(int_num_bytes), 0) FROM chunk"
+            ).fetchone()
+        return {
+            "int_num_chunks": int_num_chunks,
+            "int_num_bytes": int_num_bytes,
+            "int_max_num_bytes": self.int_max_num_bytes,
+        }
+
+
+class ZarrChunkFetcher:
+    """# 2026-10-17 16:02:37
+    An asyncio-based fetcher of zarr (v2) chunks that issues many chunk GETs concurrently through a pool of connections, for zarr arrays hosted over HTTP, in AWS S3, or in the local file system.
+    Access through a zarr HTTP store is serialized (the store is not thread-safe), which makes the retrieval of many small chunks latency-bound. The fetcher instead runs an event loop in a background (daemon) thread, reads the chunk objects directly, and decodes them using the codecs described in the '.zarray' metadata.
+    Chunks can be fetched (blocking) or prefetched (non-blocking) into a ZarrChunkCache, so that upcoming reads are served from the cache (read-ahead).
+    The event loop is re-created after a fork, and the fetcher can be safely used in forked processes.
+
+    int_num_connections : int = 32 # the maximum number of concurrent requests (the size of the connection pool)
+    dict_kwargs_credentials_s3 : dict = dict( ) # the credentials for the Amazon S3 file system as keyworded arguments
+    disk_cache : Union[ None, ZarrChunkDiskCache ] = None # the persistent disk cache of the chunks of remote zarr arrays. if None is given, remote chunks are always downloaded. (can be changed later by setting the 'disk_cache' attribute)
+    flag_treat_403_as_missing : bool = False # if True, an HTTP 403 (Forbidden) response will be interpreted as a missing (uninitialized) chunk, which is useful for S3 buckets served over HTTP without the permission to list objects (the response for a missing object is 403 in such buckets). by default, a 403 response raises an error (e.g. expired credentials).
+    """
+
+    def __init__(
+        self,
+        int_num_connections: int = 32,
+        dict_kwargs_credentials_s3: dict = dict(),
+        disk_cache=None,
+        flag_treat_403_as_missing: bool = False,
+    ):
+        """# 2026-10-17 18:21:05"""
+        self._int_num_connections = int_num_connections
+        self._dict_kwargs_credentials_s3 = dict_kwargs_credentials_s3
+        self.disk_cache = disk_cache
+        self.flag_treat_403_as_missing = flag_treat_403_as_missing
+        self._lock, self._pid_lock = threading.Lock(), os.getpid()
+        self._pid = None  # the process in which the event loop is running
+
+    def __getstate__(self):
+        """# 2026-10-17 16:02:37
+        do not transfer the event loop and the pending requests
+        """
+        return {
+            "int_num_connections": self._int_num_connections,
+            "dict_kwargs_credentials_s3": self._dict_kwargs_credentials_s3,
+            "disk_cache": self.disk_cache,
+            "flag_treat_403_as_missing": self.flag_treat_403_as_missing,
+        }
+
+    def __setstate__(self, state):
+        """# 2026-10-17 16:02:37"""
+        self.__init__(**state)
+
+    def __repr__(self):
+        """# 2026-10-17 16:02:37"""
+        return f"<ZarrChunkFetcher with {self._int_num_connections} connections>"
+
+    @property
+    def int_num_connections(self):
+        """# 2026-10-17 16:02:37"""
+        return self._int_num_connections
+
+    def _start(self):
+        """# 2026-10-17 16:02:37
+        start the event loop in a background thread (if the loop has not been started in the current process)
+        """
+        if (
+            self._pid_lock != os.getpid()
+        ):  # the lock might be held in the parent process at the time of the fork
+            self._lock, self._pid_lock = threading.Lock(), os.getpid()
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if (
+                self._pid is not None
+            ):  # keep the objects inherited from the parent process, which should not be closed (or garbage-collected) in the current process
+                self._l_object_inherited = [self._session_http, self._fs_s3, self._loop]
+            self._pid = os.getpid()
+            self._dict_meta = dict()  # path_folder_zarr > metadata of the zarr array
+            self._dict_future = (
+                dict()
+            )  # (path_folder_zarr, t_idx_chunk) > future of the pending request
+            self._session_http = None
+            self._fs_s3 = None
+            self._loop = asyncio.new_event_loop()
+            self._semaphore = None
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+            atexit.register(self.close)
+
+    def close(self):
+        """# 2026-10-17 16:02:37
+        close the connections and stop the event loop of the current process
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            self._pid = None
+
+        async def __close():
+            if self._session_http is not None:
+                await self._session_http.close()
+            if self._fs_s3 is not None and self._fs_s3._s3 is not None:
+                await self._fs_s3._s3.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(__close(), self._loop).result(timeout=10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _fetch_remote(self, path_file: str, etag: Union[str, None] = None):
+        """# 2026-10-17 18:21:05
+        fetch the content of a remote file (object).
+
+        etag : Union[str, None] = None # if given, the content will not be transferred if the ETag of the remote object is identical
+
+        returns
+        (bytes_content, etag) : 'bytes_content' is None if the file does not exist, and is False if the remote object has not been modified since the given ETag
+        """
+        if self._semaphore is None:  # create objects bound to the event loop
+            self._semaphore = asyncio.Semaphore(self._int_num_connections)
+        async with self._semaphore:
+            if is_http_url(path_file):
+                import aiohttp
+
+                if self._session_http is None:
+                    self._session_http = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=self._int_num_connections)
+                    )
+                async with self._session_http.get(
+                    path_file, headers=None if etag is None else {"If-None-Match": etag}
+                ) as r:
+                    if r.status == 304:  # not modified
+                        return False, etag
+                    if r.status == 404 or (
+                        r.status == 403 and self.flag_treat_403_as_missing
+                    ):  # a missing chunk
+                        return None, None
+                    r.raise_for_status()
+                    return await r.read(), r.headers.get("ETag")
+            else:  # AWS S3
+                import s3fs
+
+                if self._fs_s3 is None:
+                    self._fs_s3 = s3fs.S3FileSystem(
+                        asynchronous=True,
+                        loop=self._loop,
+                        **self._dict_kwargs_credentials_s3,
+                    )
+                    await self._fs_s3.set_session()
+                try:
+                    if etag is not None:  # revalidate using the metadata of the object
+                        etag_remote = (await self._fs_s3._info(path_file)).get("ETag")
+                        if etag_remote == etag:
+                            return False, etag
+                        return (
+                            await self._fs_s3._cat_file(path_file),
+                            etag_remote,
+                        )
+                    return await self._fs_s3._cat_file(path_file), None
+                except FileNotFoundError:
+                    return None, None
+
+    async def _fetch_bytes(self, path_file: str):
+        """# 2026-10-17 18:21:05
+        fetch the content of a file (object). return None if the file does not exist.
+        chunks of remote zarr arrays are read through the disk cache (if available).
+        """
+        if not is_remote_url(path_file):  # local file system
+
+            def __read(path_file):
+                if not os.path.exists(path_file):
+                    return None
+                with open(path_file, "rb") as file:
+                    return file.read()
+
+            return await self._loop.run_in_executor(None, __read, path_file)
+
+        disk_cache = self.disk_cache
+        if (
+            disk_cache is None or path_file.rsplit("/", 1)[-1][:1] == "."
+        ):  # metadata files (e.g. '.zarray') are not cached, since they can be updated
+            return (await self._fetch_remote(path_file))[0]
+
+        # read the chunk from the disk cache
+        bytes_content, etag = await self._loop.run_in_executor(
+            None, disk_cache.get, path_file
+        )
+        if bytes_content is not None and not disk_cache.flag_revalidate:
+            return bytes_content
+        bytes_content_remote, etag_remote = await self._fetch_remote(
+            path_file, etag if bytes_content is not None else None
+        )
+        if bytes_content_remote is False:  # the cached chunk is still valid
+            return bytes_content
+        if bytes_content_remote is not None:
+            await self._loop.run_in_executor(
+                None, disk_cache.put, path_file, bytes_content_remote, etag_remote
+            )
+        return bytes_content_remote
+
+    async def _get_metadata(self, path_folder_zarr: str):
+        """# 2026-10-17 16:02:37
+        retrieve (and cache) the metadata of a zarr array. concurrent requests for the same zarr array share a single request.
+        """
+
+        async def __load_metadata():
+            bytes_meta = await self._fetch_bytes(f"{path_folder_zarr}/.zarray")
+            if bytes_meta is None:
+                raise FileNotFoundError(f"'{path_folder_zarr}' is not a zarr array")
+            meta = zarr.meta.Metadata2.decode_array_metadata(bytes_meta)
+            meta["compressor"] = (
+                None
+                if meta["compressor"] is None
+                else numcodecs.get_codec(meta["compressor"])
+            )
+            meta["filters"] = list(
+                numcodecs.get_codec(e) for e in (meta["filters"] or [])
+            )
+            return meta
+
+        if path_folder_zarr not in self._dict_meta:
+            self._dict_meta[path_folder_zarr] = asyncio.ensure_future(__load_metadata())
+        try:
+            return await self._dict_meta[path_folder_zarr]
+        except Exception:
+            self._dict_meta.pop(path_folder_zarr, None)  # retry at the next request
+            raise
+
+    def invalidate(self, path_folder: str):
+        """# 2026-10-17 16:02:37
+        drop the cached metadata of the zarr arrays located in the given folder. should be called when a zarr array has been rewritten.
+        """
+        if self._pid != os.getpid():
+            return
+        path_folder = path_folder.rstrip("/")
+
+        def __invalidate():
+            for path_folder_zarr in list(self._dict_meta):
+                if path_folder_zarr == path_folder or path_folder_zarr.startswith(
+                    path_folder + "/"
+                ):
+                    self._dict_meta.pop(path_folder_zarr)
+
+        self._loop.call_soon_threadsafe(__invalidate)
+
+    async def _fetch_chunk(self, path_folder_zarr: str, t_idx_chunk: tuple):
+        """# 2026-10-17 16:02:37
+        fetch and decode a chunk. the chunk is trimmed at the edges of the array (as returned by slicing the zarr array).
+        """
+        meta = await self._get_metadata(path_folder_zarr)
+        shape, chunks, dtype = meta["shape"], meta["chunks"], meta["dtype"]
+        bytes_chunk = await self._fetch_bytes(
+            f"{path_folder_zarr}/"
+            + (meta.get("dimension_separator") or ".").join(str(e) for e in t_idx_chunk)
+        )  # retrieve the chunk object
+        if bytes_chunk is None:  # an uninitialized chunk
+            arr_chunk = np.full(chunks, meta["fill_value"], dtype=dtype)
+        else:
+            chunk = (
+                bytes_chunk
+                if meta["compressor"] is None
+                else meta["compressor"].decode(bytes_chunk)
+            )
+            for codec in reversed(meta["filters"]):
+                chunk = codec.decode(chunk)
+            arr_chunk = (
+                np.asarray(chunk, dtype=object)
+                if dtype == object
+                else numcodecs.compat.ensure_ndarray(chunk).view(dtype)
+            ).reshape(chunks, order=meta["order"])
+        return np.ascontiguousarray(
+            arr_chunk[
+                tuple(
+                    slice(
+                        0,
+                        min(int_size_chunk, int_len_axis - idx_chunk * int_size_chunk),
+                    )
+                    for idx_chunk, int_size_chunk, int_len_axis in zip(
+                        t_idx_chunk, chunks, shape
+                    )
+                )
+            ]
+        )
+
+    def _submit(self, path_folder_zarr: str, l_t_idx_chunk: list, chunk_cache=None):
+        """# 2026-10-17 16:02:37
+        submit requests for the chunks that are not being fetched, and return the futures of all given chunks
+        """
+        self._start()
+        path_folder_zarr = path_folder_zarr.rstrip("/")
+
+        def __on_completion(future, key):
+            if (
+                chunk_cache is not None
+                and not future.cancelled()
+                and future.exception() is None
+            ):
+                chunk_cache.put(*key, future.result())
+            with self._lock:
+                self._dict_future.pop(key, None)
+
+        l_future, l_future_new = [], []
+        with self._lock:
+            for t_idx_chunk in l_t_idx_chunk:
+                key = (path_folder_zarr, tuple(int(e) for e in t_idx_chunk))
+                future = self._dict_future.get(key)
+                if future is None:
+                    future = asyncio.run_coroutine_threadsafe(
+                        self._fetch_chunk(*key), self._loop
+                    )
+                    self._dict_future[key] = future
+                    l_future_new.append((key, future))
+                l_future.append((key[1], future))
+        for (
+            key,
+            future,
+        ) in (
+            l_future_new
+        ):  # the callback can be called immediately, and should be added without the lock
+            future.add_done_callback(
+                lambda future, key=key: __on_completion(future, key)
+            )
+        return l_future
+
+    def fetch(self, path_folder_zarr: str, l_t_idx_chunk: list, chunk_cache=None):
+        """# 2026-10-17 16:02:37
+        fetch the given chunks concurrently and wait until all chunks are available. chunks being prefetched are not requested again.
+
+        path_folder_zarr : str # the path (local path, HTTP URL, or S3 URI) of the zarr array
+        l_t_idx_chunk : list # the list of the indices of the chunks (tuple)
+        chunk_cache : Union[ZarrChunkCache, None] = None # if given, the fetched chunks will be added to the cache
+
+        returns
+        dict_chunk : t_idx_chunk > decoded chunk
+        """
+        return dict(
+            (t_idx_chunk, future.result())
+            for t_idx_chunk, future in self._submit(
+                path_folder_zarr, l_t_idx_chunk, chunk_cache
+            )
+        )
+
+    def prefetch(self, path_folder_zarr: str, l_t_idx_chunk: list, chunk_cache):
+        """# 2026-10-17 16:02:37
+        start fetching the given chunks into the cache without waiting. chunks already in the cache are not requested.
+        """
+        path_folder_zarr = path_folder_zarr.rstrip("/")
+        l_t_idx_chunk = list(
+            t_idx_chunk
+            for t_idx_chunk in l_t_idx_chunk
+            if (path_folder_zarr, tuple(t_idx_chunk)) not in chunk_cache._dict_chunk
+        )
+        if len(l_t_idx_chunk) > 0:
+            self._submit(path_folder_zarr, l_t_idx_chunk, chunk_cache)
+
+    def wait(self):
+        """# 2026-10-17 16:02:37
+        wait until all pending requests are completed
+        """
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            l_future = list(self._dict_future.values())
+        concurrent.futures.wait(l_future)
+
+
+""" a default chunk cache shared across RAMtx objects in the current process """
+zarr_chunk_cache = ZarrChunkCache()
+""" a default chunk fetcher used for reading remote RamData objects. the persistent disk cache is not used by default, since remote objects can be modified by other writers. to re-use the downloaded chunks across sessions, set a disk cache, e.g. 'zarr_chunk_fetcher.disk_cache = ZarrChunkDiskCache( path_folder_zarr_chunk_disk_cache )' (for remote RamData that can be modified, use 'flag_revalidate = True') """
+zarr_chunk_fetcher = ZarrChunkFetcher()
+""" the default location of the persistent disk cache of remote zarr chunks """
+path_folder_zarr_chunk_disk_cache = os.path.join(
+    os.path.expanduser("~"), ".cache", "scelephant", "zarr_chunks"
+)
+
+
+def _get_knn_graph_search_function():
+    """# 2026-10-17 20:31:05
+    compile (once per process) and return a numba function performing the nearest-neighbor descent search on a kNN graph. unlike the search functions of 'pynndescent', the arrays of the index are given as arguments (instead of being captured in a closure and frozen into the compiled code), so that memory-mapped arrays can be searched without copying.
+    """
+    global _knn_graph_search_function
+    if _knn_graph_search_function is not None:
+        return _knn_graph_search_function
+    import heapq
+    import numba
+
+    @numba.njit(nogil=True)
+    def __heap_push(priorities, indices, p, n):
+        """# 2026-10-17 20:31:05
+        push an item into a max-heap of a fixed size (the item with the largest priority will be replaced)
+        """
+        if p >= priorities[0]:
+            return
+        size = priorities.shape[0]
+        i = 0
+        while (
+            True
+        ):  # descend the heap, swapping values until the max heap criterion is met
+            ic1 = 2 * i + 1
+            ic2 = ic1 + 1
+            if ic1 >= size:
+                break
+            elif ic2 >= size:
+                if priorities[ic1] > p:
+                    i_swap = ic1
+                else:
+                    break
+            elif priorities[ic1] >= priorities[ic2]:
+                if p < priorities[ic1]:
+                    i_swap = ic1
+                else:
+                    break
+            else:
+                if p < priorities[ic2]:
+                    i_swap = ic2
+                else:
+                    break
+            priorities[i] = priorities[i_swap]
+            indices[i] = indices[i_swap]
+            i = i_swap
+        priorities[i] = p
+        indices[i] = n
+
+    @numba.njit(nogil=True, fastmath=True)
+    def __squared_euclidean(x, y):
+        """# 2026-10-17 20:31:05"""
+        result = np.float32(0.0)
+        for i in range(x.shape[0]):
+            diff = x[i] - y[i]
+            result += diff * diff
+        return result
+
+    @numba.njit(nogil=True, fastmath=True)
+    def search_knn_graph(
+        query_points,
+        k,
+        epsilon,
+        data,
+        indptr,
+        indices,
+        tree_hyperplanes,
+        tree_offsets,
+        tree_children,
+        tree_indices,
+        n_neighbors,
+        min_distance,
+    ):
+        """# 2026-10-17 20:31:05
+        search the k nearest neighbors (squared euclidean distances) of the query points, starting from the leaf of the random projection tree, and return (unsorted) heaps of neighbors and distances
+        """
+        int_num_queries = query_points.shape[0]
+        int_num_points = data.shape[0]
+        arr_heap_indices = np.full((int_num_queries, k), -1, dtype=np.int32)
+        arr_heap_priorities = np.full((int_num_queries, k), np.inf, dtype=np.float32)
+        visited = np.zeros(int_num_points // 8 + 1, dtype=np.uint8)  # a bitset
+        for i in range(int_num_queries):
+            visited[:] = 0
+            current_query = query_points[i]
+            heap_priorities = arr_heap_priorities[i]
+            heap_indices = arr_heap_indices[i]
+            seed_set = [(np.float32(np.inf), np.int32(-1)) for j in range(0)]
+
+            # initialize from the leaf of the tree
+            st, en = 0, 0
+            if tree_children.shape[0] > 0:
+                node = 0
+                while tree_children[node, 0] > 0:
+                    margin = tree_offsets[node]
+                    for d in range(current_query.shape[0]):
+                        margin += tree_hyperplanes[node, d] * current_query[d]
+                    if abs(margin) < 1e-8:
+                        side = np.random.randint(2)
+                    elif margin > 0:
+                        side = 0
+                    else:
+                        side = 1
+                    node = tree_children[node, side]
+                st, en = -tree_children[node, 0], -tree_children[node, 1]
+            for j in range(st, en):
+                candidate = np.int32(tree_indices[j])
+                d = __squared_euclidean(current_query, data[candidate])
+                __heap_push(heap_priorities, heap_indices, d, candidate)
+                heapq.heappush(seed_set, (d, candidate))
+                visited[candidate >> 3] |= np.uint8(1 << (candidate & 7))
+
+            # add random samples if needed
+            for j in range(min(k, n_neighbors) - (en - st)):
+                candidate = np.int32(np.random.randint(int_num_points))
+                if visited[candidate >> 3] & (1 << (candidate & 7)) == 0:
+                    visited[candidate >> 3] |= np.uint8(1 << (candidate & 7))
+                    d = __squared_euclidean(current_query, data[candidate])
+                    __heap_push(heap_priorities, heap_indices, d, candidate)
+                    heapq.heappush(seed_set, (d, candidate))
+            if len(seed_set) == 0:
+                continue
+
+            # search the graph
+            distance_bound = heap_priorities[0] + (
+                epsilon * (heap_priorities[0] - min_distance)
+            )
+            d_vertex, vertex = heapq.heappop(seed_set)
+            while d_vertex < distance_bound:
+                for j in range(indptr[vertex], indptr[vertex + 1]):
+                    candidate = np.int32(indices[j])
+                    if visited[candidate >> 3] & (1 << (candidate & 7)) == 0:
+                        visited[candidate >> 3] |= np.uint8(1 << (candidate & 7))
+                        d = __squared_euclidean(current_query, data[candidate])
+                        if d < distance_bound:
+                            __heap_push(heap_priorities, heap_indices, d, candidate)
+                            heapq.heappush(seed_set, (d, candidate))
+                            distance_bound = heap_priorities[0] + (
+                                epsilon * (heap_priorities[0] - min_distance)
+                            )  # update the bound
+                if len(seed_set) == 0:
+                    break
+                d_vertex, vertex = heapq.heappop(seed_set)
+        return arr_heap_indices, arr_heap_priorities
+
+    _knn_graph_search_function = search_knn_graph
+    return _knn_graph_search_function
+
+
+_knn_graph_search_function = None
+
+
+class MemoryMappedKNNIndex:
+    """# 2026-10-17 20:31:05
+    a read-only kNN index (converted from a 'pynndescent.NNDescent' index using the euclidean distance) stored as flat '.npy' arrays (the search graph, the search tree, and the training vectors) in a folder.
+    the arrays are memory-mapped read-only, so that all processes querying the index share a single copy of the index in the page cache, and loading the index (or spawning a worker) does not require un-pickling the entire index.
+    the index can be pickled, in which case only the path to the folder will be serialized.
+
+    path_folder : str # the path to the local folder containing the index
+    mmap_mode : Union[ str, None ] = 'r' # the mode for memory-mapping the arrays. if None is given, the arrays will be loaded into memory
+    """
+
+    # the arrays of the index
+    _l_name_array = [
+        "data",
+        "graph_indptr",
+        "graph_indices",
+        "vertex_order",
+        "tree_hyperplanes",
+        "tree_offsets",
+        "tree_children",
+        "tree_indices",
+    ]
+    # metrics supported by the index : metric > flag indicating whether to take square root of the squared euclidean distances
+    _dict_metric = {"euclidean": True, "l2": True, "sqeuclidean": False}
+
+    def __init__(self, path_folder: str, mmap_mode: Union[str, None] = "r"):
+        """# 2026-10-17 20:31:05"""
+        self._path_folder = path_folder.rstrip("/") + "/"
+        self._mmap_mode = mmap_mode
+        with open(f"{self._path_folder}metadata.json") as file:
+            self._dict_metadata = json.load(file)
+        self.n_neighbors = self._dict_metadata["n_neighbors"]
+        self.dim = self._dict_metadata["dim"]
+        self.metric = self._dict_metadata["metric"]
+        self._dict_array = dict(
+            (
+                name_array,
+                np.asarray(
+                    np.load(f"{self._path_folder}{name_array}.npy", mmap_mode=mmap_mode)
+                ),  # convert np.memmap to np.ndarray (a view of the memory-mapped buffer) for numba
+            )
+            for name_array in self._l_name_array
+        )
+
+    @classmethod
+    def is_convertible(cls, knnindex):
+        """# 2026-10-17 20:31:05
+        return True if the given 'pynndescent.NNDescent' index can be converted
+        """
+        return (
+            knnindex.metric in cls._dict_metric
+            and not getattr(knnindex, "_is_sparse", False)
+            and getattr(knnindex, "quantization", None) is None
+            and not getattr(knnindex, "_angular_trees", False)
+        )
+
+    @classmethod
+    def save_nndescent(cls, knnindex, path_folder: str):
+        """# 2026-10-17 20:31:05
+        save a 'pynndescent.NNDescent' index as flat '.npy' arrays in the given folder, and return the path to the folder
+
+        knnindex : pynndescent.NNDescent # the index. the index should use the 'euclidean' (or 'l2', 'sqeuclidean') metric with dense data
+        path_folder : str # the path to the output folder
+        """
+        if not cls.is_convertible(knnindex):
+            raise NotImplementedError(
+                f"the index using '{knnindex.metric}' metric (or sparse/quantized data) cannot be converted"
+            )
+        knnindex.prepare()  # build the search graph and the search tree
+        path_folder = path_folder.rstrip("/") + "/"
+        os.makedirs(path_folder, exist_ok=True)
+        flag_tree = knnindex.tree_init and len(knnindex._search_forest) > 0
+        tree = knnindex._search_forest[0] if flag_tree else None
+        dict_array = {
+            "data": np.ascontiguousarray(
+                knnindex._raw_data, dtype=np.float32
+            ),  # sorted in the order of the vertices
+            "graph_indptr": knnindex._search_graph.indptr.astype(np.int64),
+            "graph_indices": knnindex._search_graph.indices.astype(np.int32),
+            "vertex_order": np.asarray(knnindex._vertex_order, dtype=np.int64),
+            "tree_hyperplanes": np.ascontiguousarray(
+                tree.hyperplanes if flag_tree else np.zeros((0, knnindex.dim)),
+                dtype=np.float32,
+            ),
+            "tree_offsets": np.ascontiguousarray(
+                tree.offsets if flag_tree else np.zeros(0), dtype=np.float32
+            ),
+            "tree_children": np.ascontiguousarray(
+                tree.children if flag_tree else np.zeros((0, 2)), dtype=np.int32
+            ),
+            "tree_indices": np.ascontiguousarray(
+                tree.indices if flag_tree else np.zeros(0), dtype=np.int32
+            ),
+        }
+        for name_array in cls._l_name_array:
+            np.save(f"{path_folder}{name_array}.npy", dict_array[name_array])
+        with open(f"{path_folder}metadata.json", "w") as file:
+            json.dump(
+                {
+                    "metric": knnindex.metric,
+                    "n_neighbors": int(knnindex.n_neighbors),
+                    "dim": int(knnindex.dim),
+                    "min_distance": float(knnindex._min_distance),
+                },
+                file,
+            )
+        return path_folder
+
+    @property
+    def path_folder(self):
+        """# 2026-10-17 20:31:05"""
+        return self._path_folder
+
+    @property
+    def n_entries(self):
+        """# 2026-10-17 20:31:05
+        the number of entries in the index
+        """
+        return len(self._dict_array["vertex_order"])
+
+    def prepare(self):
+        """# 2026-10-17 20:31:05
+        compile the search function. calling this method before forking worker processes allows the workers to use the compiled function
+        """
+        self.query(self._dict_array["data"][:1], k=1)
+
+    def query(self, query_data, k: int = 10, epsilon: float = 0.1):
+        """# 2026-10-17 20:31:05
+        query the k nearest neighbors of the given points, and return 'indices' and 'distances' arrays of the neighbors (sorted by distances), using the same convention as 'pynndescent.NNDescent.query'
+
+        query_data : np.ndarray # (n_points, dim) array of points to query
+        k : int = 10 # the number of nearest neighbors to return
+        epsilon : float = 0.1 # the trade-off between accuracy and search cost (see 'pynndescent.NNDescent.query')
+        """
+        query_data = np.ascontiguousarray(query_data, dtype=np.float32)
+        d = self._dict_array
+        arr_heap_indices, arr_heap_priorities = _get_knn_graph_search_function()(
+            query_data,
+            k,
+            epsilon,
+            d["data"],
+            d["graph_indptr"],
+            d["graph_indices"],
+            d["tree_hyperplanes"],
+            d["tree_offsets"],
+            d["tree_children"],
+            d["tree_indices"],
+            self.n_neighbors,
+            self._dict_metadata["min_distance"],
+        )
+        # sort the neighbors by distances
+        arr_order = np.argsort(arr_heap_priorities, axis=1, kind="stable")
+        distances = np.take_along_axis(arr_heap_priorities, arr_order, axis=1)
+        indices = np.take_along_axis(arr_heap_indices, arr_order, axis=1)
+        # map to the original order of the entries (missing neighbors will be marked by -1)
+        indices = np.where(indices >= 0, d["vertex_order"][indices], -1)
+        if self._dict_metric[self.metric]:
+            distances = np.sqrt(distances)
+        return indices, distances
+
+    def __getstate__(self):
+        """# 2026-10-17 20:31:05
+        only the path of the index will be pickled
+        """
+        return {"path_folder": self._path_folder, "mmap_mode": self._mmap_mode}
+
+    def __setstate__(self, state):
+        """# 2026-10-17 20:31:05"""
+        self.__init__(state["path_folder"], mmap_mode=state["mmap_mode"])
+
+    def __repr__(self):
+        """# 2026-10-17 20:31:05"""
+        return f"<MemoryMappedKNNIndex of {self.n_entries} entries (metric={self.metric}, n_neighbors={self.n_neighbors}) at '{self._path_folder}'>"
+
+
+class BruteForceKNNIndex:
+    """# 2026-10-17 21:12:40
+    an exact kNN index performing blocked brute-force search using BLAS matrix products and 'np.argpartition'. for moderate numbers of entries in the index, building the index is instant and the results are deterministic (unlike the approximate 'pynndescent.NNDescent' index). the index has the same interface as 'pynndescent.NNDescent' for querying ('query', 'prepare', 'n_neighbors', 'dim').
+
+    data : np.ndarray # (n_entries, dim) array of the entries of the index
+    n_neighbors : int = 10 # the number of neighbors of the index
+    metric : str = 'euclidean' # one of 'euclidean' ('l2'), 'sqeuclidean', and 'cosine'
+    int_max_num_bytes_in_a_block : int = 2 ** 27 # the maximum size of the block of the distance matrix that will be calculated at a time
+    """
+
+    _set_metric = {"euclidean", "l2", "sqeuclidean", "cosine"}
+
+    def __init__(
+        self,
+        data,
+        n_neighbors: int = 10,
+        metric: str = "euclidean",
+        int_max_num_bytes_in_a_block: int = 2**27,
+    ):
+        """# 2026-10-17 21:12:40"""
+        if metric not in self._set_metric:
+            raise NotImplementedError(
+                f"'{metric}' metric is not supported by the brute-force kNN index"
+            )
+        self.n_neighbors = n_neighbors
+        self.metric = metric
+        self._int_max_num_bytes_in_a_block = int_max_num_bytes_in_a_block
+        self._data = self._prepare_points(data)
+        self.dim = self._data.shape[1]
+        self._arr_squared_norm = np.einsum("ij,ij->i", self._data, self._data)
+
+    @classmethod
+    def is_available(cls, metric: str = "euclidean"):
+        """# 2026-10-17 21:12:40
+        return True if the metric is supported by the brute-force kNN index
+        """
+        return metric in cls._set_metric
+
+    def _prepare_points(self, data):
+        """# 2026-10-17 21:12:40
+        convert points to a contiguous float32 array (normalized for the 'cosine' metric)
+        """
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        if self.metric == "cosine":
+            arr_norm = np.linalg.norm(data, axis=1, keepdims=True)
+            arr_norm[arr_norm == 0] = 1
+            data = data / arr_norm
+        return data
+
+    @property
+    def n_entries(self):
+        """# 2026-10-17 21:12:40
+        the number of entries in the index
+        """
+        return len(self._data)
+
+    def prepare(self):
+        """# 2026-10-17 21:12:40
+        (no preparation is required for the brute-force index)
+        """
+        return
+
+    def query(self, query_data, k: int = 10, epsilon: Union[float, None] = None):
+        """# 2026-10-17 21:12:40
+        search the exact k nearest neighbors of the given points, and return 'indices' and 'distances' arrays of the neighbors sorted by distances (ties are resolved by the indices of the entries), using the same convention as 'pynndescent.NNDescent.query'
+
+        query_data : np.ndarray # (n_points, dim) array of points to query
+        k : int = 10 # the number of nearest neighbors to return
+        epsilon : Union[ float, None ] = None # not used (for compatibility with 'pynndescent.NNDescent.query')
+        """
+        query_data = self._prepare_points(query_data)
+        int_num_queries, int_num_entries = len(query_data), len(self._data)
+        k = min(k, int_num_entries)
+        indices = np.zeros((int_num_queries, k), dtype=np.int64)
+        distances = np.zeros((int_num_queries, k), dtype=np.float32)
+        int_num_queries_in_a_block = max(
+            1, self._int_max_num_bytes_in_a_block // (4 * max(1, int_num_entries))
+        )
+        for st in range(0, int_num_queries, int_num_queries_in_a_block):
+            en = min(int_num_queries, st + int_num_queries_in_a_block)
+            arr_query = query_data[st:en]
+            # calculate squared euclidean distances for the block (ranking only)
+            arr_dist = arr_query @ self._data.T
+            arr_dist *= -2
+            arr_dist += self._arr_squared_norm
+            # select the k candidates with the smallest distances
+            arr_idx = (
+                np.argpartition(arr_dist, k - 1, axis=1)[:, :k]
+                if k < int_num_entries
+                else np.broadcast_to(np.arange(int_num_entries), arr_dist.shape)
+            )
+            # re-calculate the distances of the candidates exactly, and sort the candidates
+            arr_dist_candidate = (
+                (arr_query[:, None, :] - self._data[arr_idx]) ** 2
+            ).sum(axis=2)
+            arr_order = np.lexsort((arr_idx, arr_dist_candidate), axis=1)
+            indices[st:en] = np.take_along_axis(arr_idx, arr_order, axis=1)
+            distances[st:en] = np.take_along_axis(arr_dist_candidate, arr_order, axis=1)
+        if self.metric in {"euclidean", "l2"}:
+            distances = np.sqrt(distances)
+        elif self.metric == "cosine":
+            distances = distances / 2  # 1 - cosine similarity for normalized vectors
+        return indices, distances
+
+
+def build_knn_index(
+    data,
+    n_neighbors: int = 10,
+    knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
+    int_max_num_entries_for_brute_force: int = 50000,
+    **dict_kw_pynndescent,
+):
+    """# 2026-10-17 21:12:40
+    build (and prepare) a kNN index of the given data for querying
+
+    data : np.ndarray # (n_entries, dim) array of the entries of the index
+    n_neighbors : int = 10 # the number of neighbors of the index
+    knn_backend : Literal[ 'auto', 'pynndescent', 'brute_force' ] = 'auto' # the kNN backend to use.
+        'pynndescent' : an approximate 'pynndescent.NNDescent' index
+        'brute_force' : an exact 'BruteForceKNNIndex' index
+        'auto' : use 'brute_force' if the number of entries is equal to or below 'int_max_num_entries_for_brute_force' (and the metric is supported), and 'pynndescent' otherwise
+    int_max_num_entries_for_brute_force : int = 50000 # the maximum number of entries for automatically selecting the 'brute_force' backend
+    **dict_kw_pynndescent # keyworded arguments for 'pynndescent.NNDescent'. 'metric' will also be used for the 'brute_force' backend
+    """
+    metric = dict_kw_pynndescent.get("metric", "euclidean")
+    if knn_backend == "auto":
+        knn_backend = (
+            "brute_force"
+            if len(data) <= int_max_num_entries_for_brute_force
+            and BruteForceKNNIndex.is_available(metric)
+            else "pynndescent"
+        )
+    if knn_backend == "brute_force":
+        return BruteForceKNNIndex(data, n_neighbors=n_neighbors, metric=metric)
+    import pynndescent
+
+    index = pynndescent.NNDescent(data, n_neighbors=n_neighbors, **dict_kw_pynndescent)
+    index.prepare()  # prepare index for searching
+    return index
+
+
+def build_knn_graph(
+    data,
+    knn_backend: Literal["auto", "pynndescent", "brute_force"] = "auto",
+    int_max_num_entries_for_brute_force: int = 50000,
+    **dict_kw_pynndescent_transformer,
+):
+    """# 2026-10-17 21:12:40
+    build a kNN graph of the given data, and return a CSR matrix of the distances to the neighbors (including each entry itself), using the same convention as 'pynndescent.PyNNDescentTransformer.fit_transform'
+
+    data : np.ndarray # (n_entries, dim) array of the entries
+    knn_backend : Literal[ 'auto', 'pynndescent', 'brute_force' ] = 'auto' # the kNN backend to use (see 'build_knn_index')
+    int_max_num_entries_for_brute_force : int = 50000 # the maximum number of entries for automatically selecting the 'brute_force' backend
+    **dict_kw_pynndescent_transformer # keyworded arguments for 'pynndescent.PyNNDescentTransformer'. 'n_neighbors' and 'metric' will also be used for the 'brute_force' backend
+    """
+    n_neighbors = dict_kw_pynndescent_transformer.get("n_neighbors", 30)
+    metric = dict_kw_pynndescent_transformer.get("metric", "euclidean")
+    if knn_backend == "auto":
+        knn_backend = (
+            "brute_force"
+            if len(data) <= int_max_num_entries_for_brute_force
+            and BruteForceKNNIndex.is_available(metric)
+            else "pynndescent"
+        )
+    if knn_backend == "pynndescent":
+        import pynndescent
+
+        return pynndescent.PyNNDescentTransformer(
+            **dict_kw_pynndescent_transformer
+        ).fit_transform(data)
+
+    index = BruteForceKNNIndex(data, n_neighbors=n_neighbors + 1, metric=metric)
+    indices, distances = index.query(
+        data, k=n_neighbors + 1
+    )  # an entry is considered as its own neighbor
+    int_num_entries = len(data)
+    return scipy.sparse.csr_matrix(
+        (
+            distances.ravel(),
+            (
+                np.repeat(np.arange(int_num_entries), indices.shape[1]),
+                indices.ravel(),
+            ),
+        ),
+        shape=(int_num_entries, int_num_entries),
+        dtype=np.float32,
+    )
+
+
 class ZarrServer:
     """# 2023-04-19 01:33:17
     This class is for serving zarr object in a spawned process or the current process for thread-safe operation.